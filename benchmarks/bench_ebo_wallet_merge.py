@@ -0,0 +1,55 @@
+"""
+Time the NULL-MasterTransactionsId flag merge of get_ebo_wallet_data
+(outwardservices._merge_null_id_rows) against the per-id loop it replaced.
+
+Usage (from the repository root):
+    python benchmarks/bench_ebo_wallet_merge.py [--sizes 10000 100000 1000000]
+        [--loop-max 10000]
+
+The loop takes seconds per 10k rows, so it only runs up to --loop-max rows.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+sys.path.insert(0, os.path.join(ROOT, "tests"))
+# The service modules log under the relative "D:/INET_RR_FLASK" off Windows
+os.chdir(tempfile.mkdtemp(prefix="rr_flask_bench_"))
+
+import pandas as pd  # noqa: E402
+
+from components.outwardservices import _merge_null_id_rows  # noqa: E402
+from test_ebo_wallet_merge import merge_null_id_rows_loop, wallet_frame  # noqa: E402
+
+
+def _time(func, frame):
+    started = time.perf_counter()
+    result = func(frame.copy())
+    return time.perf_counter() - started, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--loop-max", type=int, default=10_000)
+    args = parser.parse_args(argv)
+
+    print(f"{'rows':>10} {'groupby s':>10} {'loop s':>10}")
+    for rows in args.sizes:
+        frame = wallet_frame(rows, seed=rows)
+        groupby_seconds, merged = _time(_merge_null_id_rows, frame)
+        loop_cell = "-"
+        if rows <= args.loop_max:
+            loop_seconds, expected = _time(merge_null_id_rows_loop, frame)
+            pd.testing.assert_frame_equal(merged, expected)
+            loop_cell = f"{loop_seconds:.3f}"
+        print(f"{rows:>10} {groupby_seconds:>10.3f} {loop_cell:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,5 @@
 from flask import Flask, request, jsonify
 import pandas as pd
-from main import main
 from logger_config import logger
 from datetime import timedelta
 from handler import handler
@@ -9,7 +8,24 @@ import traceback
 from typing import Dict, Any, Optional
 from components.IhubUsercounts import inet_count, ebodetailed_data
 import numpy as np
-from components.vendorexcel import vendorexcel_reconciliation
+from db_connector import get_pool_metrics
+from query_executor import get_query_metrics
+from ttl_cache import get_cache_metrics
+from upload_cache import get_upload_cache
+from snapshot_store import get_snapshot_metrics, clear_snapshots
+from components.hub_cache import clear_hub_cache
+from job_queue import get_job_queue, snapshot_upload, JOB_DONE, FINISHED_STATES
+from process_runner import (
+    run_reconciliation,
+    run_vendorledger,
+    get_process_pool_metrics,
+)
+from response_encoder import (
+    wants_columnar,
+    encode_frame_columnar,
+    columnar_handler,
+    frame_to_records,
+)
 
 
 app = Flask(__name__)
@@ -26,6 +42,7 @@ REQUIRED_FIELDS = ["from_date", "to_date", "service_name"]
 SUCCESS_MESSAGE = "Data processed successfully..!"
 FAILURE_MESSAGE = "Failed to process data...! Please try again."
 REQIRED_VENDORLEDGER_FIELDS = ["service_name", "vendor_ledger", "vendor_statement"]
+JOB_QUEUED_MESSAGE = "Reconciliation job queued..!"
 
 
 def validate_request(request) -> Optional[Dict[str, Any]]:
@@ -66,21 +83,13 @@ def validate_vendor_request(request) -> Optional[Dict[str, Any]]:
     return None
 
 
-def clean_nans(obj):
-    """Recursively replace NaN, pd.NA, and 'nan' strings with None."""
-    if isinstance(obj, float) and (pd.isna(obj) or np.isnan(obj)):
-        return None
-    if isinstance(obj, str) and obj.strip().lower() in ("nan", "none", ""):
-        return None
-    if isinstance(obj, dict):
-        return {k: clean_nans(v) for k, v in obj.items()}
-    if isinstance(obj, list):
-        return [clean_nans(v) for v in obj]
-    return obj
-
-
-def process_result(result: Any, service_name: str) -> Dict[str, Any]:
-    """Process the result from main() into a serializable format."""
+def process_result(
+    result: Any, service_name: str, columnar: bool = False
+) -> Dict[str, Any]:
+    """
+    Process the result from main() into a serializable format.
+    With columnar=True, DataFrames are sent column-oriented (see response_encoder.py).
+    """
     if isinstance(result, str):
         return handler("", result, service_name)
 
@@ -89,29 +98,12 @@ def process_result(result: Any, service_name: str) -> Dict[str, Any]:
 
     processed_result = {}
     for key, value in result.items():
-        if isinstance(value, pd.DataFrame):
-            # Handle DataFrame conversion
-            value = value.replace({pd.NA: None, np.nan: None})
-
-            # Handle datetime conversion
-            for col in value.select_dtypes(include=["datetime64[ns]"]).columns:
-                value[col] = value[col].astype(object).where(value[col].notna(), None)
-
-            # ✅ Round numeric values in specific columns to 3 decimals
-            for col in ["AMOUNT", "COMMISSION_AMOUNT", "HUB_AMOUNT"]:
-                if col in value.columns:
-
-                    def safe_round(x):
-                        if pd.isna(x):
-                            return None
-                        try:
-                            return round(float(x), 3)
-                        except (ValueError, TypeError):
-                            return 0.000  # non-numeric fallback
-
-                    value[col] = value[col].apply(safe_round)
-            # value = value.where(pd.notna(value), None)
-            processed_result[key] = clean_nans(value.to_dict(orient="records"))
+        if isinstance(value, pd.DataFrame) and columnar:
+            processed_result[key] = encode_frame_columnar(value)
+        elif isinstance(value, pd.DataFrame):
+            # NaN/"nan" -> None and AMOUNT/COMMISSION_AMOUNT/HUB_AMOUNT
+            # rounded to 3 decimals, column by column
+            processed_result[key] = frame_to_records(value)
         elif isinstance(value, list):
             processed_result[key] = [
                 item if not hasattr(item, "__dict__") else vars(item) for item in value
@@ -121,6 +113,8 @@ def process_result(result: Any, service_name: str) -> Dict[str, Any]:
         else:
             processed_result[key] = value
 
+    if columnar:
+        return columnar_handler(processed_result, SUCCESS_MESSAGE, service_name)
     return handler(processed_result, SUCCESS_MESSAGE, service_name)
 
 
@@ -139,17 +133,10 @@ def process_vendor_result(result: Any, service_name: str) -> Dict[str, Any]:
 
     for key, value in result.items():
         if isinstance(value, pd.DataFrame):
-            # Replace missing values with None
-            value = value.replace({pd.NA: None, np.nan: None})
-
-            # Convert datetime columns to YYYY-MM-DD string (no time)
-            for col in value.select_dtypes(include=["datetime64[ns]"]).columns:
-                value[col] = (
-                    value[col].dt.strftime("%Y-%m-%d").where(value[col].notna(), None)
-                )
-
-            # Convert dataframe to list of dicts
-            processed_result[key] = clean_nans(value.to_dict(orient="records"))
+            # Missing values -> None, datetimes as YYYY-MM-DD strings (no time)
+            processed_result[key] = frame_to_records(
+                value, rounded=(), date_format="%Y-%m-%d"
+            )
 
         elif isinstance(value, list):
             # Convert objects in list to dict if needed
@@ -190,19 +177,21 @@ def reconciliation() -> tuple:
             "to_date": request.form["to_date"],
             "service_name": request.form["service_name"],
             "transaction_type": request.form.get("transaction_type"),
-            "file": (
+            "file": snapshot_upload(
                 request.files.get("file") if request.files else None
             ),  # Use .get() to avoid KeyError
         }
 
-        # Process reconciliation
-        result = main(**request_data)
+        # Process reconciliation (large uploads go to a worker process)
+        result = run_reconciliation(**request_data)
         if isinstance(result, str):
             # Original string handling - call handler directly
             return handler("", result, request_data["service_name"])
         else:
             # Original non-string path - process_result then handler
-            processed = process_result(result, request_data["service_name"])
+            processed = process_result(
+                result, request_data["service_name"], columnar=wants_columnar(request)
+            )
             return processed
     except Exception as e:
         logger.error(f"Reconciliation error: {str(e)}\n{traceback.format_exc()}")
@@ -222,11 +211,11 @@ def vendorledger_reconciliation() -> tuple:
         request_data = {
             "service_name": request.form["service_name"],
             # "transaction_type": request.form.get("transaction_type"),
-            "vendor_ledger": request.files["vendor_ledger"],
-            "vendor_statement": request.files["vendor_statement"],
+            "vendor_ledger": snapshot_upload(request.files["vendor_ledger"]),
+            "vendor_statement": snapshot_upload(request.files["vendor_statement"]),
         }
 
-        result = vendorexcel_reconciliation(**request_data)
+        result = run_vendorledger(**request_data)
         if isinstance(result, str):
             # Original string handling - call handler directly
             return handler("", result, request_data["service_name"])
@@ -241,6 +230,119 @@ def vendorledger_reconciliation() -> tuple:
         )
 
 
+@app.route("/api/reconciliation/jobs", methods=["POST"])
+def submit_reconciliation_job() -> tuple:
+    """Queue a reconciliation and return its job id without waiting for it."""
+    try:
+        if error_response := validate_request(request):
+            return jsonify(error_response[0]), error_response[1]
+        service_name = request.form["service_name"]
+        job_queue = get_job_queue()
+        job_id = job_queue.submit(
+            "reconciliation",
+            service_name,
+            run_reconciliation,
+            {
+                "from_date": request.form["from_date"],
+                "to_date": request.form["to_date"],
+                "service_name": service_name,
+                "transaction_type": request.form.get("transaction_type"),
+                "file": snapshot_upload(request.files.get("file")),
+            },
+        )
+        return (
+            jsonify(
+                {
+                    "isSuccess": True,
+                    "data": job_queue.status(job_id),
+                    "message": JOB_QUEUED_MESSAGE,
+                    "service_name": service_name,
+                }
+            ),
+            202,
+        )
+    except Exception as e:
+        logger.error(f"Error queueing reconciliation: {str(e)}\n{traceback.format_exc()}")
+        return handler("", FAILURE_MESSAGE, request.form.get("service_name", ""))
+
+
+@app.route("/api/vendorledger_reconciliation/jobs", methods=["POST"])
+def submit_vendorledger_job() -> tuple:
+    """Queue a vendor ledger reconciliation and return its job id."""
+    try:
+        if error_response := validate_vendor_request(request):
+            return jsonify(error_response[0]), error_response[1]
+        service_name = request.form["service_name"]
+        job_queue = get_job_queue()
+        job_id = job_queue.submit(
+            "vendorledger",
+            service_name,
+            run_vendorledger,
+            {
+                "service_name": service_name,
+                "vendor_ledger": snapshot_upload(request.files["vendor_ledger"]),
+                "vendor_statement": snapshot_upload(request.files["vendor_statement"]),
+            },
+        )
+        return (
+            jsonify(
+                {
+                    "isSuccess": True,
+                    "data": job_queue.status(job_id),
+                    "message": JOB_QUEUED_MESSAGE,
+                    "service_name": service_name,
+                }
+            ),
+            202,
+        )
+    except Exception as e:
+        logger.error(f"Error queueing vendor ledger job: {str(e)}\n{traceback.format_exc()}")
+        return handler("", FAILURE_MESSAGE, request.form.get("service_name", ""))
+
+
+@app.route("/api/jobs/<job_id>", methods=["GET"])
+def job_status(job_id) -> tuple:
+    status = get_job_queue().status(job_id)
+    if status is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify({"isSuccess": True, "data": status})
+
+
+@app.route("/api/jobs/<job_id>/result", methods=["GET"])
+def job_result(job_id) -> tuple:
+    """Result of a finished job, in the same shape as the synchronous endpoints."""
+    try:
+        job = get_job_queue().get(job_id)
+        if job is None:
+            return jsonify({"error": "Job not found"}), 404
+        if job.status not in FINISHED_STATES:
+            # Not ready yet; the client keeps polling
+            return jsonify({"isSuccess": False, "data": get_job_queue().status(job_id)}), 202
+        if job.status != JOB_DONE:
+            return handler("", FAILURE_MESSAGE, job.service_name)
+        if isinstance(job.result, str):
+            return handler("", job.result, job.service_name)
+        if job.kind == "vendorledger":
+            return process_vendor_result(job.result, job.service_name)
+        return process_result(
+            job.result, job.service_name, columnar=wants_columnar(request)
+        )
+    except Exception as e:
+        logger.error(f"Error fetching job result: {str(e)}\n{traceback.format_exc()}")
+        return jsonify({"isSuccess": False, "data": None}), 500
+
+
+@app.route("/api/jobStats", methods=["GET"])
+def job_stats() -> tuple:
+    try:
+        data = get_job_queue().stats()
+        data["process_pool"] = get_process_pool_metrics()
+        return jsonify({"isSuccess": True, "data": data})
+    except Exception as e:
+        logger.error(f"Error fetching job stats: {str(e)}\n{traceback.format_exc()}")
+        return jsonify({"isSuccess": False, "data": None}), 500
+
+
 @app.route("/api/getEboData", methods=["GET"])
 def get_ebo_data() -> tuple:
     try:
@@ -282,5 +384,57 @@ def get_ebo_detailed_data() -> tuple:
         return jsonify(handler(None, FAILURE_MESSAGE, "inet_count"))
 
 
+@app.route("/api/dbPoolStats", methods=["GET"])
+def db_pool_stats() -> tuple:
+    try:
+        return jsonify({"isSuccess": True, "data": get_pool_metrics()})
+    except Exception as e:
+        logger.error(f"Error fetching DB pool stats: {str(e)}\n{traceback.format_exc()}")
+        return jsonify({"isSuccess": False, "data": None}), 500
+
+
+@app.route("/api/queryStats", methods=["GET"])
+def query_stats() -> tuple:
+    try:
+        return jsonify({"isSuccess": True, "data": get_query_metrics()})
+    except Exception as e:
+        logger.error(f"Error fetching query stats: {str(e)}\n{traceback.format_exc()}")
+        return jsonify({"isSuccess": False, "data": None}), 500
+
+
+@app.route("/api/cacheStats", methods=["GET"])
+def cache_stats() -> tuple:
+    try:
+        data = get_cache_metrics()
+        data["upload_cache"] = get_upload_cache().stats()
+        data["hub_snapshots"] = get_snapshot_metrics()
+        return jsonify({"isSuccess": True, "data": data})
+    except Exception as e:
+        logger.error(f"Error fetching cache stats: {str(e)}\n{traceback.format_exc()}")
+        return jsonify({"isSuccess": False, "data": None}), 500
+
+
+@app.route("/api/clearHubSnapshots", methods=["POST"])
+def clear_hub_snapshots() -> tuple:
+    """
+    Drop stored hub day snapshots (and the in-memory hub cache) after hub
+    data was corrected, so the next reconciliation reads the days again.
+    Optional fields: name (query name, e.g. "recharge_Service"), from_date,
+    to_date.
+    """
+    try:
+        fields = request.get_json(silent=True) or request.form
+        removed = clear_snapshots(
+            fields.get("name") or None,
+            fields.get("from_date") or None,
+            fields.get("to_date") or None,
+        )
+        clear_hub_cache()
+        return jsonify({"isSuccess": True, "data": {"removed": removed}})
+    except Exception as e:
+        logger.error(f"Error clearing hub snapshots: {str(e)}\n{traceback.format_exc()}")
+        return jsonify({"isSuccess": False, "data": None}), 500
+
+
 # if __name__ == "__main__":
 #     app.run(debug=True, host="0.0.0.0", port=5000)
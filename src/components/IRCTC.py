@@ -1,43 +1,9 @@
 import pandas as pd
 import logging
-from db_connector import get_db_connection
+from query_executor import execute_sql_with_retry
 from logger_config import logger
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy import text
-from tenacity import (
-    retry,
-    stop_after_attempt,
-    wait_exponential,
-    retry_if_exception_type,
-)
-from sqlalchemy.exc import OperationalError, DatabaseError
-
-engine = get_db_connection()
-
-# Configure retry logic for database operations
-DB_RETRY_CONFIG = {
-    "stop": stop_after_attempt(3),
-    "wait": wait_exponential(multiplier=1, min=1, max=10),
-    "retry": retry_if_exception_type((OperationalError, DatabaseError)),
-    "reraise": True,
-}
-
-
-####
-@retry(**DB_RETRY_CONFIG)
-def execute_sql_with_retry(query, params=None):
-    logger.info("Entered helper function to execute SQL with retry logic")
-
-    try:
-        with engine.connect() as connection:
-            result = connection.execute(query, params or {})
-            df = pd.DataFrame(
-                result.fetchall(), columns=result.keys()
-            )  # Fully fetches all rows
-            return df
-    except Exception as e:
-        logger.error(f"Error during SQL execution: {e}")
-        raise
 
 
 def irctc(start_date, end_date, service_name):
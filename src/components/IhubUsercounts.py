@@ -1,37 +1,8 @@
 import pandas as pd
-from db_connector import get_db_connection
+from query_executor import execute_sql_with_retry
 from logger_config import logger
-from sqlalchemy.exc import SQLAlchemyError, OperationalError, DatabaseError
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy import text
-from tenacity import (
-    retry,
-    stop_after_attempt,
-    wait_exponential,
-    retry_if_exception_type,
-)
-
-engine = get_db_connection()
-
-# Retry config for DB operations
-DB_RETRY_CONFIG = {
-    "stop": stop_after_attempt(3),
-    "wait": wait_exponential(multiplier=1, min=1, max=10),
-    "retry": retry_if_exception_type((OperationalError, DatabaseError)),
-    "reraise": True,
-}
-
-
-@retry(**DB_RETRY_CONFIG)
-def execute_sql_with_retry(query, params=None):
-    logger.info("Executing SQL with retry")
-    try:
-        with engine.connect() as connection:
-            result = connection.execute(query, params or {})
-            df = pd.DataFrame(result.fetchall(), columns=result.keys())
-            return df
-    except Exception as e:
-        logger.error(f"SQL execution error: {e}")
-        raise
 
 
 def inet_count():
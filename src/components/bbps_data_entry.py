@@ -1,44 +1,9 @@
 import pandas as pd
 import logging
-from db_connector import get_db_connection
+from query_executor import execute_sql_with_retry
 from logger_config import logger
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy import text
-from tenacity import (
-    retry,
-    stop_after_attempt,
-    wait_exponential,
-    retry_if_exception_type,
-)
-from sqlalchemy.exc import OperationalError, DatabaseError
-
-
-engine = get_db_connection()
-
-# Configure retry logic for database operations
-DB_RETRY_CONFIG = {
-    "stop": stop_after_attempt(3),
-    "wait": wait_exponential(multiplier=1, min=1, max=10),
-    "retry": retry_if_exception_type((OperationalError, DatabaseError)),
-    "reraise": True,
-}
-
-
-####
-@retry(**DB_RETRY_CONFIG)
-def execute_sql_with_retry(query, params=None):
-    logger.info("Entered helper function to execute SQL with retry logic")
-
-    try:
-        with engine.connect() as connection:
-            result = connection.execute(query, params or {})
-            df = pd.DataFrame(
-                result.fetchall(), columns=result.keys()
-            )  # Fully fetches all rows
-            return df
-    except Exception as e:
-        logger.error(f"Error during SQL execution: {e}")
-        raise
 
 
 def bbps_data_entry(start_date, end_date, service_name, df_excel):
@@ -46,13 +11,13 @@ def bbps_data_entry(start_date, end_date, service_name, df_excel):
     result = pd.DataFrame()
     query = text(
         """
-       SELECT bbf.Id as BBPS_BillFetchId,bbf.BBPS_BillerDetailId,bbf.CustomerMobile,bbf.BillAmount as Amount,bbf.CreationTs,bbf.HeadReferenceId as HeadReferenceId_db,bbf.CustomerData,bbf.CustomerName,bbf.Request,bbf.Response,bbf.CreationUserId,bbf.EncryptedRequest,bbf.EncryptedResponse from ihubcore.BBPS_BillFetch bbf where DATE(bbf.CreationTs) BETWEEN :start_date and :end_date                 
+       SELECT bbf.Id as BBPS_BillFetchId,bbf.BBPS_BillerDetailId,bbf.CustomerMobile,bbf.BillAmount as Amount,bbf.CreationTs,bbf.HeadReferenceId as HeadReferenceId_db,bbf.CustomerData,bbf.CustomerName,bbf.Request,bbf.Response,bbf.CreationUserId,bbf.EncryptedRequest,bbf.EncryptedResponse from ihubcore.BBPS_BillFetch bbf where bbf.CreationTs >= CONCAT(:start_date, ' 00:00:00') AND bbf.CreationTs < DATE_ADD(CONCAT(:end_date, ' 00:00:00'), INTERVAL 1 DAY)                 
 """
     )
     query2 = text(
         """
         SELECT mst.id as MST_ID , mst.TransRefNumVendorSub as VEND_ID from ihubcore.MasterSubTransaction mst  
-        where TransRefNumVendorSub LIKE "%KM%" AND DATE(CreationTs) BETWEEN :start_date and :end_date
+        where TransRefNumVendorSub LIKE "%KM%" AND CreationTs >= CONCAT(:start_date, ' 00:00:00') AND CreationTs < DATE_ADD(CONCAT(:end_date, ' 00:00:00'), INTERVAL 1 DAY)
                     """
     )
     params = {"start_date": start_date, "end_date": end_date}
@@ -1,9 +1,12 @@
+import numpy as np
 import pandas as pd
 from logger_config import logger
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy import text
 from typing import Dict, Any, Optional
 from logger_config import logger
+from money import to_paise, to_rupees
+from label_columns import as_category, map_to_category
 from components.outwardservices import (
     recharge_Service,
     Bbps_service,
@@ -18,6 +21,26 @@ from components.outwardservices import (
     moveToBank_service,
 )
 from components.inwardservice import matm_Service, aeps_Service
+from components.reference_matcher import match_references
+from components.hub_cache import get_hub_data
+from components.scenario_classifier import (
+    SCENARIO_RULES,
+    EXCEL_STATUS_CODES,
+    EXCEL_SUCCESS,
+    EXCEL_FAILED,
+    EXCEL_TIMED_OUT,
+    EXCEL_OTHER,
+    DB_STATUS_CODES,
+    DB_SUCCESS,
+    DB_FAILED,
+    DB_OTHER,
+    LEDGER_CODES,
+    LEDGER_OTHER,
+    normalize_status,
+    status_differs,
+    classify,
+    scenario_positions,
+)
 
 # Service configuration constants
 SERVICE_CONFIGS = {
@@ -159,19 +182,20 @@ def service_selection(
         df_excel = process_status_column(df_excel, service_config)
         pan_nsdl_iti_df = pd.DataFrame()
 
-        # Get service data and filter
+        # Get service data (cached per service/range) and filter
         if service_name == "AEPS":
-            hub_data = service_config["service_func"](
+            loader = lambda: service_config["service_func"](
                 start_date, end_date, service_name, transaction_type
             )
-        elif service_name == "PANNSDL":
-            hub_data, pan_nsdl_iti_df = service_config["service_func"](
-                start_date, end_date, service_name
-            )
         else:
-            hub_data = service_config["service_func"](
+            loader = lambda: service_config["service_func"](
                 start_date, end_date, service_name
             )
+        hub_data = get_hub_data(
+            service_name, start_date, end_date, transaction_type, loader
+        )
+        if service_name == "PANNSDL":
+            hub_data, pan_nsdl_iti_df = hub_data
         return filtering_Data(hub_data, df_excel, service_name, pan_nsdl_iti_df)
 
     except Exception as e:
@@ -212,7 +236,9 @@ def unified_filtering_data(
         df_excel[status_column_excel] = (
             df_excel[status_column_excel].astype(str).str.strip()
         )
-        df_excel["VENDOR_AMOUNT"] = df_excel["VENDOR_AMOUNT"].astype(float)
+        # Vendor amounts arrive as text ("1,250.00", "₹ 99"); parse them as
+        # paise and hand on rupees rounded to the paisa
+        df_excel["VENDOR_AMOUNT"] = to_rupees(to_paise(df_excel["VENDOR_AMOUNT"]))
         # Preprocess dates
         if "VENDOR_DATE" in df_excel.columns:
             df_excel["VENDOR_DATE"] = pd.to_datetime(
@@ -232,63 +258,49 @@ def unified_filtering_data(
             ).dt.strftime("%Y-%m-%d")
         # Map DB status if mapping provided
         if status_mapping_db and status_column_db in df_db.columns:
-            df_db[status_column_db] = (
-                df_db[status_column_db]
-                .map(status_mapping_db)
-                .fillna(df_db[status_column_db])
+            df_db[status_column_db] = map_to_category(
+                df_db[status_column_db], status_mapping_db
             )
 
-        # Map Excel status if mapping provided
+        # Map Excel status if mapping provided; either way the vendor status
+        # becomes a categorical
         if status_mapping_excel and status_column_excel in df_excel.columns:
-            df_excel[status_column_excel] = (
-                df_excel[status_column_excel]
-                .map(status_mapping_excel)
-                .fillna(df_excel[status_column_excel])
+            df_excel[status_column_excel] = map_to_category(
+                df_excel[status_column_excel], status_mapping_excel
+            )
+        else:
+            df_excel[status_column_excel] = as_category(
+                df_excel[status_column_excel], EXCEL_STATUS_CODES
             )
 
-        Hub_initiated_count = df_db[
-            df_db[status_column_db]
-            .astype(str)
-            .str.lower()
-            .isin(["initiated", "inprogress"])
-        ].shape[0]
-        Hub_success_count = df_db[
-            df_db[status_column_db].astype(str).str.lower() == "success"
-        ].shape[0]
-        Hub_failed_count = df_db[
-            df_db[status_column_db].astype(str).str.lower() == "failed"
-        ].shape[0]
-        Vendor_success_count = df_excel[
-            df_excel[status_column_excel].astype(str).str.lower() == "success"
-        ].shape[0]
-        Vendor_failed_count = df_excel[
-            df_excel[status_column_excel].astype(str).str.lower() == "failed"
-        ].shape[0]
-        Vendor_timeout_count = df_excel[
-            df_excel[status_column_excel].astype(str).str.lower() == "timed out"
-        ].shape[0]
+        hub_status, _ = normalize_status(
+            df_db[status_column_db], DB_STATUS_CODES, DB_OTHER
+        )
+        vendor_status, _ = normalize_status(
+            df_excel[status_column_excel], EXCEL_STATUS_CODES, EXCEL_OTHER
+        )
+        Hub_initiated_count = int(hub_status.isin(["initiated", "inprogress"]).sum())
+        Hub_success_count = int((hub_status == "success").sum())
+        Hub_failed_count = int((hub_status == "failed").sum())
+        Vendor_success_count = int((vendor_status == "success").sum())
+        Vendor_failed_count = int((vendor_status == "failed").sum())
+        Vendor_timeout_count = int((vendor_status == "timed out").sum())
 
         # Helper for column selection
         def safe_column_select(df, columns):
             existing_cols = [col for col in columns if col in df.columns]
             return df[existing_cols].copy()
 
-        # Handle amount column renaming for not_in_vendor
-        refid_list = df_excel["REFID"].dropna().astype(str).str.strip()
-        not_in_vendor = df_db[
-            (~df_db["VENDOR_REFERENCE"].astype(str).str.strip().isin(refid_list))
-            | (df_db["VENDOR_REFERENCE"].isna())
-            | (df_db["VENDOR_REFERENCE"].astype(str).str.strip() == "")
-        ].copy()
-
+        # Partition hub / vendor rows on the reference in one pass
+        not_in_vendor, not_in_portal, matched = match_references(
+            df_db, df_excel, "VENDOR_REFERENCE", "REFID"
+        )
+        not_in_vendor = not_in_vendor.copy()
         not_in_vendor["CATEGORY"] = "NOT_IN_VENDOR"
         not_in_vendor = not_in_vendor.rename(columns={"VENDOR_REFERENCE": "REFID"})
 
         not_in_vendor = safe_column_select(not_in_vendor, required_columns)
-        # Handle amount column renaming for not_in_portal
-        not_in_portal = df_excel[
-            ~df_excel["REFID"].isin(df_db["VENDOR_REFERENCE"])
-        ].copy()
+        not_in_portal = not_in_portal.copy()
         not_in_portal["CATEGORY"] = "NOT_IN_PORTAL"
         not_in_portal = safe_column_select(not_in_portal, required_columns)
         # ITI Matching for PANNSDL
@@ -323,180 +335,52 @@ def unified_filtering_data(
             ]
 
         # Matched
-        matched = df_db.merge(
-            df_excel, left_on="VENDOR_REFERENCE", right_on="REFID", how="inner"
-        ).copy()
         matched["CATEGORY"] = "MATCHED"
         matched = safe_column_select(matched, required_columns)
+        # Normalize the status / ledger columns once and label every row
+        matched_db_status, db_codes = normalize_status(
+            matched[status_column_db], DB_STATUS_CODES, DB_OTHER
+        )
+        matched_vendor_status, excel_codes = normalize_status(
+            matched[status_column_excel], EXCEL_STATUS_CODES, EXCEL_OTHER
+        )
+        _, ledger_codes = normalize_status(
+            matched[ledger_status_col], LEDGER_CODES, LEDGER_OTHER
+        )
+        positions = scenario_positions(classify(excel_codes, db_codes, ledger_codes))
+
         # Mismatched
         mismatched = matched[
-            matched[status_column_db].astype(str).str.lower()
-            != matched[status_column_excel].astype(str).str.lower()
+            status_differs(matched_db_status, matched_vendor_status)
         ].copy()
         mismatched["CATEGORY"] = "MISMATCHED"
         mismatched = safe_column_select(mismatched, required_columns)
 
         # Scenario blocks (NIL and IL)
-        def scenario_df(df, cond, category):
-            out = df[cond].copy()
+        def scenario_df(df, rows, category):
+            out = df.iloc[rows].copy()
             out["CATEGORY"] = category
             return safe_column_select(out, required_columns)
 
-        # Define scenario conditions
         scenarios = {
             "not_in_vendor": not_in_vendor,
             "not_in_portal": not_in_portal,
             "matched": matched,
             "mismatched": mismatched,
-            "vend_ihub_succ_not_in_ledger": scenario_df(
-                matched,
-                (matched[status_column_excel].astype(str).str.lower() == "success")
-                & (matched[status_column_db].astype(str).str.lower() == "success")
-                & (matched[ledger_status_col].astype(str).str.lower() == "no"),
-                "VEND_IHUB_SUC-NIL",
-            ),
-            "vend_fail_ihub_succ_not_in_ledger": scenario_df(
-                matched,
-                (matched[status_column_excel].astype(str).str.lower() == "failed")
-                & (matched[status_column_db].astype(str).str.lower() == "success")
-                & (matched[ledger_status_col].astype(str).str.lower() == "no"),
-                "VEND_FAIL_IHUB_SUC-NIL",
-            ),
-            "vend_succ_ihub_fail_not_in_ledger": scenario_df(
-                matched,
-                (matched[status_column_excel].astype(str).str.lower() == "success")
-                & (matched[status_column_db].astype(str).str.lower() == "failed")
-                & (matched[ledger_status_col].astype(str).str.lower() == "no"),
-                "VEND_SUC_IHUB_FAIL-NIL",
-            ),
-            "ihub_vend_fail_not_in_ledger": scenario_df(
-                matched,
-                (
-                    matched[status_column_excel]
-                    .astype(str)
-                    .str.lower()
-                    .isin(["failed", "timed out"])
-                )
-                & (matched[status_column_db].astype(str).str.lower() == "failed")
-                & (matched[ledger_status_col].astype(str).str.lower() == "no"),
-                "IHUB_FAIL_VEND_FAIL-NIL",
-            ),
-            "ihub_initiate_vend_succes_not_in_ledger": scenario_df(
-                matched,
-                (matched[status_column_excel].astype(str).str.lower() == "success")
-                & (
-                    matched[status_column_db]
-                    .astype(str)
-                    .str.lower()
-                    .isin(["initiated", "inprogress", "pending"])
-                )
-                & (matched[ledger_status_col].astype(str).str.lower() == "no"),
-                "IHUB_INT_VEND_SUC-NIL",
-            ),
-            "ihub_initiate_vend_fail_not_in_ledger": scenario_df(
-                matched,
-                (
-                    matched[status_column_excel]
-                    .astype(str)
-                    .str.lower()
-                    .isin(["failed", "timed out"])
-                )
-                & (
-                    matched[status_column_db]
-                    .astype(str)
-                    .str.lower()
-                    .isin(["initiated", "inprogress", "pending"])
-                )
-                & (matched[ledger_status_col].astype(str).str.lower() == "no"),
-                "VEND_FAIL_IHUB_INT-NIL",
-            ),
-            "vend_ihub_succ": scenario_df(
-                matched,
-                (matched[status_column_excel].astype(str).str.lower() == "success")
-                & (matched[status_column_db].astype(str).str.lower() == "success")
-                & (matched[ledger_status_col].astype(str).str.lower() == "yes"),
-                "VEND_IHUB_SUC",
-            ),
-            "vend_ihub_fail": scenario_df(
-                matched,
-                (
-                    matched[status_column_excel]
-                    .astype(str)
-                    .str.lower()
-                    .isin(["failed", "timed out"])
-                )
-                & (matched[status_column_db].astype(str).str.lower() == "failed")
-                & (matched[ledger_status_col].astype(str).str.lower() == "yes"),
-                "VEND_IHUB_FAIL",
-            ),
-            "vend_fail_ihub_succ": scenario_df(
-                matched,
-                (
-                    matched[status_column_excel]
-                    .astype(str)
-                    .str.lower()
-                    .isin(["failed", "timed out"])
-                )
-                & (matched[status_column_db].astype(str).str.lower() == "success")
-                & (matched[ledger_status_col].astype(str).str.lower() == "yes"),
-                "VEND_FAIL_IHUB_SUC",
-            ),
-            "vend_succ_ihub_fail": scenario_df(
-                matched,
-                (matched[status_column_excel].astype(str).str.lower() == "success")
-                & (matched[status_column_db].astype(str).str.lower() == "failed")
-                & (matched[ledger_status_col].astype(str).str.lower() == "yes"),
-                "VEND_SUC_IHUB_FAIL",
-            ),
-            "ihub_initiate_vend_succes": scenario_df(
-                matched,
-                (matched[status_column_excel].astype(str).str.lower() == "success")
-                & (
-                    matched[status_column_db]
-                    .astype(str)
-                    .str.lower()
-                    .isin(["initiated", "inprogress", "pending"])
-                )
-                & (matched[ledger_status_col].astype(str).str.lower() == "yes"),
-                "IHUB_INT_VEND_SUC",
-            ),
-            "ihub_initiate_vend_fail": scenario_df(
-                matched,
-                (
-                    matched[status_column_excel]
-                    .astype(str)
-                    .str.lower()
-                    .isin(["failed", "timed out"])
-                )
-                & (
-                    matched[status_column_db]
-                    .astype(str)
-                    .str.lower()
-                    .isin(["initiated", "inprogress", "pending"])
-                )
-                & (matched[ledger_status_col].astype(str).str.lower() == "yes"),
-                "VEND_FAIL_IHUB_INT",
-            ),
         }
+        for key, category, *_ in SCENARIO_RULES:
+            scenarios[key] = scenario_df(matched, positions[key], category)
 
         # Success/failure counts
-        matched_success_status = matched[
-            (matched[status_column_db].astype(str).str.lower() == "success")
-            & (matched[status_column_excel].astype(str).str.lower() == "success")
-        ]
-
-        success_count = matched_success_status.shape[0]
-        matched_failed_status = matched[
-            (matched[status_column_db].astype(str).str.lower() == "failed")
-            & (
-                matched[status_column_excel]
-                .astype(str)
-                .str.lower()
-                .isin(["failed", "timed out"])
-            )
-        ]
-
-        failed_count = matched_failed_status.shape[0]
+        success_count = int(
+            ((db_codes == DB_SUCCESS) & (excel_codes == EXCEL_SUCCESS)).sum()
+        )
+        failed_count = int(
+            (
+                (db_codes == DB_FAILED)
+                & np.isin(excel_codes, [EXCEL_FAILED, EXCEL_TIMED_OUT])
+            ).sum()
+        )
 
         # Align and combine
         combine_keys = [
@@ -0,0 +1,76 @@
+"""
+hub_cache.py - Reuse hub query results across reconciliations.
+
+The same service and date range is often reconciled several times in a row
+(new vendor file, different transaction type), and each run used to repeat
+every hub query. Hub results are cached per (service, start, end,
+transaction type). Ranges that end before today cannot change any more and
+are kept for hours; ranges that include today only for a couple of minutes.
+Callers always get copies, because the filtering code adds columns to the
+hub frames in place.
+"""
+
+from datetime import date
+
+import pandas as pd
+from logger_config import logger
+from ttl_cache import TTLCache
+
+# Seconds to keep a result whose range is entirely in the past / includes today
+CLOSED_RANGE_TTL = 6 * 60 * 60
+OPEN_RANGE_TTL = 120
+
+_hub_cache = TTLCache("hub_data", maxsize=24, ttl=OPEN_RANGE_TTL)
+
+
+def _as_date(value):
+    return pd.to_datetime(value).date()
+
+
+def hub_ttl(end_date) -> int:
+    """Cache lifetime for a range ending on end_date."""
+    return CLOSED_RANGE_TTL if _as_date(end_date) < date.today() else OPEN_RANGE_TTL
+
+
+def _copy(value):
+    if isinstance(value, pd.DataFrame):
+        return value.copy()
+    if isinstance(value, tuple):
+        return tuple(_copy(item) for item in value)
+    return value
+
+
+def _is_empty(value):
+    if isinstance(value, pd.DataFrame):
+        return value.empty
+    if isinstance(value, tuple):
+        return all(_is_empty(item) for item in value)
+    return value is None
+
+
+def get_hub_data(service_name, start_date, end_date, transaction_type, loader):
+    """
+    Cached result of loader() for the service and range.
+
+    Empty results are not cached: the query helpers also return an empty
+    frame when the database call failed.
+    """
+    key = (
+        service_name,
+        str(_as_date(start_date)),
+        str(_as_date(end_date)),
+        transaction_type,
+    )
+    missing = object()
+    value = _hub_cache.get(key, missing)
+    if value is missing:
+        value = loader()
+        if not _is_empty(value):
+            _hub_cache.set(key, value, ttl=hub_ttl(end_date))
+    else:
+        logger.info(f"Hub data cache hit for {service_name} {key[1]}..{key[2]}")
+    return _copy(value)
+
+
+def clear_hub_cache():
+    _hub_cache.clear()
@@ -1,45 +1,21 @@
 # --- DRY Helper Functions are now in recon_utils.py ---
 import pandas as pd
-from db_connector import get_db_connection
+from query_executor import STREAM_CHUNK_SIZE
+from snapshot_store import execute_by_day
 from logger_config import logger
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy import text
-from tenacity import (
-    retry,
-    stop_after_attempt,
-    wait_exponential,
-    retry_if_exception_type,
-)
-from sqlalchemy.exc import OperationalError, DatabaseError
 from components.recon_utils import (
     map_status_column,
     map_tenant_id_column,
     merge_ebo_wallet_data,
+    fetch_hub_inputs,
+    HUB_AMOUNT_DTYPES,
 )
 from components.outwardservices import get_ebo_wallet_data
-
-engine = get_db_connection()
-
-# Configure retry logic for database operations
-DB_RETRY_CONFIG = {
-    "stop": stop_after_attempt(3),
-    "wait": wait_exponential(multiplier=1, min=1, max=10),
-    "retry": retry_if_exception_type((OperationalError, DatabaseError)),
-    "reraise": True,
-}
+from components.ledger_index import apply_ledger_flags
 
 
-@retry(**DB_RETRY_CONFIG)
-def execute_sql_with_retry(query, params=None):
-    logger.info("Entered helper function to execute SQL with retry logic")
-    with engine.connect().execution_options(stream_results=True) as connection:
-        try:
-            df = pd.read_sql(query, con=connection, params=params)
-            return df
-        except Exception as e:
-            logger.error(f"Error during SQL execution: {e}")
-            raise
-
 # ----------------------------------------------------------------------------------
 # Aeps function
 def aeps_Service(start_date, end_date, service_name, transaction_type):
@@ -57,25 +33,15 @@ def aeps_Service(start_date, end_date, service_name, transaction_type):
             mt2.TransactionStatus AS IHUB_MASTER_STATUS,
             pat.CreationTs AS SERVICE_DATE,
             pat.TransStatus AS service_status,
-            pat.Amount AS HUB_AMOUNT,
-            CASE 
-                WHEN a.IHubReferenceId IS NOT NULL THEN 'Yes'
-                ELSE 'No'
-            END AS IHUB_LEDGER_STATUS
+            pat.Amount AS HUB_AMOUNT
         FROM ihubcore.MasterTransaction mt2 
         LEFT JOIN ihubcore.MasterSubTransaction mst
             ON mst.MasterTransactionId = mt2.Id
         LEFT JOIN ihubcore.PsAepsTransaction pat 
             ON pat.MasterSubTransactionId = mst.Id
             JOIN ihubcore.PsAepsRequest par on par.id=pat.RequestId 
-        LEFT JOIN (
-            SELECT DISTINCT iwt.IHubReferenceId AS IHubReferenceId
-            FROM ihubcore.IHubWalletTransaction iwt
-            WHERE DATE(iwt.CreationTs) BETWEEN :start_date AND :end_date
-        ) a 
-            ON a.IHubReferenceId = mt2.TransactionRefNum
         WHERE pat.TransMode = :transaction_type
-        AND DATE(pat.CreationTs) BETWEEN :start_date AND :end_date
+        AND pat.CreationTs >= CONCAT(:start_date, ' 00:00:00') AND pat.CreationTs < DATE_ADD(CONCAT(:end_date, ' 00:00:00'), INTERVAL 1 DAY)
     """
         )
     elif transaction_type == "3":
@@ -90,25 +56,15 @@ def aeps_Service(start_date, end_date, service_name, transaction_type):
             mt2.TransactionStatus AS IHUB_MASTER_STATUS,
             pat.CreationTs AS SERVICE_DATE,
             pat.TransStatus AS service_status,
-            pat.Amount AS HUB_AMOUNT,
-            CASE
-                WHEN a.IHubReferenceId IS NOT NULL THEN 'Yes'
-                ELSE 'No'
-            END AS IHUB_LEDGER_STATUS
+            pat.Amount AS HUB_AMOUNT
         FROM ihubcore.MasterTransaction mt2 
         LEFT JOIN ihubcore.MasterSubTransaction mst
             ON mst.MasterTransactionId = mt2.Id
         LEFT JOIN ihubcore.PsAepsTransaction pat
             ON pat.MasterSubTransactionId = mst.Id
             JOIN ihubcore.PsAepsRequest par on par.id=pat.RequestId
-        LEFT JOIN (
-            SELECT DISTINCT iwt.IHubReferenceId AS IHubReferenceId  
-            FROM ihubcore.IHubWalletTransaction iwt
-            WHERE DATE(iwt.CreationTs) BETWEEN :start_date AND :end_date
-        ) a
-            ON a.IHubReferenceId = mt2.TransactionRefNum
         WHERE pat.TransMode = :transaction_type and
-        DATE(pat.CreationTs) BETWEEN :start_date AND :end_date
+        pat.CreationTs >= CONCAT(:start_date, ' 00:00:00') AND pat.CreationTs < DATE_ADD(CONCAT(:end_date, ' 00:00:00'), INTERVAL 1 DAY)
     """
         )
     else:
@@ -124,7 +80,22 @@ def aeps_Service(start_date, end_date, service_name, transaction_type):
 
     try:
         # Safe query execution with retry
-        df_db = execute_sql_with_retry(query, params=params)
+        fetched = fetch_hub_inputs(
+            lambda: execute_by_day(
+                query,
+                params=params,
+                name="aeps_Service",
+                coerce_float=True,
+                chunksize=STREAM_CHUNK_SIZE,
+                dtypes=HUB_AMOUNT_DTYPES,
+            ),
+            start_date,
+            end_date,
+            service_name,
+            get_ebo_wallet_data,
+            tenant=False,
+        )
+        df_db = fetched["hub"]
 
         if df_db.empty:
             logger.warning(f"No data returned for service: {service_name}")
@@ -152,9 +123,17 @@ def aeps_Service(start_date, end_date, service_name, transaction_type):
         if "VENDOR_REFERENCE" in df_db.columns:
             df_db["VENDOR_REFERENCE"] = df_db["VENDOR_REFERENCE"].astype(str)
         # Tenant ID mapping
+        df_db = apply_ledger_flags(df_db, start_date, end_date, tenant=False)
         df_db = map_tenant_id_column(df_db, "TENANT_ID")
         # Merge with EBO Wallet data
-        result = merge_ebo_wallet_data(df_db, start_date, end_date, service_name, get_ebo_wallet_data)
+        result = merge_ebo_wallet_data(
+            df_db,
+            start_date,
+            end_date,
+            service_name,
+            get_ebo_wallet_data,
+            ebo_result=fetched["ebo"],
+        )
 
     except SQLAlchemyError as e:
         logger.error(f"Database error in aeps_Service(): {e}")
@@ -179,32 +158,13 @@ def matm_Service(start_date, end_date, service_name):
             mt2.TransactionStatus AS IHUB_MASTER_STATUS,
             iwmt.CreationTs AS SERVICE_DATE,
             iwmt.Amount AS HUB_AMOUNT,
-            iwmt.TransStatusType  AS service_status,
-            CASE 
-                WHEN a.IHubReferenceId IS NOT NULL THEN 'Yes'
-                ELSE 'No'
-            END AS IHUB_LEDGER_STATUS,
-            CASE
-                WHEN twt.IHubReferenceId IS NOT NULL THEN 'Yes'
-                ELSE 'No'
-            END AS TENANT_LEDGER_STATUS
+            iwmt.TransStatusType  AS service_status
         FROM ihubcore.MasterTransaction mt2 
         LEFT JOIN ihubcore.MasterSubTransaction mst
             ON mst.MasterTransactionId = mt2.Id
         LEFT JOIN ihubcore.ImWalletMatmTransaction iwmt  
             ON iwmt.MasterSubTransactionId = mst.Id
-        LEFT JOIN (
-            SELECT DISTINCT iwt.IHubReferenceId AS IHubReferenceId
-            FROM ihubcore.IHubWalletTransaction iwt
-            WHERE DATE(iwt.CreationTs) BETWEEN :start_date AND :end_date
-        ) a 
-        ON a.IHubReferenceId = mt2.TransactionRefNum
-        LEFT JOIN (
-            SELECT DISTINCT IHubReferenceId
-            FROM ihubcore.TenantWalletTransaction
-            WHERE DATE(CreationTs) BETWEEN :start_date AND :end_date
-        ) twt ON twt.IHubReferenceId = mt2.TransactionRefNum 
-        WHERE DATE(iwmt.CreationTs) BETWEEN :start_date AND :end_date
+        WHERE iwmt.CreationTs >= CONCAT(:start_date, ' 00:00:00') AND iwmt.CreationTs < DATE_ADD(CONCAT(:end_date, ' 00:00:00'), INTERVAL 1 DAY)
     """
     )
     params = {
@@ -213,7 +173,21 @@ def matm_Service(start_date, end_date, service_name):
     }
     try:
         # Safe query execution with retry
-        df_db = execute_sql_with_retry(query, params=params)
+        fetched = fetch_hub_inputs(
+            lambda: execute_by_day(
+                query,
+                params=params,
+                name="matm_Service",
+                coerce_float=True,
+                chunksize=STREAM_CHUNK_SIZE,
+                dtypes=HUB_AMOUNT_DTYPES,
+            ),
+            start_date,
+            end_date,
+            service_name,
+            get_ebo_wallet_data,
+        )
+        df_db = fetched["hub"]
 
         if df_db.empty:
             logger.warning(f"No data returned for service: {service_name}")
@@ -236,9 +210,17 @@ def matm_Service(start_date, end_date, service_name):
         if "VENDOR_REFERENCE" in df_db.columns:
             df_db["VENDOR_REFERENCE"] = df_db["VENDOR_REFERENCE"].astype(str)
         # Tenant ID mapping
+        df_db = apply_ledger_flags(df_db, start_date, end_date)
         df_db = map_tenant_id_column(df_db, "TENANT_ID")
         # Merge with EBO Wallet data
-        result = merge_ebo_wallet_data(df_db, start_date, end_date, service_name, get_ebo_wallet_data)
+        result = merge_ebo_wallet_data(
+            df_db,
+            start_date,
+            end_date,
+            service_name,
+            get_ebo_wallet_data,
+            ebo_result=fetched["ebo"],
+        )
 
     except SQLAlchemyError as e:
         logger.error(f"Database error in Matm_Service(): {e}")
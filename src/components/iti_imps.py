@@ -2,45 +2,17 @@ import pandas as pd
 from logger_config import logger
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy import text
-from db_connector import get_db_connection
+from query_executor import execute_sql_with_retry
 from logger_config import logger
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy import text
-from tenacity import (
-    retry,
-    stop_after_attempt,
-    wait_exponential,
-    retry_if_exception_type,
-)
-from sqlalchemy.exc import OperationalError, DatabaseError
+from components.reference_matcher import match_references
 from components.recon_utils import (
     map_status_column,
     map_tenant_id_column,
     merge_ebo_wallet_data,
 )
 
-engine = get_db_connection()
-
-# Configure retry logic for database operations
-DB_RETRY_CONFIG = {
-    "stop": stop_after_attempt(3),
-    "wait": wait_exponential(multiplier=1, min=1, max=10),
-    "retry": retry_if_exception_type((OperationalError, DatabaseError)),
-    "reraise": True,
-}
-
-
-@retry(**DB_RETRY_CONFIG)
-def execute_sql_with_retry(query, params=None):
-    logger.info("Entered helper function to execute SQL with retry logic")
-    with engine.connect().execution_options(stream_results=True) as connection:
-        try:
-            df = pd.read_sql(query, con=connection, params=params)
-            return df
-        except Exception as e:
-            logger.error(f"Error during SQL execution: {e}")
-            raise
-
 
 def imps_service_function(start_date, end_date, service_name, df_excel):
     logger.info(f"Fetching data from HUB for {service_name}")
@@ -67,7 +39,7 @@ def imps_service_function(start_date, end_date, service_name, df_excel):
     ait.trans_amt as REQUEST_AMOUNT,DATE(ait.post_dt) as SERVICE_DATE,ait.status as service_status
     from iti_portal.axis_imps_trans ait 
     LEFT JOIN iti_portal.users u on ait.users_id = u.id 
-    WHERE DATE(ait.post_dt) BETWEEN :start_date AND :end_date AND ait.utr_no IS NOT NULL 
+    WHERE ait.post_dt >= CONCAT(:start_date, ' 00:00:00') AND ait.post_dt < DATE_ADD(CONCAT(:end_date, ' 00:00:00'), INTERVAL 1 DAY) AND ait.utr_no IS NOT NULL 
     AND ait.utr_no <> '' 
     """
     )
@@ -77,7 +49,9 @@ def imps_service_function(start_date, end_date, service_name, df_excel):
     }
     try:
         # Safe query execution with retry
-        df_db = execute_sql_with_retry(query, params=params)
+        df_db = execute_sql_with_retry(
+            query, params=params, stream=True, coerce_float=True
+        )
 
         if df_db.empty:
             logger.warning(f"No data returned for service: {service_name}")
@@ -118,27 +92,18 @@ def imps_service_function(start_date, end_date, service_name, df_excel):
             existing_cols = [col for col in columns if col in df.columns]
             return df[existing_cols].copy()
 
-        refid_list = df_excel["REFID"].dropna().astype(str).str.strip()
-
-        not_in_vendor = df_db[
-            (~df_db["VENDOR_REFERENCE"].astype(str).str.strip().isin(refid_list))
-            | (df_db["VENDOR_REFERENCE"].isna())
-            | (df_db["VENDOR_REFERENCE"].astype(str).str.strip() == "")
-        ].copy()
-
+        not_in_vendor, not_in_portal, matched = match_references(
+            df_db, df_excel, "VENDOR_REFERENCE", "REFID"
+        )
+        not_in_vendor = not_in_vendor.copy()
         not_in_vendor["CATEGORY"] = "NOT_IN_VENDOR"
         not_in_vendor = not_in_vendor.rename(columns={"VENDOR_REFERENCE": "REFID"})
         not_in_vendor = safe_column_select(not_in_vendor, required_columns)
 
-        not_in_portal = df_excel[
-            ~df_excel["REFID"].isin(df_db["VENDOR_REFERENCE"])
-        ].copy()
+        not_in_portal = not_in_portal.copy()
         not_in_portal["CATEGORY"] = "NOT_IN_PORTAL"
         not_in_portal = safe_column_select(not_in_portal, required_columns)
 
-        matched = df_db.merge(
-            df_excel, left_on="VENDOR_REFERENCE", right_on="REFID", how="inner"
-        ).copy()
         matched["CATEGORY"] = "MATCHED"
         matched = safe_column_select(matched, required_columns)
         # print(matched[matched['IHUB_LEDGER_STATUS'] == 'No'])
@@ -0,0 +1,71 @@
+"""
+ledger_index.py - Ledger presence flags from cached wallet reference sets.
+
+The distinct IHubReferenceId sets of IHubWalletTransaction and
+TenantWalletTransaction are fetched once per date range and shared by every
+service, instead of each hub query LEFT JOINing its own DISTINCT subquery.
+"""
+
+import pandas as pd
+from sqlalchemy import text
+from logger_config import logger
+from query_executor import execute_sql_with_retry
+from label_columns import flag_column
+from ttl_cache import TTLCache
+
+LEDGER_TABLES = {
+    "IHUB": "ihubcore.IHubWalletTransaction",
+    "TENANT": "ihubcore.TenantWalletTransaction",
+}
+
+# A handful of date ranges per ledger; entries are short-lived because the
+# current day's ledgers keep growing.
+_ledger_cache = TTLCache("ledger_refs", maxsize=16, ttl=300)
+
+
+def _load_ledger_refs(ledger, start_date, end_date):
+    query = text(
+        f"""
+        SELECT DISTINCT IHubReferenceId FROM {LEDGER_TABLES[ledger]}
+        WHERE CreationTs >= CONCAT(:start_date, ' 00:00:00') AND CreationTs < DATE_ADD(CONCAT(:end_date, ' 00:00:00'), INTERVAL 1 DAY)
+        """
+    )
+    df = execute_sql_with_retry(
+        query,
+        params={"start_date": start_date, "end_date": end_date},
+        name=f"ledger_refs_{ledger.lower()}",
+    )
+    if df.empty:
+        return pd.Index([], dtype=object)
+    refs = pd.Index(df["IHubReferenceId"].dropna().unique())
+    logger.info(f"Loaded {len(refs)} {ledger} ledger references")
+    return refs
+
+
+def get_ledger_refs(ledger, start_date, end_date):
+    """Distinct IHubReferenceIds in the given ledger ("IHUB"/"TENANT") for the range."""
+    key = (ledger, str(start_date), str(end_date))
+    return _ledger_cache.get_or_load(
+        key, lambda: _load_ledger_refs(ledger, start_date, end_date)
+    )
+
+
+def apply_ledger_flags(
+    df: pd.DataFrame,
+    start_date,
+    end_date,
+    ref_col: str = "IHUB_REFERENCE",
+    tenant: bool = True,
+) -> pd.DataFrame:
+    """Add IHUB_LEDGER_STATUS (and TENANT_LEDGER_STATUS) as Yes/No categorical columns."""
+    if df.empty or ref_col not in df.columns:
+        return df
+    refs = df[ref_col]
+    df["IHUB_LEDGER_STATUS"] = flag_column(
+        refs.isin(get_ledger_refs("IHUB", start_date, end_date))
+    )
+    if tenant:
+        df["TENANT_LEDGER_STATUS"] = flag_column(
+            refs.isin(get_ledger_refs("TENANT", start_date, end_date))
+        )
+    return df
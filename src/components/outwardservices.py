@@ -1,49 +1,24 @@
 import pandas as pd
 import logging
-from db_connector import get_db_connection
+from query_executor import (
+    execute_sql_with_retry,
+    execute_with_keys,
+    STREAM_CHUNK_SIZE,
+)
+from snapshot_store import execute_by_day
 from logger_config import logger
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy import text
-from tenacity import (
-    retry,
-    stop_after_attempt,
-    wait_exponential,
-    retry_if_exception_type,
-)
-from sqlalchemy.exc import OperationalError, DatabaseError
 from components.recon_utils import (
     map_status_column,
     map_tenant_id_column,
     merge_ebo_wallet_data,
+    fetch_hub_inputs,
+    DB_SERVICE_NAME_CONFIG,
+    HUB_AMOUNT_DTYPES,
 )
-
-
-engine = get_db_connection()
-
-# Configure retry logic for database operations
-DB_RETRY_CONFIG = {
-    "stop": stop_after_attempt(3),
-    "wait": wait_exponential(multiplier=1, min=1, max=10),
-    "retry": retry_if_exception_type((OperationalError, DatabaseError)),
-    "reraise": True,
-}
-
-
-####
-@retry(**DB_RETRY_CONFIG)
-def execute_sql_with_retry(query, params=None):
-    logger.info("Entered helper function to execute SQL with retry logic")
-
-    try:
-        with engine.connect() as connection:
-            result = connection.execute(query, params or {})
-            df = pd.DataFrame(
-                result.fetchall(), columns=result.keys()
-            )  # Fully fetches all rows
-            return df
-    except Exception as e:
-        logger.error(f"Error during SQL execution: {e}")
-        raise
+from components.ledger_index import apply_ledger_flags
+from label_columns import FLAG_DTYPE, as_category, flag_column
 
 
 def getServiceId(MasterServiceId, MasterVendorId):
@@ -77,10 +52,29 @@ def getServiceId(MasterServiceId, MasterVendorId):
     return result
 
 
-def get_ebo_wallet_data(start_date, end_date, db_service_name):
-    logger.info("Fetching Data from EBO Wallet Transaction")
-    ebo_df = None
+# Columns of get_ebo_wallet_data()'s result, merged onto the hub rows
+EBO_WALLET_COLUMNS = [
+    "IHubReferenceId",
+    "MasterTransactionsId",
+    "TRANSACTION_CREDIT",
+    "TRANSACTION_DEBIT",
+    "COMMISSION_CREDIT",
+    "COMMISSION_REVERSAL",
+]
+# The Yes/No flags among them, held as FLAG_DTYPE categoricals
+EBO_FLAG_COLUMNS = EBO_WALLET_COLUMNS[2:]
+
+# FROM clause of the master transactions whose wallet rows are read: every
+# transaction in the range, or only those of the service's own hub rows
+# (the `hub` CTE of fetch_hub_with_ebo_wallet_data)
+_EBO_MASTER_ALL = "ihubcore.MasterTransaction mt2"
+_EBO_MASTER_HUB = (
+    "hub h JOIN ihubcore.MasterTransaction mt2 "
+    "ON mt2.TransactionRefNum = h.IHUB_REFERENCE"
+)
 
+
+def _ebo_wallet_params(start_date, end_date, db_service_name):
     # Define transaction credit descriptions based on service type
     if db_service_name == "%AEPS%":
         transaction_credit_descriptions = [
@@ -110,9 +104,20 @@ def get_ebo_wallet_data(start_date, end_date, db_service_name):
         "Commission Reversal",
         "Manual Refund Debit - Commission - Reversal",
     ]
-
+    return {
+        "start_date": start_date,
+        "end_date": end_date,
+        "db_service_name": db_service_name,
+        "transaction_credit_descriptions": tuple(transaction_credit_descriptions),
+        "transaction_debit_descriptions": tuple(transaction_debit_descriptions),
+        "commission_credit_descriptions": tuple(commission_credit_descriptions),
+        "commission_reversal_descriptions": tuple(commission_reversal_descriptions),
+    }
+
+
+def _ebo_wallet_sql(master_source=_EBO_MASTER_ALL):
     # Build the query using parameterized descriptions
-    base_query = """
+    return f"""
         SELECT  
             Finall.IHubReferenceId,
             Finall.MasterTransactionsId,
@@ -129,7 +134,7 @@ def get_ebo_wallet_data(start_date, end_date, db_service_name):
                 MAX(CASE WHEN ewt.Description IN :transaction_debit_descriptions THEN 'Yes' ELSE 'No' END) AS TRANSACTION_DEBIT,
                 MAX(CASE WHEN ewt.Description IN :commission_credit_descriptions THEN 'Yes' ELSE 'No' END) AS COMMISSION_CREDIT,
                 MAX(CASE WHEN ewt.Description IN :commission_reversal_descriptions THEN 'Yes' ELSE 'No' END) AS COMMISSION_REVERSAL
-            FROM ihubcore.MasterTransaction mt2
+            FROM {master_source}
             JOIN tenantinetcsc.EboWalletTransaction ewt
                 ON mt2.TenantMasterTransactionId = ewt.MasterTransactionsId
             WHERE mt2.CreationTs >= CONCAT(:start_date, ' 00:00:00')
@@ -149,7 +154,7 @@ def get_ebo_wallet_data(start_date, end_date, db_service_name):
                 MAX(CASE WHEN ewt.Description IN :transaction_debit_descriptions THEN 'Yes' ELSE 'No' END) AS TRANSACTION_DEBIT,
                 MAX(CASE WHEN ewt.Description IN :commission_credit_descriptions THEN 'Yes' ELSE 'No' END) AS COMMISSION_CREDIT,
                 MAX(CASE WHEN ewt.Description IN :commission_reversal_descriptions THEN 'Yes' ELSE 'No' END) AS COMMISSION_REVERSAL
-            FROM ihubcore.MasterTransaction mt2
+            FROM {master_source}
             JOIN tenantinetcsc.EboWalletTransaction ewt
                 ON mt2.TransactionRefNum = ewt.IHubReferenceId
             WHERE mt2.CreationTs >= CONCAT(:start_date, ' 00:00:00')
@@ -162,25 +167,49 @@ def get_ebo_wallet_data(start_date, end_date, db_service_name):
         GROUP BY Finall.IHubReferenceId
     """
 
-    query = text(base_query)
 
+def _merge_null_id_rows(ebo_df):
+    """Fold the flags of NULL-MasterTransactionsId rows into the proper rows."""
+    null_rows = ebo_df[ebo_df["MasterTransactionsId"].isna()]
+    non_null_rows = ebo_df[ebo_df["MasterTransactionsId"].notna()]
+
+    # Only proceed with merging if we have both null and non-null rows
+    if not null_rows.empty and not non_null_rows.empty:
+        flag_cols = EBO_FLAG_COLUMNS
+
+        # A flag becomes "Yes" on the proper row when any NULL-ID row for the
+        # same IHubReferenceId has it set; existing values are never downgraded.
+        null_yes = (
+            (null_rows[flag_cols] == "Yes")
+            .groupby(null_rows["IHubReferenceId"])
+            .any()
+        )
+        upgrade = null_yes.reindex(
+            non_null_rows["IHubReferenceId"], fill_value=False
+        ).to_numpy(dtype=bool)
+        non_null_rows = non_null_rows.copy()
+        non_null_rows[flag_cols] = non_null_rows[flag_cols].mask(upgrade, "Yes")
+
+        # Return only non-null rows with merged values
+        return non_null_rows.reset_index(drop=True)
+    # If all rows are null OR all rows are non-null, keep original data
+    return ebo_df.reset_index(drop=True)
+
+
+def _flags_as_category(ebo_df):
+    for col in EBO_FLAG_COLUMNS:
+        if col in ebo_df.columns:
+            ebo_df[col] = as_category(ebo_df[col], FLAG_DTYPE.categories)
+    return ebo_df
+
+
+def get_ebo_wallet_data(start_date, end_date, db_service_name):
+    logger.info("Fetching Data from EBO Wallet Transaction")
     try:
         # Execute query with retry
         ebo_df = execute_sql_with_retry(
-            query,
-            params={
-                "start_date": start_date,
-                "end_date": end_date,
-                "db_service_name": db_service_name,
-                "transaction_credit_descriptions": tuple(
-                    transaction_credit_descriptions
-                ),
-                "transaction_debit_descriptions": tuple(transaction_debit_descriptions),
-                "commission_credit_descriptions": tuple(commission_credit_descriptions),
-                "commission_reversal_descriptions": tuple(
-                    commission_reversal_descriptions
-                ),
-            },
+            text(_ebo_wallet_sql()),
+            params=_ebo_wallet_params(start_date, end_date, db_service_name),
         )
 
         if ebo_df.empty:
@@ -190,43 +219,7 @@ def get_ebo_wallet_data(start_date, end_date, db_service_name):
         # =============================
         # Merge multiple NULL-ID rows into proper rows
         # =============================
-        null_rows = ebo_df[ebo_df["MasterTransactionsId"].isna()]
-        non_null_rows = ebo_df[ebo_df["MasterTransactionsId"].notna()]
-
-        # Only proceed with merging if we have both null and non-null rows
-        if not null_rows.empty and not non_null_rows.empty:
-            flag_cols = [
-                "TRANSACTION_CREDIT",
-                "TRANSACTION_DEBIT",
-                "COMMISSION_CREDIT",
-                "COMMISSION_REVERSAL",
-            ]
-
-            for hub_id in null_rows["IHubReferenceId"].unique():
-                null_subset = null_rows[null_rows["IHubReferenceId"] == hub_id]
-                target_index = non_null_rows[
-                    non_null_rows["IHubReferenceId"] == hub_id
-                ].index
-
-                if not target_index.empty:
-                    for col in flag_cols:
-                        merged_flag = (
-                            "Yes" if (null_subset[col] == "Yes").any() else "No"
-                        )
-                        non_null_rows.loc[target_index, col] = non_null_rows.loc[
-                            target_index, col
-                        ].combine(
-                            pd.Series(
-                                [merged_flag] * len(target_index), index=target_index
-                            ),
-                            lambda x, y: "Yes" if y == "Yes" else x,
-                        )
-
-            # Return only non-null rows with merged values
-            ebo_df = non_null_rows.reset_index(drop=True)
-        else:
-            # If all rows are null OR all rows are non-null, keep original data
-            ebo_df = ebo_df.reset_index(drop=True)
+        ebo_df = _flags_as_category(_merge_null_id_rows(ebo_df))
 
     except SQLAlchemyError as e:
         logger.error(f"Database error in EBO Wallet Query: {e}")
@@ -238,6 +231,53 @@ def get_ebo_wallet_data(start_date, end_date, db_service_name):
     return ebo_df
 
 
+def fetch_hub_with_ebo_wallet_data(query, params, service_name, name=None):
+    """
+    Hub rows and their EBO wallet flags from one query, for small services.
+
+    The service's hub query becomes a CTE that drives the wallet lookup, so
+    only the wallet rows of the service's own transactions are read instead
+    of the whole 30-day EboWalletTransaction window. Returns (hub_df, ebo_df)
+    shaped like the hub query and get_ebo_wallet_data() would return them.
+    """
+    name = name or f"{service_name.lower()}_with_ebo_wallet"
+    db_service_name = DB_SERVICE_NAME_CONFIG[service_name]["Db_service_name"]
+    combined_query = text(
+        f"""
+        WITH hub AS ({query.text}),
+        ebo AS ({_ebo_wallet_sql(_EBO_MASTER_HUB)})
+        SELECT hub.*, {", ".join(f"ebo.{col}" for col in EBO_WALLET_COLUMNS)}
+        FROM hub
+        LEFT JOIN ebo ON ebo.IHubReferenceId = hub.IHUB_REFERENCE
+        """
+    )
+    df = execute_sql_with_retry(
+        combined_query,
+        params={
+            **_ebo_wallet_params(
+                params["start_date"], params["end_date"], db_service_name
+            ),
+            **params,
+        },
+        name=name,
+    )
+    hub_df = df.drop(columns=EBO_WALLET_COLUMNS)
+    ebo_df = (
+        df[EBO_WALLET_COLUMNS]
+        .dropna(subset=["IHubReferenceId"])
+        .drop_duplicates(subset=["IHubReferenceId"])
+    )
+    if ebo_df.empty:
+        logger.warning("No data returned from EBO Wallet table.")
+        return hub_df, pd.DataFrame()
+    # The LEFT JOIN makes the id column float when some hub rows have no
+    # wallet rows; restore the integer ids the standalone query returns.
+    ids = ebo_df["MasterTransactionsId"]
+    if ids.dtype.kind == "f" and ids.notna().all():
+        ebo_df = ebo_df.astype({"MasterTransactionsId": "int64"})
+    return hub_df, _flags_as_category(_merge_null_id_rows(ebo_df))
+
+
 # Recharge service function ---------------------------------------------------
 def recharge_Service(start_date, end_date, service_name):
     logger.info(f"Fetching data from HUB for {service_name}")
@@ -252,34 +292,29 @@ def recharge_Service(start_date, end_date, service_name):
                mst.NetCommissionAddedToEBOWallet AS COMMISSION_AMOUNT,
                sn.CreationTs AS SERVICE_DATE, 
                sn.rechargeStatus AS service_status,
-               sn.Amount as HUB_AMOUNT,
-               CASE
-                   WHEN iwt.IHubReferenceId IS NOT NULL THEN 'Yes'
-                   ELSE 'No'
-               END AS IHUB_LEDGER_STATUS,
-               CASE
-                   WHEN twt.IHubReferenceId IS NOT NULL THEN 'Yes'
-                   ELSE 'No'
-               END AS TENANT_LEDGER_STATUS
+               sn.Amount as HUB_AMOUNT
         FROM ihubcore.MasterTransaction mt2
         LEFT JOIN ihubcore.MasterSubTransaction mst ON mst.MasterTransactionId = mt2.Id
         LEFT JOIN ihubcore.PsRechargeTransaction sn ON sn.MasterSubTransactionId = mst.Id
-        LEFT JOIN (
-            SELECT DISTINCT IHubReferenceId
-            FROM ihubcore.IHubWalletTransaction
-            WHERE DATE(CreationTs) BETWEEN :start_date AND :end_date
-        ) iwt ON iwt.IHubReferenceId = mt2.TransactionRefNum
-        LEFT JOIN (
-            SELECT DISTINCT IHubReferenceId
-            FROM ihubcore.TenantWalletTransaction
-            WHERE DATE(CreationTs) BETWEEN :start_date AND :end_date
-        ) twt ON twt.IHubReferenceId = mt2.TransactionRefNum
-        WHERE DATE(sn.CreationTs) BETWEEN :start_date AND :end_date
+        WHERE sn.CreationTs >= CONCAT(:start_date, ' 00:00:00') AND sn.CreationTs < DATE_ADD(CONCAT(:end_date, ' 00:00:00'), INTERVAL 1 DAY)
     """
     )
     params = {"start_date": start_date, "end_date": end_date}
     try:
-        df_db = execute_sql_with_retry(query, params=params)
+        fetched = fetch_hub_inputs(
+            lambda: execute_by_day(
+                query,
+                params=params,
+                name="recharge_Service",
+                chunksize=STREAM_CHUNK_SIZE,
+                dtypes=HUB_AMOUNT_DTYPES,
+            ),
+            start_date,
+            end_date,
+            service_name,
+            get_ebo_wallet_data,
+        )
+        df_db = fetched["hub"]
         if df_db.empty:
             logger.warning(f"No data returned for service: {service_name}")
             return pd.DataFrame()
@@ -297,9 +332,15 @@ def recharge_Service(start_date, end_date, service_name):
             new_column=f"{service_name}_STATUS",
             drop_original=True,
         )
+        df_db = apply_ledger_flags(df_db, start_date, end_date)
         df_db = map_tenant_id_column(df_db)
         result = merge_ebo_wallet_data(
-            df_db, start_date, end_date, service_name, get_ebo_wallet_data
+            df_db,
+            start_date,
+            end_date,
+            service_name,
+            get_ebo_wallet_data,
+            ebo_result=fetched["ebo"],
         )
     except SQLAlchemyError as e:
         logger.error(f"Database error in recharge_Service(): {e}")
@@ -333,51 +374,41 @@ def Bbps_service(start_date, end_date, service_name):
     LEFT JOIN ihubcore.MasterSubTransaction mst ON mst.MasterTransactionId = mt2.Id
     LEFT JOIN ihubcore.BBPS_BillPay bbp ON bbp.MasterSubTransactionId = mst.Id
     LEFT JOIN ihubcore.BBPS_BillerDetail bbd ON bbd.id = bbp.BBPS_BillerDetailId 
-    WHERE DATE(bbp.CreationTs) BETWEEN :start_date AND :end_date
+    WHERE bbp.CreationTs >= CONCAT(:start_date, ' 00:00:00') AND bbp.CreationTs < DATE_ADD(CONCAT(:end_date, ' 00:00:00'), INTERVAL 1 DAY)
     """
     )
-    params = {"start_date": start_date, "end_date": end_date}
-
-    core_df = execute_sql_with_retry(core_query, params=params)
-
-    # Step 2: Load flags
-    query = text(
-        f"""
-        SELECT DISTINCT IHubReferenceId FROM ihubcore.IHubWalletTransaction WHERE  DATE(creationTs) BETWEEN :start_date AND :end_date
-    """
-    )
-    ihub_refs = execute_sql_with_retry(query, params=params)
-
     # Step 2: Load flags
     query = text(
         f"""
-        SELECT DISTINCT HeadReferenceId FROM ihubcore.BBPS_BillFetch WHERE  DATE(creationTs) BETWEEN :start_date AND :end_date
+        SELECT DISTINCT HeadReferenceId FROM ihubcore.BBPS_BillFetch WHERE  creationTs >= CONCAT(:start_date, ' 00:00:00') AND creationTs < DATE_ADD(CONCAT(:end_date, ' 00:00:00'), INTERVAL 1 DAY)
     """
     )
-    bbps_fetch_ids = execute_sql_with_retry(query, params=params)
+    params = {"start_date": start_date, "end_date": end_date}
 
-    query = text(
-        f"""
-        SELECT DISTINCT IHubReferenceId FROM ihubcore.TenantWalletTransaction WHERE  DATE(CreationTs) BETWEEN :start_date AND :end_date
-    """
+    # Core rows, bill-fetch ids, ledger refs and EBO wallet flags in parallel
+    fetched = fetch_hub_inputs(
+        lambda: execute_by_day(
+            core_query,
+            params=params,
+            name="Bbps_service",
+            chunksize=STREAM_CHUNK_SIZE,
+            dtypes=HUB_AMOUNT_DTYPES,
+        ),
+        start_date,
+        end_date,
+        service_name,
+        get_ebo_wallet_data,
+        bill_fetch=lambda: execute_sql_with_retry(
+            query, params=params, name="Bbps_service_bill_fetch"
+        ),
     )
-    tenant_refs = execute_sql_with_retry(query, params=params)
+    core_df = fetched["hub"]
+    bbps_fetch_ids = fetched["bill_fetch"]
 
     # Step 3: Add flags to core_df
-    core_df["IHUB_LEDGER_STATUS"] = (
-        core_df["IHUB_REFERENCE"]
-        .isin(ihub_refs["IHubReferenceId"])
-        .map({True: "Yes", False: "No"})
-    )
-    core_df["BILL_FETCH_STATUS"] = (
-        core_df["HeadReferenceId"]
-        .isin(bbps_fetch_ids["HeadReferenceId"])
-        .map({True: "Yes", False: "No"})
-    )
-    core_df["TENANT_LEDGER_STATUS"] = (
-        core_df["IHUB_REFERENCE"]
-        .isin(tenant_refs["IHubReferenceId"])
-        .map({True: "Yes", False: "No"})
+    core_df = apply_ledger_flags(core_df, start_date, end_date)
+    core_df["BILL_FETCH_STATUS"] = flag_column(
+        core_df["HeadReferenceId"].isin(bbps_fetch_ids["HeadReferenceId"])
     )
 
     # Final result
@@ -405,7 +436,12 @@ def Bbps_service(start_date, end_date, service_name):
         )
         core_df = map_tenant_id_column(core_df)
         result = merge_ebo_wallet_data(
-            core_df, start_date, end_date, service_name, get_ebo_wallet_data
+            core_df,
+            start_date,
+            end_date,
+            service_name,
+            get_ebo_wallet_data,
+            ebo_result=fetched["ebo"],
         )
     except SQLAlchemyError as e:
         logger.error(f"Databasr error in BBPS_SERVICE():{e}")
@@ -430,34 +466,23 @@ def Panuti_service(start_date, end_date, service_name):
                mt2.TransactionStatus AS IHUB_MASTER_STATUS,
                u2.CreationTs  AS SERVICE_DATE, 
                u2.TransactionStatusType AS service_status,
-               u2.TransactionAmount  as HUB_AMOUNT,
-               CASE
-                   WHEN iwt.IHubReferenceId IS NOT NULL THEN 'Yes'
-                   ELSE 'No'
-               END AS IHUB_LEDGER_STATUS,
-               CASE
-                   WHEN twt.IHubReferenceId IS NOT NULL THEN 'Yes'
-                   ELSE 'No'
-               END AS TENANT_LEDGER_STATUS
+               u2.TransactionAmount  as HUB_AMOUNT
         FROM ihubcore.UTIITSLTTransaction u2  
         LEFT JOIN ihubcore.MasterSubTransaction mst ON u2.MasterSubTransactionId = mst.Id 
         LEFT JOIN ihubcore.MasterTransaction mt2 ON mst.MasterTransactionId = mt2.Id
-        LEFT JOIN (
-            SELECT DISTINCT IHubReferenceId
-            FROM ihubcore.IHubWalletTransaction
-            WHERE DATE(CreationTs) BETWEEN :start_date and :end_date
-        ) iwt ON iwt.IHubReferenceId = mt2.TransactionRefNum
-        LEFT JOIN (
-            SELECT DISTINCT IHubReferenceId
-            FROM ihubcore.TenantWalletTransaction
-            WHERE DATE(CreationTs) BETWEEN :start_date and :end_date
-        ) twt ON twt.IHubReferenceId = mt2.TransactionRefNum
-        WHERE DATE(u2.CreationTs) BETWEEN :start_date and :end_date
+        WHERE u2.CreationTs >= CONCAT(:start_date, ' 00:00:00') AND u2.CreationTs < DATE_ADD(CONCAT(:end_date, ' 00:00:00'), INTERVAL 1 DAY)
         """
     )
     params = {"start_date": start_date, "end_date": end_date}
     try:
-        df_db = execute_sql_with_retry(query, params=params)
+        fetched = fetch_hub_inputs(
+            lambda: execute_by_day(query, params=params, name="Panuti_service"),
+            start_date,
+            end_date,
+            service_name,
+            get_ebo_wallet_data,
+        )
+        df_db = fetched["hub"]
         if df_db.empty:
             logger.warning(f"No data returned for service:{service_name}")
             return pd.DataFrame()
@@ -472,9 +497,15 @@ def Panuti_service(start_date, end_date, service_name):
             new_column=f"{service_name}_STATUS",
             drop_original=True,
         )
+        df_db = apply_ledger_flags(df_db, start_date, end_date)
         df_db = map_tenant_id_column(df_db)
         result = merge_ebo_wallet_data(
-            df_db, start_date, end_date, service_name, get_ebo_wallet_data
+            df_db,
+            start_date,
+            end_date,
+            service_name,
+            get_ebo_wallet_data,
+            ebo_result=fetched["ebo"],
         )
     except SQLAlchemyError as e:
         logger.error(f"Databasr error in PAN_UTI_SERVICE():{e}")
@@ -497,38 +528,33 @@ def dmt_Service(start_date, end_date, service_name):
             pst.PaySprintTransStatus as service_status,
             pst.Amount as HUB_AMOUNT,
             pst.CreationTs AS SERVICE_DATE,
-            mt2.TenantDetailId as TENANT_ID,
-            CASE
-            WHEN a.IHubReferenceId  IS NOT NULL THEN 'Yes'
-            ELSE 'No'
-            END AS IHUB_LEDGER_STATUS,
-            CASE
-                   WHEN twt.IHubReferenceId IS NOT NULL THEN 'Yes'
-                   ELSE 'No'
-               END AS TENANT_LEDGER_STATUS
+            mt2.TenantDetailId as TENANT_ID
             FROM
             ihubcore.MasterTransaction mt2
             LEFT JOIN
             ihubcore.MasterSubTransaction mst ON mst.MasterTransactionId = mt2.Id
             LEFT JOIN
             ihubcore.PaySprint_Transaction pst ON pst.MasterSubTransactionId = mst.Id
-            LEFT JOIN
-            (SELECT DISTINCT iwt.IHubReferenceId AS IHubReferenceId
-            FROM ihubcore.IHubWalletTransaction iwt
-            WHERE DATE(iwt.CreationTs) BETWEEN :start_date and :end_date
-            ) a ON a.IHubReferenceId = mt2.TransactionRefNum
-            LEFT JOIN (
-            SELECT DISTINCT IHubReferenceId
-            FROM ihubcore.TenantWalletTransaction
-            WHERE DATE(CreationTs) BETWEEN :start_date and :end_date
-            ) twt ON twt.IHubReferenceId = mt2.TransactionRefNum
             WHERE
-            DATE(pst.CreationTs) BETWEEN :start_date and :end_date 
+            pst.CreationTs >= CONCAT(:start_date, ' 00:00:00') AND pst.CreationTs < DATE_ADD(CONCAT(:end_date, ' 00:00:00'), INTERVAL 1 DAY) 
             """
     )
     params = {"start_date": start_date, "end_date": end_date}
     try:
-        df_db = execute_sql_with_retry(query, params=params)
+        fetched = fetch_hub_inputs(
+            lambda: execute_by_day(
+                query,
+                params=params,
+                name="dmt_Service",
+                chunksize=STREAM_CHUNK_SIZE,
+                dtypes=HUB_AMOUNT_DTYPES,
+            ),
+            start_date,
+            end_date,
+            service_name,
+            get_ebo_wallet_data,
+        )
+        df_db = fetched["hub"]
         df_db["VENDOR_REFERENCE"] = df_db["VENDOR_REFERENCE"].astype(str)
         if df_db.empty:
             logger.warning(f"No data returned for service:{service_name}")
@@ -549,10 +575,16 @@ def dmt_Service(start_date, end_date, service_name):
             new_column=f"{service_name}_STATUS",
             drop_original=True,
         )
+        df_db = apply_ledger_flags(df_db, start_date, end_date)
         df_db = map_tenant_id_column(df_db)
 
         result = merge_ebo_wallet_data(
-            df_db, start_date, end_date, service_name, get_ebo_wallet_data
+            df_db,
+            start_date,
+            end_date,
+            service_name,
+            get_ebo_wallet_data,
+            ebo_result=fetched["ebo"],
         )
     except SQLAlchemyError as e:
         logger.error(f"Databasr error in DMT_SERVICE():{e}")
@@ -576,41 +608,33 @@ def Pannsdl_service(start_date, end_date, service_name):
                mst.NetCommissionAddedToEBOWallet AS COMMISSION_AMOUNT,
                DATE(pit.CreationTs)  AS SERVICE_DATE, 
                pit.ApplicationStatus AS service_status,
-               pit.Amount as HUB_AMOUNT,
-               CASE
-                   WHEN iwt.IHubReferenceId IS NOT NULL THEN 'Yes'
-                   ELSE 'No'
-               END AS IHUB_LEDGER_STATUS,
-               CASE
-                   WHEN twt.IHubReferenceId IS NOT NULL THEN 'Yes'
-                   ELSE 'No'
-               END AS TENANT_LEDGER_STATUS
+               pit.Amount as HUB_AMOUNT
         FROM ihubcore.PanInTransaction pit  
         LEFT JOIN ihubcore.MasterSubTransaction mst ON pit.MasterSubTransactionId = mst.Id 
         LEFT JOIN ihubcore.MasterTransaction mt2 ON mst.MasterTransactionId = mt2.Id
-        LEFT JOIN (
-            SELECT DISTINCT IHubReferenceId
-            FROM ihubcore.IHubWalletTransaction
-            WHERE DATE(CreationTs) BETWEEN :start_date and :end_date
-        ) iwt ON iwt.IHubReferenceId = mt2.TransactionRefNum
-        LEFT JOIN (
-            SELECT DISTINCT IHubReferenceId
-            FROM ihubcore.TenantWalletTransaction
-            WHERE DATE(CreationTs) BETWEEN :start_date and :end_date
-        ) twt ON twt.IHubReferenceId = mt2.TransactionRefNum
-        WHERE DATE(pit.ApplicationStatusTs) BETWEEN :start_date and :end_date and pit.AcknowledgeNo  IS NOT NULL
+        WHERE pit.ApplicationStatusTs >= CONCAT(:start_date, ' 00:00:00') AND pit.ApplicationStatusTs < DATE_ADD(CONCAT(:end_date, ' 00:00:00'), INTERVAL 1 DAY) and pit.AcknowledgeNo  IS NOT NULL
         """
     )
     iti_query = text(
         """
         Select u.apna_id as IHUB_USERNAME,pn.application_no AS VENDOR_REFERENCE,pn.amount as HUB_AMOUNT,pn.status as service_status,DATE(pn.post_dt) as SERVICE_DATE from iti_portal.pan_nsdl pn
         LEFT JOIN iti_portal.users u on u.id = pn.users_id 
-        where DATE(pn.post_dt) BETWEEN :start_date and :end_date and pn.application_no IS NOT NULL"""
+        where pn.post_dt >= CONCAT(:start_date, ' 00:00:00') AND pn.post_dt < DATE_ADD(CONCAT(:end_date, ' 00:00:00'), INTERVAL 1 DAY) and pn.application_no IS NOT NULL"""
     )
     params = {"start_date": start_date, "end_date": end_date}
     try:
-        df_db = execute_sql_with_retry(query, params=params)
-        pan_nsdl_iti_df = execute_sql_with_retry(iti_query, params=params)
+        fetched = fetch_hub_inputs(
+            lambda: execute_sql_with_retry(query, params=params, name="Pannsdl_service"),
+            start_date,
+            end_date,
+            service_name,
+            get_ebo_wallet_data,
+            iti=lambda: execute_sql_with_retry(
+                iti_query, params=params, name="Pannsdl_service_iti"
+            ),
+        )
+        df_db = fetched["hub"]
+        pan_nsdl_iti_df = fetched["iti"]
         if df_db.empty:
             logger.warning(f"No data returned for service:{service_name}")
             return pd.DataFrame()
@@ -633,9 +657,15 @@ def Pannsdl_service(start_date, end_date, service_name):
             new_column=f"{service_name}_STATUS",
             drop_original=True,
         )
+        df_db = apply_ledger_flags(df_db, start_date, end_date)
         df_db = map_tenant_id_column(df_db)
         result = merge_ebo_wallet_data(
-            df_db, start_date, end_date, service_name, get_ebo_wallet_data
+            df_db,
+            start_date,
+            end_date,
+            service_name,
+            get_ebo_wallet_data,
+            ebo_result=fetched["ebo"],
         )
     except SQLAlchemyError as e:
         logger.error(f"Databasr error in PAN_NSDL_SERVICE():{e}")
@@ -660,34 +690,23 @@ def passport_service(start_date, end_date, service_name):
                mt2.TenantMasterTransactionId AS TENANT_MASTER_TRANSACTION_ID,
                pi.BankReferenceTs AS SERVICE_DATE, 
                pi.PassportInStatusType AS service_status,
-               pi.Amount as HUB_AMOUNT,
-               CASE
-                   WHEN iwt.IHubReferenceId IS NOT NULL THEN 'Yes'
-                   ELSE 'No'
-               END AS IHUB_LEDGER_STATUS,
-               CASE
-                   WHEN twt.IHubReferenceId IS NOT NULL THEN 'Yes'
-                   ELSE 'No'
-               END AS TENANT_LEDGER_STATUS
+               pi.Amount as HUB_AMOUNT
         FROM ihubcore.PassportIn pi 
         LEFT JOIN ihubcore.MasterSubTransaction mst ON pi.MasterSubTransactionId = mst.Id 
         LEFT JOIN ihubcore.MasterTransaction mt2 ON mst.MasterTransactionId = mt2.Id
-        LEFT JOIN (
-            SELECT DISTINCT IHubReferenceId
-            FROM ihubcore.IHubWalletTransaction
-            WHERE DATE(CreationTs) BETWEEN :start_date AND :end_date
-        ) iwt ON iwt.IHubReferenceId = mt2.TransactionRefNum
-        LEFT JOIN (
-            SELECT DISTINCT IHubReferenceId
-            FROM ihubcore.TenantWalletTransaction
-            WHERE DATE(CreationTs) BETWEEN :start_date AND :end_date
-        ) twt ON twt.IHubReferenceId = mt2.TransactionRefNum
-        WHERE DATE(pi.BankReferenceTs) BETWEEN :start_date AND :end_date      
+        WHERE pi.BankReferenceTs >= CONCAT(:start_date, ' 00:00:00') AND pi.BankReferenceTs < DATE_ADD(CONCAT(:end_date, ' 00:00:00'), INTERVAL 1 DAY)      
     """
     )
     params = {"start_date": start_date, "end_date": end_date}
     try:
-        df_db = execute_sql_with_retry(query, params=params)
+        fetched = fetch_hub_inputs(
+            lambda: execute_by_day(query, params=params, name="passport_service"),
+            start_date,
+            end_date,
+            service_name,
+            get_ebo_wallet_data,
+        )
+        df_db = fetched["hub"]
         if df_db.empty:
             logger.warning(f"No data returned for service: {service_name}")
             return pd.DataFrame()
@@ -707,10 +726,16 @@ def passport_service(start_date, end_date, service_name):
             new_column=f"{service_name}_STATUS",
             drop_original=True,
         )
+        df_db = apply_ledger_flags(df_db, start_date, end_date)
         df_db = map_tenant_id_column(df_db)
 
         result = merge_ebo_wallet_data(
-            df_db, start_date, end_date, service_name, get_ebo_wallet_data
+            df_db,
+            start_date,
+            end_date,
+            service_name,
+            get_ebo_wallet_data,
+            ebo_result=fetched["ebo"],
         )
 
         previous_dated_transactions = result[result["MasterTransactionsId"].isnull()]
@@ -770,9 +795,7 @@ def passport_service(start_date, end_date, service_name):
                 "Manual Refund Debit - Commission - Reversal",
             ]
 
-            # Convert to tuple for SQL IN clause
             params = {
-                "previous_dated_transactions_id": tuple(previous_dated_transactions_id),
                 "db_service_name": "%Passport%",
                 "transaction_credit_descriptions": tuple(
                     transaction_credit_descriptions
@@ -783,7 +806,12 @@ def passport_service(start_date, end_date, service_name):
                     commission_reversal_descriptions
                 ),
             }
-            ebo_previous_df = execute_sql_with_retry(query_previous_ebo, params=params)
+            ebo_previous_df = execute_with_keys(
+                query_previous_ebo,
+                previous_dated_transactions_id,
+                key_param="previous_dated_transactions_id",
+                params=params,
+            )
             if not ebo_previous_df.empty:
                 # Create mapping and mask
                 ebo_mapping = ebo_previous_df.set_index("MasterTransactionsId")[
@@ -839,30 +867,12 @@ def lic_service(start_date, end_date, service_name):
                mt2.TransactionStatus AS IHUB_MASTER_STATUS,
                lpt.CreationTs AS SERVICE_DATE,
                lpf.Billedamount as HUB_AMOUNT, 
-               lpt.BillPayStatus AS service_status,
-               CASE
-                   WHEN iwt.IHubReferenceId IS NOT NULL THEN 'Yes'
-                   ELSE 'No'
-               END AS IHUB_LEDGER_STATUS,
-               CASE
-                   WHEN twt.IHubReferenceId IS NOT NULL THEN 'Yes'
-                   ELSE 'No'
-               END AS TENANT_LEDGER_STATUS
+               lpt.BillPayStatus AS service_status
         FROM ihubcore.LicPremiumTransaction lpt
         LEFT JOIN ihubcore.MasterSubTransaction mst ON lpt.MasterSubTransactionId = mst.Id
         LEFT JOIN ihubcore.MasterTransaction mt2 ON mst.MasterTransactionId = mt2.Id
         LEFT JOIN ihubcore.LicPremiumBillFetch lpf ON lpf.id = lpt.BillFetchId  
-        LEFT JOIN (
-            SELECT DISTINCT IHubReferenceId
-            FROM ihubcore.IHubWalletTransaction
-            WHERE DATE(CreationTs) BETWEEN :start_date AND :end_date
-        ) iwt ON iwt.IHubReferenceId = mt2.TransactionRefNum
-        LEFT JOIN (
-            SELECT DISTINCT IHubReferenceId
-            FROM ihubcore.TenantWalletTransaction
-            WHERE DATE(CreationTs) BETWEEN :start_date AND :end_date
-        ) twt ON twt.IHubReferenceId = mt2.TransactionRefNum
-        WHERE DATE(lpt.CreationTs) BETWEEN :start_date AND :end_date      
+        WHERE lpt.CreationTs >= CONCAT(:start_date, ' 00:00:00') AND lpt.CreationTs < DATE_ADD(CONCAT(:end_date, ' 00:00:00'), INTERVAL 1 DAY)      
     """
     )
     params = {"start_date": start_date, "end_date": end_date}
@@ -870,10 +880,17 @@ def lic_service(start_date, end_date, service_name):
     try:
 
         # Execute with retry logic
-        df_db = execute_sql_with_retry(
-            query,
-            params=params,
+        fetched = fetch_hub_inputs(
+            lambda: execute_by_day(query, params=params, name="lic_service"),
+            start_date,
+            end_date,
+            service_name,
+            get_ebo_wallet_data,
+            fetch_combined=lambda: fetch_hub_with_ebo_wallet_data(
+                query, params, service_name
+            ),
         )
+        df_db = fetched["hub"]
         if df_db.empty:
             logger.warning(f"No data returned for service: {service_name}")
             return pd.DataFrame()
@@ -890,9 +907,15 @@ def lic_service(start_date, end_date, service_name):
             new_column=f"{service_name}_STATUS",
             drop_original=True,
         )
+        df_db = apply_ledger_flags(df_db, start_date, end_date)
         df_db = map_tenant_id_column(df_db)
         result = merge_ebo_wallet_data(
-            df_db, start_date, end_date, service_name, get_ebo_wallet_data
+            df_db,
+            start_date,
+            end_date,
+            service_name,
+            get_ebo_wallet_data,
+            ebo_result=fetched["ebo"],
         )
     except SQLAlchemyError as e:
         logger.error(f"Database error in recharge_Service(): {e}")
@@ -917,36 +940,28 @@ def astro_service(start_date, end_date, service_name):
                mst.NetCommissionAddedToEBOWallet AS COMMISSION_AMOUNT, 
                mt2.TransactionStatus AS IHUB_MASTER_STATUS,
                at2.CreationTs AS SERVICE_DATE, 
-               at2.AstroTransactionStatus AS service_status,
-               CASE
-                   WHEN iwt.IHubReferenceId IS NOT NULL THEN 'Yes'
-                   ELSE 'No'
-               END AS IHUB_LEDGER_STATUS,
-               CASE
-                   WHEN twt.IHubReferenceId IS NOT NULL THEN 'Yes'
-                   ELSE 'No'
-               END AS TENANT_LEDGER_STATUS
+               at2.AstroTransactionStatus AS service_status
         FROM ihubcore.MasterTransaction mt2
         LEFT JOIN ihubcore.MasterSubTransaction mst ON mst.MasterTransactionId = mt2.Id
         LEFT JOIN ihubcore.AstroTransaction at2 ON at2.MasterSubTransactionId = mst.Id
-        LEFT JOIN (
-            SELECT DISTINCT IHubReferenceId
-            FROM ihubcore.IHubWalletTransaction
-            WHERE DATE(CreationTs) BETWEEN :start_date AND :end_date
-        ) iwt ON iwt.IHubReferenceId = mt2.TransactionRefNum
-        LEFT JOIN (
-            SELECT DISTINCT IHubReferenceId
-            FROM ihubcore.TenantWalletTransaction
-            WHERE DATE(CreationTs) BETWEEN :start_date AND :end_date
-        ) twt ON twt.IHubReferenceId = mt2.TransactionRefNum
-        WHERE DATE(at2.CreationTs) BETWEEN :start_date AND :end_date      
+        WHERE at2.CreationTs >= CONCAT(:start_date, ' 00:00:00') AND at2.CreationTs < DATE_ADD(CONCAT(:end_date, ' 00:00:00'), INTERVAL 1 DAY)      
     """
     )
     params = {"start_date": start_date, "end_date": end_date}
 
     try:
 
-        df_db = execute_sql_with_retry(query, params=params)
+        fetched = fetch_hub_inputs(
+            lambda: execute_by_day(query, params=params, name="astro_service"),
+            start_date,
+            end_date,
+            service_name,
+            get_ebo_wallet_data,
+            fetch_combined=lambda: fetch_hub_with_ebo_wallet_data(
+                query, params, service_name
+            ),
+        )
+        df_db = fetched["hub"]
         if df_db.empty:
             logger.warning(f"No data returned for service: {service_name}")
             return pd.DataFrame()
@@ -963,9 +978,15 @@ def astro_service(start_date, end_date, service_name):
             new_column=f"{service_name}_STATUS",
             drop_original=True,
         )
+        df_db = apply_ledger_flags(df_db, start_date, end_date)
         df_db = map_tenant_id_column(df_db)
         result = merge_ebo_wallet_data(
-            df_db, start_date, end_date, service_name, get_ebo_wallet_data
+            df_db,
+            start_date,
+            end_date,
+            service_name,
+            get_ebo_wallet_data,
+            ebo_result=fetched["ebo"],
         )
 
     except SQLAlchemyError as e:
@@ -991,40 +1012,32 @@ def insurance_offline_service(start_date, end_date, service_name):
         mt.TenantDetailId as TENANT_ID,   
         niit.CreationTs AS SERVICE_DATE,
         niit.InsuranceStatusType AS service_status,
-        niit.Amount as HUB_AMOUNT,
-        CASE 
-            WHEN iwt.IHubReferenceId IS NOT NULL THEN 'Yes'
-            ELSE 'No'
-        END AS IHUB_LEDGER_STATUS,
-        CASE
-            WHEN twt.IHubReferenceId IS NOT NULL THEN 'Yes'
-            ELSE 'No'
-        END AS TENANT_LEDGER_STATUS
+        niit.Amount as HUB_AMOUNT
         FROM 
         ihubcore.MasterTransaction mt
         LEFT JOIN ihubcore.MasterSubTransaction mst
             ON  mst.MasterTransactionId =  mt.id 
         LEFT JOIN  ihubcore.NewIndiaInsuranceTransaction niit  
             ON mst.Id = niit.MasterSubTransactionId 
-        LEFT JOIN (
-            SELECT DISTINCT IHubReferenceId
-            FROM ihubcore.IHubWalletTransaction
-            WHERE DATE(CreationTs) BETWEEN :start_date AND :end_date
-        ) iwt ON iwt.IHubReferenceId = mt.TransactionRefNum
-        LEFT JOIN (
-                    SELECT DISTINCT IHubReferenceId
-                    FROM ihubcore.TenantWalletTransaction
-                    WHERE DATE(CreationTs) BETWEEN :start_date AND :end_date
-                ) twt ON twt.IHubReferenceId = mt.TransactionRefNum
         WHERE 
-        DATE(niit.CreationTs) BETWEEN :start_date AND :end_date 
+        niit.CreationTs >= CONCAT(:start_date, ' 00:00:00') AND niit.CreationTs < DATE_ADD(CONCAT(:end_date, ' 00:00:00'), INTERVAL 1 DAY) 
     """
     )
     params = {"start_date": start_date, "end_date": end_date}
 
     try:
 
-        df_db = execute_sql_with_retry(query, params=params)
+        fetched = fetch_hub_inputs(
+            lambda: execute_by_day(query, params=params, name="insurance_offline_service"),
+            start_date,
+            end_date,
+            service_name,
+            get_ebo_wallet_data,
+            fetch_combined=lambda: fetch_hub_with_ebo_wallet_data(
+                query, params, service_name
+            ),
+        )
+        df_db = fetched["hub"]
         if df_db.empty:
             logger.warning(f"No data returned for service: {service_name}")
             return pd.DataFrame()
@@ -1044,9 +1057,15 @@ def insurance_offline_service(start_date, end_date, service_name):
             new_column=f"{service_name}_STATUS",
             drop_original=True,
         )
+        df_db = apply_ledger_flags(df_db, start_date, end_date)
         df_db = map_tenant_id_column(df_db)
         result = merge_ebo_wallet_data(
-            df_db, start_date, end_date, service_name, get_ebo_wallet_data
+            df_db,
+            start_date,
+            end_date,
+            service_name,
+            get_ebo_wallet_data,
+            ebo_result=fetched["ebo"],
         )
     except SQLAlchemyError as e:
         logger.error(f"Database error in insurance_offline_service(): {e}")
@@ -1070,37 +1089,29 @@ def abhibus_service(start_date, end_date, service_name):
             mt.TenantDetailId AS TENANT_ID,
             abt.CreationTs AS SERVICE_DATE,
             abt.TicketStatusType  AS service_status,
-            abt.TotalAmount AS HUB_AMOUNT,
-            CASE 
-                WHEN iwt.IHubReferenceId IS NOT NULL THEN 'Yes'
-                ELSE 'No'
-            END AS IHUB_LEDGER_STATUS,
-            CASE
-                WHEN twt.IHubReferenceId IS NOT NULL THEN 'Yes'
-                ELSE 'No'
-            END AS TENANT_LEDGER_STATUS
+            abt.TotalAmount AS HUB_AMOUNT
         FROM
             ihubcore.MasterTransaction mt
         LEFT JOIN ihubcore.MasterSubTransaction mst ON mst.MasterTransactionId = mt.id
         LEFT JOIN ihubcore.AbhiBus_TicketDetail abt ON mst.Id = abt.MasterSubTransactionId
-        LEFT JOIN (
-            SELECT DISTINCT IHubReferenceId
-            FROM ihubcore.IHubWalletTransaction
-            WHERE DATE(CreationTs) BETWEEN :start_date AND :end_date 
-        ) iwt ON iwt.IHubReferenceId = mt.TransactionRefNum
-        LEFT JOIN (
-            SELECT DISTINCT IHubReferenceId
-            FROM ihubcore.TenantWalletTransaction
-            WHERE DATE(CreationTs) BETWEEN :start_date AND :end_date 
-        ) twt ON twt.IHubReferenceId = mt.TransactionRefNum
         WHERE 
-            DATE(abt.CreationTs) BETWEEN :start_date AND :end_date  
+            abt.CreationTs >= CONCAT(:start_date, ' 00:00:00') AND abt.CreationTs < DATE_ADD(CONCAT(:end_date, ' 00:00:00'), INTERVAL 1 DAY)  
                  
 """
     )
     params = {"start_date": start_date, "end_date": end_date}
     try:
-        df_db = execute_sql_with_retry(query, params=params)
+        fetched = fetch_hub_inputs(
+            lambda: execute_by_day(query, params=params, name="abhibus_service"),
+            start_date,
+            end_date,
+            service_name,
+            get_ebo_wallet_data,
+            fetch_combined=lambda: fetch_hub_with_ebo_wallet_data(
+                query, params, service_name
+            ),
+        )
+        df_db = fetched["hub"]
         if df_db.empty:
             logger.warning(f"No data returned for service: {service_name}")
             return pd.DataFrame()
@@ -1118,9 +1129,15 @@ def abhibus_service(start_date, end_date, service_name):
             new_column=f"{service_name}_STATUS",
             drop_original=True,
         )
+        df_db = apply_ledger_flags(df_db, start_date, end_date)
         df_db = map_tenant_id_column(df_db)
         result = merge_ebo_wallet_data(
-            df_db, start_date, end_date, service_name, get_ebo_wallet_data
+            df_db,
+            start_date,
+            end_date,
+            service_name,
+            get_ebo_wallet_data,
+            ebo_result=fetched["ebo"],
         )
     except SQLAlchemyError as e:
         logger.error(f"Database error in abhibus_service(): {e}")
@@ -1143,34 +1160,23 @@ def moveToBank_service(start_date, end_date, service_name):
                mt.TransactionStatus AS IHUB_MASTER_STATUS,
                mst.NetCommissionAddedToEBOWallet AS COMMISSION_AMOUNT,
                mt.CreationTs AS SERVICE_DATE,
-               amt.TxnAmount AS HUB_AMOUNT,amt.TransactionStatus as service_status ,amt.requestUUID as VENDOR_REFERENCE,
-               CASE
-                   WHEN iwt.IHubReferenceId IS NOT NULL THEN 'Yes'
-                   ELSE 'No'
-               END AS IHUB_LEDGER_STATUS,
-               CASE
-                   WHEN twt.IHubReferenceId IS NOT NULL THEN 'Yes'
-                   ELSE 'No'
-               END AS TENANT_LEDGER_STATUS
+               amt.TxnAmount AS HUB_AMOUNT,amt.TransactionStatus as service_status ,amt.requestUUID as VENDOR_REFERENCE
         FROM ihubcore.MasterTransaction mt
         LEFT JOIN ihubcore.MasterSubTransaction mst ON mst.MasterTransactionId = mt.id
         left join ihubcore.AxisMtbTransaction amt on amt.MasterSubTransactionId = mst.Id 
-        LEFT JOIN (
-            SELECT DISTINCT IHubReferenceId
-            FROM ihubcore.IHubWalletTransaction
-            WHERE DATE(CreationTs) BETWEEN :start_date AND :end_date
-        ) iwt ON iwt.IHubReferenceId = mt.TransactionRefNum
-        LEFT JOIN (
-            SELECT DISTINCT IHubReferenceId
-            FROM ihubcore.TenantWalletTransaction
-            WHERE DATE(CreationTs) BETWEEN :start_date AND :end_date
-        ) twt ON twt.IHubReferenceId = mt.TransactionRefNum
-        WHERE DATE(amt.CreationTs) BETWEEN :start_date AND :end_date 
+        WHERE amt.CreationTs >= CONCAT(:start_date, ' 00:00:00') AND amt.CreationTs < DATE_ADD(CONCAT(:end_date, ' 00:00:00'), INTERVAL 1 DAY) 
     """
     )
     params = {"start_date": start_date, "end_date": end_date}
     try:
-        df_db = execute_sql_with_retry(query, params=params)
+        fetched = fetch_hub_inputs(
+            lambda: execute_sql_with_retry(query, params=params, name="moveToBank_service"),
+            start_date,
+            end_date,
+            service_name,
+            get_ebo_wallet_data,
+        )
+        df_db = fetched["hub"]
         if df_db.empty:
             logger.warning(f"No data returned for service: {service_name}")
             return pd.DataFrame()
@@ -1188,9 +1194,15 @@ def moveToBank_service(start_date, end_date, service_name):
             new_column=f"{service_name}_STATUS",
             drop_original=True,
         )
+        df_db = apply_ledger_flags(df_db, start_date, end_date)
         df_db = map_tenant_id_column(df_db)
         result = merge_ebo_wallet_data(
-            df_db, start_date, end_date, service_name, get_ebo_wallet_data
+            df_db,
+            start_date,
+            end_date,
+            service_name,
+            get_ebo_wallet_data,
+            ebo_result=fetched["ebo"],
         )
     except SQLAlchemyError as e:
         logger.error(f"Database error in moveToBank_service(): {e}")
@@ -1213,34 +1225,23 @@ def manualTB_sevice(start_date, end_date, service_name):
                mt.TransactionStatus AS IHUB_MASTER_STATUS,
                mst.NetCommissionAddedToEBOWallet AS COMMISSION_AMOUNT,
                mt.CreationTs AS SERVICE_DATE,
-               amt.TxnAmount AS HUB_AMOUNT,amt.TransactionStatus as service_status ,amt.requestUUID as VENDOR_REFERENCE,
-               CASE
-                   WHEN iwt.IHubReferenceId IS NOT NULL THEN 'Yes'
-                   ELSE 'No'
-               END AS IHUB_LEDGER_STATUS,
-               CASE
-                   WHEN twt.IHubReferenceId IS NOT NULL THEN 'Yes'
-                   ELSE 'No'
-               END AS TENANT_LEDGER_STATUS
+               amt.TxnAmount AS HUB_AMOUNT,amt.TransactionStatus as service_status ,amt.requestUUID as VENDOR_REFERENCE
         FROM ihubcore.MasterTransaction mt
         LEFT JOIN ihubcore.MasterSubTransaction mst ON mst.MasterTransactionId = mt.id
         left join ihubcore.AxisMtbTransaction amt on amt.MasterSubTransactionId = mst.Id 
-        LEFT JOIN (
-            SELECT DISTINCT IHubReferenceId
-            FROM ihubcore.IHubWalletTransaction
-            WHERE DATE(CreationTs) BETWEEN :start_date AND :end_date
-        ) iwt ON iwt.IHubReferenceId = mt.TransactionRefNum
-        LEFT JOIN (
-            SELECT DISTINCT IHubReferenceId
-            FROM ihubcore.TenantWalletTransaction
-            WHERE DATE(CreationTs) BETWEEN :start_date AND :end_date
-        ) twt ON twt.IHubReferenceId = mt.TransactionRefNum
-        WHERE DATE(amt.CreationTs) BETWEEN :start_date AND :end_date 
+        WHERE amt.CreationTs >= CONCAT(:start_date, ' 00:00:00') AND amt.CreationTs < DATE_ADD(CONCAT(:end_date, ' 00:00:00'), INTERVAL 1 DAY) 
     """
     )
     params = {"start_date": start_date, "end_date": end_date}
     try:
-        df_db = execute_sql_with_retry(query, params=params)
+        fetched = fetch_hub_inputs(
+            lambda: execute_sql_with_retry(query, params=params, name="manualTB_sevice"),
+            start_date,
+            end_date,
+            service_name,
+            get_ebo_wallet_data,
+        )
+        df_db = fetched["hub"]
         if df_db.empty:
             logger.warning(f"No data returned for service: {service_name}")
             return pd.DataFrame()
@@ -1261,9 +1262,15 @@ def manualTB_sevice(start_date, end_date, service_name):
             new_column=f"{service_name}_STATUS",
             drop_original=True,
         )
+        df_db = apply_ledger_flags(df_db, start_date, end_date)
         df_db = map_tenant_id_column(df_db)
         result = merge_ebo_wallet_data(
-            df_db, start_date, end_date, service_name, get_ebo_wallet_data
+            df_db,
+            start_date,
+            end_date,
+            service_name,
+            get_ebo_wallet_data,
+            ebo_result=fetched["ebo"],
         )
     except SQLAlchemyError as e:
         logger.error(f"Database error in manualTB_service(): {e}")
@@ -1277,7 +1284,7 @@ def bbps_data_entry(start_date, end_date, service_name, df_excel):
     result = pd.DataFrame()
     query = text(
         """
-       SELECT bbf.Id as BBPS_BillFetchId,bbf.BBPS_BillerDetailId,bbf.CustomerMobile,bbf.BillAmount as Amount,bbf.CreationTs   from ihubcore.BBPS_BillFetch bbf where DATE(bbf.CreationTs) BETWEEN :start_date and :end_date                 
+       SELECT bbf.Id as BBPS_BillFetchId,bbf.BBPS_BillerDetailId,bbf.CustomerMobile,bbf.BillAmount as Amount,bbf.CreationTs   from ihubcore.BBPS_BillFetch bbf where bbf.CreationTs >= CONCAT(:start_date, ' 00:00:00') AND bbf.CreationTs < DATE_ADD(CONCAT(:end_date, ' 00:00:00'), INTERVAL 1 DAY)                 
 """
     )
     params = {"start_date": start_date, "end_date": end_date}
@@ -5,6 +5,9 @@ recon_utils.py - Shared reconciliation helper functions for DRY, maintainable co
 import pandas as pd
 from logger_config import logger
 from db_connector import get_db_connection
+from query_executor import run_concurrently
+from components.ledger_index import get_ledger_refs
+from label_columns import TENANT_NAMES, map_to_category
 
 DB_SERVICE_NAME_CONFIG = {
     "ASTRO": {"Db_service_name": "%Astrology%"},
@@ -24,6 +27,16 @@ DB_SERVICE_NAME_CONFIG = {
     "UPIQR": {"Db_service_name": "%UPI/QR%"},
 }
 
+# Small services whose hub rows and EBO wallet flags are fetched in a single
+# query driven by the service's own transactions (see
+# outwardservices.fetch_hub_with_ebo_wallet_data) rather than by scanning
+# the whole 30-day wallet window and merging in pandas.
+EBO_SINGLE_QUERY_SERVICES = {"ASTRO", "LIC", "INSURANCE_OFFLINE", "ABHIBUS"}
+
+# Pre-declared dtypes for the amount columns of the large hub queries; applied
+# per chunk when those queries are streamed (see query_executor.py)
+HUB_AMOUNT_DTYPES = {"HUB_AMOUNT": "float64", "COMMISSION_AMOUNT": "float64"}
+
 
 def map_status_column(
     df: pd.DataFrame,
@@ -32,8 +45,12 @@ def map_status_column(
     new_column: str,
     drop_original: bool = True,
 ) -> pd.DataFrame:
+    """
+    Map status codes to names as a categorical over the mapping's names;
+    unmapped values are kept.
+    """
     if status_col in df.columns:
-        df[new_column] = df[status_col].apply(lambda x: status_mapping.get(x, x))
+        df[new_column] = map_to_category(df[status_col], status_mapping)
         if drop_original:
             df.drop(columns=[status_col], inplace=True)
     return df
@@ -42,27 +59,67 @@ def map_status_column(
 def map_tenant_id_column(
     df: pd.DataFrame, tenant_id_col: str = "TENANT_ID"
 ) -> pd.DataFrame:
-    """Map tenant ID numbers to names if present."""
-    tenant_Id_mapping = {
-        1: "INET-CSC",
-        2: "ITI-ESEVA",
-        3: "UPCB",
-    }
+    """Map tenant ID numbers to names (categorical) if present."""
     if tenant_id_col in df.columns:
-        df[tenant_id_col] = (
-            df[tenant_id_col].map(tenant_Id_mapping).fillna(df[tenant_id_col])
-        )
+        df[tenant_id_col] = map_to_category(df[tenant_id_col], TENANT_NAMES)
     return df
 
 
+def fetch_hub_inputs(
+    fetch_hub,
+    start_date,
+    end_date,
+    service_name,
+    get_ebo_wallet_data_func,
+    tenant: bool = True,
+    fetch_combined=None,
+    **extra_fetches,
+) -> dict:
+    """
+    Run a service's hub query concurrently with the queries its result is
+    later combined with: the EBO wallet flags and the ledger reference sets
+    (which land in the ledger cache for apply_ledger_flags).
+
+    fetch_hub and extra_fetches are zero-argument callables. fetch_combined,
+    if given, returns (hub_df, ebo_df) from one query and replaces fetch_hub
+    and the EBO wallet query for services in EBO_SINGLE_QUERY_SERVICES.
+    Returns {"hub": ..., "ebo": ..., **extra results}; pass result["ebo"] to
+    merge_ebo_wallet_data as ebo_result.
+    """
+    db_service_name = DB_SERVICE_NAME_CONFIG[service_name]["Db_service_name"]
+    combined = fetch_combined is not None and service_name in EBO_SINGLE_QUERY_SERVICES
+    if combined:
+        tasks = {"hub_ebo": fetch_combined}
+    else:
+        tasks = {
+            "hub": fetch_hub,
+            "ebo": lambda: get_ebo_wallet_data_func(
+                start_date, end_date, db_service_name
+            ),
+        }
+    tasks["ihub_ledger"] = lambda: get_ledger_refs("IHUB", start_date, end_date)
+    if tenant:
+        tasks["tenant_ledger"] = lambda: get_ledger_refs("TENANT", start_date, end_date)
+    tasks.update(extra_fetches)
+    fetched = run_concurrently(tasks)
+    if combined:
+        fetched["hub"], fetched["ebo"] = fetched.pop("hub_ebo")
+    return fetched
+
+
 def merge_ebo_wallet_data(
-    df: pd.DataFrame, start_date, end_date, service_name, get_ebo_wallet_data_func
+    df: pd.DataFrame,
+    start_date,
+    end_date,
+    service_name,
+    get_ebo_wallet_data_func,
+    ebo_result=None,
 ) -> pd.DataFrame:
-    db_service_name = DB_SERVICE_NAME_CONFIG[service_name]
-    # print(db_service_name["Db_service_name"])
-    ebo_result = get_ebo_wallet_data_func(
-        start_date, end_date, db_service_name["Db_service_name"]
-    )
+    if ebo_result is None:
+        db_service_name = DB_SERVICE_NAME_CONFIG[service_name]
+        ebo_result = get_ebo_wallet_data_func(
+            start_date, end_date, db_service_name["Db_service_name"]
+        )
     # if service_name == "PASSPORT":
        
             
@@ -0,0 +1,72 @@
+"""
+reference_matcher.py - One-pass hub/vendor reference matching.
+
+Both sides' reference columns are normalized once (string, stripped; null or
+empty means "no reference") and factorized together into integer codes. The
+hub-only and vendor-only partitions come from np.isin on the codes, and the
+matched rows from an inner merge of (code, row position) pairs, reordered
+to the order left.merge(right, how="inner") gives. No string merge and no
+repeated isin passes over the references.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def normalize_reference(series: pd.Series) -> pd.Series:
+    """Stripped string keys; NaN where the reference is null or blank."""
+    keys = series.astype(str).str.strip()
+    return keys.where(series.notna() & (keys != ""))
+
+
+def match_references(
+    left: pd.DataFrame,
+    right: pd.DataFrame,
+    left_on: str,
+    right_on: str,
+    suffixes=("_x", "_y"),
+):
+    """
+    Partition two frames on a reference key.
+
+    Returns (left_only, right_only, matched):
+        left_only  - left rows without a counterpart (incl. null/blank keys)
+        right_only - right rows without a counterpart
+        matched    - same rows, order and columns as
+                     left.merge(right, left_on=..., right_on=..., how="inner")
+    """
+    # Join on integer codes of the keys (one hash pass over both sides)
+    # rather than an outer merge on the strings; null keys get code -1.
+    codes, _ = pd.factorize(
+        np.concatenate(
+            [
+                normalize_reference(left[left_on]).to_numpy(dtype=object),
+                normalize_reference(right[right_on]).to_numpy(dtype=object),
+            ]
+        )
+    )
+    left_codes, right_codes = codes[: len(left)], codes[len(left) :]
+    left_hit = (left_codes >= 0) & np.isin(left_codes, right_codes)
+    right_hit = (right_codes >= 0) & np.isin(right_codes, left_codes)
+
+    pairs = pd.DataFrame(
+        {"_code": left_codes[left_hit], "_lpos": np.flatnonzero(left_hit)}
+    ).merge(
+        pd.DataFrame({"_code": right_codes[right_hit], "_rpos": np.flatnonzero(right_hit)}),
+        on="_code",
+    )
+    order = np.lexsort((pairs["_rpos"].to_numpy(), pairs["_lpos"].to_numpy()))
+    left_pos = pairs["_lpos"].to_numpy(dtype=np.intp)[order]
+    right_pos = pairs["_rpos"].to_numpy(dtype=np.intp)[order]
+
+    left_part = left.iloc[left_pos].reset_index(drop=True)
+    right_part = right.iloc[right_pos].reset_index(drop=True)
+    if left_on == right_on:
+        right_part = right_part.drop(columns=[right_on])
+    overlap = set(left_part.columns) & set(right_part.columns)
+    if overlap:
+        left_part = left_part.rename(columns={c: f"{c}{suffixes[0]}" for c in overlap})
+        right_part = right_part.rename(columns={c: f"{c}{suffixes[1]}" for c in overlap})
+    matched = pd.concat([left_part, right_part], axis=1)
+
+    return left[~left_hit], right[~right_hit], matched
@@ -0,0 +1,123 @@
+"""
+scenario_classifier.py - Single-pass scenario labelling for matched rows.
+
+Vendor status, hub status and ledger presence are each normalized once into
+small integer codes; a lookup table on the (vendor, hub, ledger) code triple
+gives every matched row its reconciliation scenario, and the per-scenario
+row positions come from one groupby.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Vendor (excel) status codes
+EXCEL_SUCCESS, EXCEL_FAILED, EXCEL_TIMED_OUT, EXCEL_OTHER = range(4)
+EXCEL_STATUS_CODES = {
+    "success": EXCEL_SUCCESS,
+    "failed": EXCEL_FAILED,
+    "timed out": EXCEL_TIMED_OUT,
+}
+
+# Hub (db) status codes
+DB_SUCCESS, DB_FAILED, DB_INITIATED, DB_OTHER = range(4)
+DB_STATUS_CODES = {
+    "success": DB_SUCCESS,
+    "failed": DB_FAILED,
+    "initiated": DB_INITIATED,
+    "inprogress": DB_INITIATED,
+    "pending": DB_INITIATED,
+}
+
+# Ledger presence codes
+LEDGER_YES, LEDGER_NO, LEDGER_OTHER = range(3)
+LEDGER_CODES = {"yes": LEDGER_YES, "no": LEDGER_NO}
+
+_VENDOR_SUCCESS = (EXCEL_SUCCESS,)
+_VENDOR_FAILED = (EXCEL_FAILED, EXCEL_TIMED_OUT)
+
+# (scenario key, CATEGORY label, vendor codes, hub codes, ledger code)
+SCENARIO_RULES = [
+    ("vend_ihub_succ_not_in_ledger", "VEND_IHUB_SUC-NIL", _VENDOR_SUCCESS, (DB_SUCCESS,), LEDGER_NO),
+    ("vend_fail_ihub_succ_not_in_ledger", "VEND_FAIL_IHUB_SUC-NIL", (EXCEL_FAILED,), (DB_SUCCESS,), LEDGER_NO),
+    ("vend_succ_ihub_fail_not_in_ledger", "VEND_SUC_IHUB_FAIL-NIL", _VENDOR_SUCCESS, (DB_FAILED,), LEDGER_NO),
+    ("ihub_vend_fail_not_in_ledger", "IHUB_FAIL_VEND_FAIL-NIL", _VENDOR_FAILED, (DB_FAILED,), LEDGER_NO),
+    ("ihub_initiate_vend_succes_not_in_ledger", "IHUB_INT_VEND_SUC-NIL", _VENDOR_SUCCESS, (DB_INITIATED,), LEDGER_NO),
+    ("ihub_initiate_vend_fail_not_in_ledger", "VEND_FAIL_IHUB_INT-NIL", _VENDOR_FAILED, (DB_INITIATED,), LEDGER_NO),
+    ("vend_ihub_succ", "VEND_IHUB_SUC", _VENDOR_SUCCESS, (DB_SUCCESS,), LEDGER_YES),
+    ("vend_ihub_fail", "VEND_IHUB_FAIL", _VENDOR_FAILED, (DB_FAILED,), LEDGER_YES),
+    ("vend_fail_ihub_succ", "VEND_FAIL_IHUB_SUC", _VENDOR_FAILED, (DB_SUCCESS,), LEDGER_YES),
+    ("vend_succ_ihub_fail", "VEND_SUC_IHUB_FAIL", _VENDOR_SUCCESS, (DB_FAILED,), LEDGER_YES),
+    ("ihub_initiate_vend_succes", "IHUB_INT_VEND_SUC", _VENDOR_SUCCESS, (DB_INITIATED,), LEDGER_YES),
+    ("ihub_initiate_vend_fail", "VEND_FAIL_IHUB_INT", _VENDOR_FAILED, (DB_INITIATED,), LEDGER_YES),
+]
+
+NO_SCENARIO = -1
+
+
+def _build_scenario_table():
+    table = np.full(
+        (EXCEL_OTHER + 1, DB_OTHER + 1, LEDGER_OTHER + 1),
+        NO_SCENARIO,
+        dtype=np.int8,
+    )
+    for label, (_, _, excel_codes, db_codes, ledger_code) in enumerate(SCENARIO_RULES):
+        for excel_code in excel_codes:
+            for db_code in db_codes:
+                table[excel_code, db_code, ledger_code] = label
+    return table
+
+
+SCENARIO_TABLE = _build_scenario_table()
+
+
+def normalize_status(series: pd.Series, code_map: dict, other: int):
+    """
+    Lower-case a status column and encode it, working per distinct value.
+
+    Returns (lowered, codes): the lower-cased labels as a categorical Series
+    (same values as series.astype(str).str.lower(), nulls as "nan") and an
+    int8 code array. Categorical input is used as it is.
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        cat = series
+    else:
+        cat = series.astype(str).astype("category")
+    # One entry per category plus a trailing "nan" that null codes (-1) pick
+    labels = np.append(
+        np.asarray(cat.cat.categories.astype(str).str.lower(), dtype=object), "nan"
+    )
+    label_codes, lowered_categories = pd.factorize(labels)
+    category_codes = np.array(
+        [code_map.get(value, other) for value in labels], dtype=np.int8
+    )
+    positions = cat.cat.codes.to_numpy()
+    lowered = pd.Series(
+        pd.Categorical.from_codes(label_codes[positions], lowered_categories),
+        index=series.index,
+    )
+    return lowered, category_codes[positions]
+
+
+def status_differs(left: pd.Series, right: pd.Series) -> np.ndarray:
+    """
+    Row-wise left != right for two lowered status columns from
+    normalize_status(), compared as integer codes over their joint labels.
+    """
+    labels = left.cat.categories.union(right.cat.categories)
+    left_codes = left.cat.set_categories(labels).cat.codes.to_numpy()
+    right_codes = right.cat.set_categories(labels).cat.codes.to_numpy()
+    return left_codes != right_codes
+
+
+def classify(excel_codes, db_codes, ledger_codes):
+    """Scenario label (index into SCENARIO_RULES, or NO_SCENARIO) per row."""
+    return SCENARIO_TABLE[excel_codes, db_codes, ledger_codes]
+
+
+def scenario_positions(labels) -> dict:
+    """Map every scenario key to the row positions carrying its label."""
+    groups = pd.Series(labels).groupby(labels, sort=False).indices
+    empty = np.array([], dtype=np.intp)
+    return {
+        rule[0]: groups.get(label, empty) for label, rule in enumerate(SCENARIO_RULES)
+    }
@@ -1,38 +1,11 @@
 import pandas as pd
-from db_connector import get_db_connection
+from query_executor import execute_sql_with_retry, run_concurrently, STREAM_CHUNK_SIZE
+from components.recon_utils import HUB_AMOUNT_DTYPES
+from components.reference_matcher import match_references
 from logger_config import logger
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy import text
 import numpy as np
-from tenacity import (
-    retry,
-    stop_after_attempt,
-    wait_exponential,
-    retry_if_exception_type,
-)
-from sqlalchemy.exc import OperationalError, DatabaseError
-
-engine = get_db_connection()
-
-# Configure retry logic for database operations
-DB_RETRY_CONFIG = {
-    "stop": stop_after_attempt(3),
-    "wait": wait_exponential(multiplier=1, min=1, max=10),
-    "retry": retry_if_exception_type((OperationalError, DatabaseError)),
-    "reraise": True,
-}
-
-
-@retry(**DB_RETRY_CONFIG)
-def execute_sql_with_retry(query, params=None):
-    logger.info("Entered helper function to execute SQL with retry logic")
-    with engine.connect().execution_options(stream_results=True) as connection:
-        try:
-            df = pd.read_sql(query, con=connection, params=params)
-            return df
-        except Exception as e:
-            logger.error(f"Error during SQL execution: {e}")
-            raise  # This will trigger retry if it's an OperationalError or DatabaseError
 
 
 def upiQr_service_selection(start_date, end_date, service_name, df_excel):
@@ -175,9 +148,7 @@ def filtering_Data(df_db, initial_hub_data, df_excel, service_name):
         not_in_portal = safe_column_select(not_in_portal, required_columns)
 
         # 4. Filtering Data that matches in both Ihub Portal and Vendor Xl as : Matched
-        matched = df_db.merge(
-            df_excel, left_on="VENDOR_REFERENCE", right_on="REFID", how="inner"
-        ).copy()
+        _, _, matched = match_references(df_db, df_excel, "VENDOR_REFERENCE", "REFID")
         matched["CATEGORY"] = "MATCHED"
 
         matched = safe_column_select(matched, required_columns)
@@ -393,9 +364,28 @@ def UpiQr_Service(start_date, end_date, service_name):
     params = {"start_date": start_date, "end_date": end_date}
 
     try:
-        # Execute queries
-        df_hub = execute_sql_with_retry(query_ihub, params=params)
-        df_ebo = execute_sql_with_retry(query_ebo, params=params)
+        # Execute both queries at the same time
+        fetched = run_concurrently(
+            {
+                "hub": lambda: execute_sql_with_retry(
+                    query_ihub,
+                    params=params,
+                    name="UpiQr_Service_hub",
+                    coerce_float=True,
+                    chunksize=STREAM_CHUNK_SIZE,
+                    dtypes=HUB_AMOUNT_DTYPES,
+                ),
+                "ebo": lambda: execute_sql_with_retry(
+                    query_ebo,
+                    params=params,
+                    name="UpiQr_Service_ebo",
+                    stream=True,
+                    coerce_float=True,
+                ),
+            }
+        )
+        df_hub = fetched["hub"]
+        df_ebo = fetched["ebo"]
 
         if df_hub.empty and df_ebo.empty:
             logger.warning(f"No data found for {service_name}")
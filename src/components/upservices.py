@@ -1,41 +1,11 @@
 import pandas as pd
-from db_connector import get_db_connection
+from query_executor import execute_sql_with_retry, execute_with_keys
 from logger_config import logger
 from sqlalchemy.exc import SQLAlchemyError
 from typing import Dict, Any, Optional
 from sqlalchemy import text
-from tenacity import (
-    retry,
-    stop_after_attempt,
-    wait_exponential,
-    retry_if_exception_type,
-)
-from sqlalchemy.exc import OperationalError, DatabaseError
 from components.recon_utils import map_status_column, map_tenant_id_column
-
-engine = get_db_connection()
-
-# Configure retry logic for database operations
-DB_RETRY_CONFIG = {
-    "stop": stop_after_attempt(3),
-    "wait": wait_exponential(multiplier=1, min=1, max=10),
-    "retry": retry_if_exception_type((OperationalError, DatabaseError)),
-    "reraise": True,
-}
-
-
-@retry(**DB_RETRY_CONFIG)
-def execute_sql_with_retry(query, params=None):
-    logger.info("Entered helper function to execute SQL with retry logic")
-    with engine.connect().execution_options(stream_results=True) as connection:
-        try:
-            df = pd.read_sql(query, con=connection, params=params)
-            return df
-        except Exception as e:
-            logger.error(f"Error during SQL execution: {e}")
-            raise  # This will trigger retry if it's an OperationalError or DatabaseError
-
-    # Add other service configurations here
+from components.reference_matcher import match_references
 
 
 def up_service_selection(
@@ -142,28 +112,32 @@ def filtering_Data(df_db, df_excel, service_name):
                 "VILLAGE",
             ]
 
-        matched = df_db.merge(
-            df_excel, left_on="VENDOR_REFERENCE", right_on="REFID", how="inner"
-        ).copy()
+        not_in_vendor, not_in_portal_1, matched = match_references(
+            df_db, df_excel, "VENDOR_REFERENCE", "REFID"
+        )
         matched["CATEGORY"] = "MATCHED"
         matched = safe_column_select(matched, required_columns)
         # print(matched.head(5))
         # 1 Filtering Data initiated in IHUB portal and not in Vendor Xl
-        not_in_vendor = df_db[~df_db["VENDOR_REFERENCE"].isin(df_excel["REFID"])].copy()
+        not_in_vendor = not_in_vendor.copy()
         not_in_vendor["CATEGORY"] = "NOT_IN_VENDOR"
         not_in_vendor = not_in_vendor.rename(columns={"VENDOR_REFERENCE": "REFID"})
         not_in_vendor = safe_column_select(not_in_vendor, required_columns)
         # 2. Filtering Data Present in Vendor XL but Not in Ihub Portal
-        not_in_portal_1 = df_excel[
-            ~df_excel["REFID"].isin(df_db["VENDOR_REFERENCE"])
-        ].copy()
+        not_in_portal_1 = not_in_portal_1.copy()
         not_in_portal_app_ids = not_in_portal_1["REFID"]
 
         if not not_in_portal_app_ids.dropna().empty:
             service = SERVICE_CONFIGS[service_name]
             query = service["Date_diff_query"]
-            params = {"app_ids": tuple(not_in_portal_app_ids)}
-            not_in_portal_1_db_check = execute_sql_with_retry(query, params=params)
+            not_in_portal_1_db_check = execute_with_keys(
+                query,
+                not_in_portal_app_ids,
+                key_param="app_ids",
+                key_column=service.get("key_column"),
+                stream=True,
+                coerce_float=True,
+            )
             in_portal_date_diff_df = not_in_portal_1_db_check.merge(
                 df_excel, left_on="VENDOR_REFERENCE", right_on="REFID", how="inner"
             ).copy()
@@ -228,7 +202,9 @@ def service_function(start_date, end_date, service_name):
     }
     try:
         # Safe query execution with retry
-        df_db = execute_sql_with_retry(query, params=params)
+        df_db = execute_sql_with_retry(
+            query, params=params, stream=True, coerce_float=True
+        )
 
         if df_db.empty:
             logger.warning(f"No data returned for service: {service_name}")
@@ -264,7 +240,7 @@ SERVICE_CONFIGS = {
                             JOIN (
                                 SELECT MIN(id) AS min_id
                                 FROM tenantinetcsc.UpeDistrictTransaction
-                                WHERE DATE(CreationTs) BETWEEN :start_date AND :end_date
+                                WHERE CreationTs >= CONCAT(:start_date, ' 00:00:00') AND CreationTs < DATE_ADD(CONCAT(:end_date, ' 00:00:00'), INTERVAL 1 DAY)
                                 AND UpeDistrictServiceId NOT IN (1)
                                 GROUP BY ApplicationId
                             ) uniq ON udt.id = uniq.min_id
@@ -300,6 +276,8 @@ SERVICE_CONFIGS = {
                                 LEFT JOIN tenantinetcsc.SubDistrict sd ON sd.id = ed.SubDistrictId;
                             """
         ),
+        # Column the Date_diff_query compares :app_ids with
+        "key_column": "tenantinetcsc.UpeDistrictTransaction.ApplicationId",
         "service_func": service_function,
     },
     "SULTANPUR_IS": {
@@ -319,7 +297,7 @@ SERVICE_CONFIGS = {
                             MAX(CreationTs) AS max_ts
                             FROM tenantinetcsc.UpeDistrictTransaction
                             WHERE 
-                                DATE(CreationTs) BETWEEN :start_date AND :end_date
+                                CreationTs >= CONCAT(:start_date, ' 00:00:00') AND CreationTs < DATE_ADD(CONCAT(:end_date, ' 00:00:00'), INTERVAL 1 DAY)
                                 AND UpeDistrictServiceId IN (1)
                                 GROUP BY QuotaId
                             ) AS latest ON udt.QuotaId = latest.QuotaId AND udt.CreationTs = latest.max_ts
@@ -357,6 +335,8 @@ SERVICE_CONFIGS = {
                                 WHERE udt.UpeDistrictServiceId IN (1)
                         """
         ),
+        # Column the Date_diff_query compares :app_ids with
+        "key_column": "tenantinetcsc.UpeDistrictTransaction.ApplicationId",
         "service_func": service_function,
     },
     "CHITRAKOOT_SCA": {
@@ -366,7 +346,7 @@ SERVICE_CONFIGS = {
                             JOIN (
                             SELECT MAX(id) AS min_id
                             FROM iti_portal.tb_up_request
-                            WHERE DATE(created_at) BETWEEN :start_date AND :end_date
+                            WHERE created_at >= CONCAT(:start_date, ' 00:00:00') AND created_at < DATE_ADD(CONCAT(:end_date, ' 00:00:00'), INTERVAL 1 DAY)
                             AND service_code NOT LIKE 'IS'
                             GROUP BY application_no
                             ) uniq ON tur.id = uniq.min_id
@@ -393,6 +373,8 @@ SERVICE_CONFIGS = {
                                 AND tur.application_no IN :app_ids
                             """
         ),
+        # Column the Date_diff_query compares :app_ids with
+        "key_column": "iti_portal.tb_up_request.application_no",
         "service_func": service_function,
     },
     "CHITRAKOOT_IS": {
@@ -405,13 +387,13 @@ SERVICE_CONFIGS = {
                                 MAX(id) AS max_id
                             FROM iti_portal.tb_up_request
                             WHERE service_code LIKE 'IS'
-                            AND DATE(Created_at) BETWEEN :start_date AND :end_date
+                            AND Created_at >= CONCAT(:start_date, ' 00:00:00') AND Created_at < DATE_ADD(CONCAT(:end_date, ' 00:00:00'), INTERVAL 1 DAY)
                             GROUP BY quota_id
                             ) AS latest ON tur.id = latest.max_id
                             LEFT JOIN iti_portal.users u ON u.id = tur.users_id
                             LEFT JOIN iti_portal.users_up uu ON u.id = uu.users_id
                             WHERE tur.service_code LIKE 'IS'
-                            AND DATE(tur.Created_at) BETWEEN :start_date AND :end_date;
+                            AND tur.Created_at >= CONCAT(:start_date, ' 00:00:00') AND tur.Created_at < DATE_ADD(CONCAT(:end_date, ' 00:00:00'), INTERVAL 1 DAY);
                         """
         ),
         "Date_diff_query": text(
@@ -432,6 +414,8 @@ SERVICE_CONFIGS = {
                                 AND tur.quota_id IN :app_ids
                             """
         ),
+        # Column the Date_diff_query compares :app_ids with
+        "key_column": "iti_portal.tb_up_request.quota_id",
         "service_func": service_function,
     },
     "MANUAL_TB": {
@@ -442,7 +426,7 @@ SERVICE_CONFIGS = {
                 LEFT JOIN ihubcore.ManualTbBank mtb on mtb.id = mtt.manualTbbankId
                 LEFT JOIN tenantinetcsc.EboDetail ed on ed.id = mtt.EboDetailId
                 LEFT JOIN tenantinetcsc.`User` u on u.id = ed.UserId 
-                where DATE(mtt.CreationTs) BETWEEN :start_date AND :end_date
+                where mtt.CreationTs >= CONCAT(:start_date, ' 00:00:00') AND mtt.CreationTs < DATE_ADD(CONCAT(:end_date, ' 00:00:00'), INTERVAL 1 DAY)
                 """
         ),
         "Date_diff_query": text(
@@ -455,6 +439,8 @@ SERVICE_CONFIGS = {
                 WHERE mtt.VerifiedUtrNo IN :app_ids
                 """
         ),
+        # Column the Date_diff_query compares :app_ids with
+        "key_column": "ihubcore.ManualTbTransaction.VerifiedUtrNo",
         "service_func": service_function,
     },
 }
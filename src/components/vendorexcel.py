@@ -1,7 +1,12 @@
+import time
 import pandas as pd
 import numpy as np
 import traceback
 from logger_config import logger
+from excel_ingest import read_header, read_upload
+from value_normalizer import normalize_key, strip_text
+from money import frame_to_rupees, money_equal, to_paise
+from components.reference_matcher import match_references
 
 
 def safe_column_select(df, columns):
@@ -10,14 +15,91 @@ def safe_column_select(df, columns):
     return df[existing_cols].copy()
 
 
-def clean_rrn_value(value):
-    """Clean RRN/Amount values: float->int, strip, handle NaN."""
-    try:
-        if pd.notna(value) and str(value).strip().lower() != "nan":
-            return str(int(float(value)))
-        return ""
-    except (ValueError, TypeError):
-        return str(value).strip() if pd.notna(value) else ""
+# ----------------------------------------------------------------------------------
+# Shared core: ingest, key matching and result assembly
+#
+# Every service is a strategy in VENDOR_STRATEGIES (bottom of this module):
+#   ingest      how the uploads are read (see read_vendor_workbook)
+#               normalize_headers   strip and upper-case column names on load
+#               statement / ledger  "dtypes" (column -> dtype) and "dates"
+#                                   (column -> format), keyed by the
+#                                   normalized column names
+#   match_keys  (ledger column, statement column) joined by match_vendor_rows,
+#               or None when the service matches on grouped totals
+#   rules       function(ledger_df, statement_df, service_name) -> result dict
+#   money_columns
+#               amount columns the rules hold as paise (money.to_paise) so
+#               amount checks are exact; converted back to rupees on return
+# A new service adds its rules function and one registry entry.
+
+
+def read_vendor_workbook(file, service_name, role):
+    """Read the "ledger" or "statement" upload once, as the service's schema says."""
+    schema = VENDOR_STRATEGIES[service_name].get("ingest", {})
+    settings = schema.get(role, {})
+    normalize = schema.get("normalize_headers", False)
+
+    dtype = None
+    if settings.get("dtypes"):
+        # dtype keys must be the raw header names of this file
+        header = pd.Index(read_header(file))
+        names = header.str.strip().str.upper() if normalize else header
+        dtype = {
+            raw: settings["dtypes"][name]
+            for raw, name in zip(header, names)
+            if name in settings["dtypes"]
+        }
+    df = read_upload(file, dtype=dtype or None)
+
+    if normalize:
+        df.columns = df.columns.str.strip().str.upper()
+    for col, date_format in settings.get("dates", {}).items():
+        df[col] = pd.to_datetime(df[col], format=date_format)
+    return df
+
+
+def match_vendor_rows(
+    ledger_df, statement_df, service_name, ledger_columns=None, statement_first=False
+):
+    """
+    Partition ledger and statement rows on the service's match_keys with
+    match_references(). Keys are compared as stripped strings; null or blank
+    keys never match.
+
+    Returns (not_in_statement, not_in_ledger, matched). ledger_columns limits
+    the ledger columns carried into matched; statement_first puts the
+    statement on the left of matched (its columns and row order first).
+    """
+    ledger_key, statement_key = VENDOR_STRATEGIES[service_name]["match_keys"]
+    ledger_part = ledger_df if ledger_columns is None else ledger_df[ledger_columns]
+
+    if statement_first:
+        not_in_ledger, not_in_statement, matched = match_references(
+            statement_df, ledger_part, statement_key, ledger_key
+        )
+    else:
+        not_in_statement, not_in_ledger, matched = match_references(
+            ledger_part, statement_df, ledger_key, statement_key
+        )
+    if ledger_columns is not None:
+        not_in_statement = ledger_df.loc[not_in_statement.index]
+    return not_in_statement, not_in_ledger, matched
+
+
+def vendor_result(matching, counts, mismatches, clean=None, message="No Mismatch..."):
+    """
+    Assemble a service's response: the matching frames and counts, plus the
+    mismatch frames, or just `message` when the reconciliation is clean
+    (by default: every mismatch frame is empty).
+    """
+    result = {**matching, **counts}
+    if clean is None:
+        clean = all(df.empty for df in mismatches.values())
+    if clean:
+        result["message"] = message
+    else:
+        result.update(mismatches)
+    return result
 
 
 def vendorexcel_reconciliation(
@@ -25,1361 +107,1136 @@ def vendorexcel_reconciliation(
     vendor_ledger: pd.ExcelFile,
     vendor_statement: pd.ExcelFile,
 ) -> dict:
+    strategy = VENDOR_STRATEGIES.get(service_name)
+    if strategy is None:
+        logger.warning(
+            f"Service {service_name} not supported for vendor ledger reconciliation."
+        )
+        return f"Service {service_name} not supported."
+
     try:
         logger.info(
             f"Starting vendor ledger reconciliation for service: {service_name}"
         )
 
-        # Read dataframes
-        ledger_df = pd.read_excel(vendor_ledger)
-        statement_df = pd.read_excel(vendor_statement)
-        ledger_count = ledger_df.shape[0]
-        statement_count = statement_df.shape[0]
-
-        # Service-specific processing
-
-        # --- DMT specific status normalization ---
-        """
-        DMT Service Block
-        - Normalizes status column to 'failed' or 'success'.
-        """
-        if service_name == "DMT":
-            statement_df["STATUS"] = (
-                statement_df["STATUS"]
-                .astype(str)
-                .str.lower()
-                .apply(lambda x: "failed" if "refunded" in x else "success")
-            )
-
-        # --- RECHARGE & DMT reconciliation ---
-        """
-        RECHARGE & DMT Service Block
-        - Handles matching, mismatches, and refund logic for recharge and DMT services.
-        """
-        if service_name in ["RECHARGE", "DMT"]:
-            # Precompute frequently used values
-            failed_count = statement_df[
-                statement_df["STATUS"].str.strip().str.lower() == "failed"
-            ].shape[0]
-            credit_count = ledger_df[
-                ledger_df["TYPE"].str.strip().str.lower() == "credit"
-            ].shape[0]
-
-            # Standardize commission columns - simplified
-            if "COMM/SHARE" in ledger_df.columns:
-                ledger_df = ledger_df.rename(columns={"COMM/SHARE": "COMM"})
-            if "NET COMMISSION" in statement_df.columns:
-                statement_df = statement_df.rename(columns={"NET COMMISSION": "COMM"})
-
-            # Date formatting - optimized loop
-            date_dfs = [ledger_df, statement_df]
-            for df in date_dfs:
-                if "DATE" in df.columns:
-                    df["DATE"] = pd.to_datetime(
-                        df["DATE"], errors="coerce"
-                    ).dt.strftime("%Y-%m-%d")
-
-            REQUIRED_COLUMNS = [
-                "TXNID",
-                "AMOUNT",
-                "COMM",
-                "TDS",
-                "TYPE",
-                "DATE",
-                "REFID",
-                "STATUS",
-                "REFUND_TXNID",
-                "REFUNDED_DATE",
-            ]
-
-            # Preprocess dataframes
-            statement_df["REFID"] = statement_df["REFID"].astype(str).str.strip()
-            statement_df["REFUNDED_DATE"] = statement_df["REFUND"].str.extract(
-                r"Date :\s*(\d{4}-\d{2}-\d{2})"
-            )
-
-            # Strip TXNIDs once and reuse
-            ledger_txnids = ledger_df["TXNID"].astype(str).str.strip()
-            statement_txnids = statement_df["TXNID"].astype(str).str.strip()
-
-            # Merge operations
-            matching_Trans_df = statement_df.merge(
-                ledger_df[["TXNID", "TYPE"]], on="TXNID", how="inner"
-            )
-            matching_Trans_df = safe_column_select(matching_Trans_df, REQUIRED_COLUMNS)
-            matched_count = matching_Trans_df.shape[0]
-
-            # Find mismatches
-            not_in_statement_df = ledger_df[
-                ~ledger_txnids.isin(statement_txnids)
-            ].copy()
-            not_in_statement_df = not_in_statement_df.rename(
-                columns={"REFUNDTXNID": "REFUND_TXNID"}
-            )
-            not_in_statement_df = safe_column_select(
-                not_in_statement_df, REQUIRED_COLUMNS
-            )
-
-            not_in_ledger_df = statement_df[
-                ~statement_txnids.isin(ledger_txnids)
-            ].copy()
-            not_in_ledger_df = not_in_ledger_df.rename(
-                columns={"REFUNDTXNID": "REFUND_TXNID"}
-            )
-            not_in_ledger_df = safe_column_select(not_in_ledger_df, REQUIRED_COLUMNS)
-
-            # Extract REFUND_TXNID
-            if "REFUND" in statement_df.columns and service_name == "RECHARGE":
-                statement_df["REFUND_TXNID"] = statement_df["REFUND"].str.extract(
-                    r"Txnid(\d+)", expand=False
-                )
-            elif "REFUNDTXNID" in statement_df.columns and service_name == "DMT":
-                statement_df["REFUND_TXNID"] = statement_df["REFUNDTXNID"].str.strip()
-
-            # Failed refunds
-            failed_refunds = (
-                statement_df.loc[
-                    statement_df["STATUS"].str.lower().str.strip() == "failed"
-                ].copy()
-                if "STATUS" in statement_df.columns
-                else pd.DataFrame(columns=statement_df.columns)
-            )
-
-            # Prepare for merge
-            not_in_statement_df["TXNID"] = (
-                not_in_statement_df["TXNID"].astype(str).str.strip()
-            )
-            failed_refunds["REFUND_TXNID"] = (
-                failed_refunds["REFUND_TXNID"].astype(str).str.strip()
-            )
-
-            # Matching refunds
-            matching_refunds_df = (
-                failed_refunds.merge(
-                    not_in_statement_df[["TXNID", "TYPE"]],
-                    left_on="REFUND_TXNID",
-                    right_on="TXNID",
-                    how="inner",
-                    indicator=True,
-                )
-                .query('_merge == "both"')
-                .drop(columns=["TXNID_y", "_merge"])
-                .rename(columns={"TXNID_x": "TXNID"})
-            )
-
-            matching_refunds_df = safe_column_select(
-                matching_refunds_df, REQUIRED_COLUMNS
-            )
-
-            # Mismatch handling
-            if "REFUND_TXNID" in failed_refunds.columns:
-                merged_df = failed_refunds.merge(
-                    not_in_statement_df[
-                        [
-                            "TXNID",
-                            "TYPE",
-                            "AMOUNT",
-                            "COMM",
-                            "TDS",
-                            "DATE",
-                            "REFID",
-                            "REFUND_TXNID",
-                        ]
-                    ],
-                    left_on="REFUND_TXNID",
-                    right_on="TXNID",
-                    how="outer",
-                    indicator=True,
-                )
-
-                # Mismatch statement
-                mismatch_statement_df = (
-                    merged_df.query('_merge == "left_only"')
-                    .drop(
-                        columns=[
-                            "_merge",
-                            "TXNID_y",
-                            "TDS_x",
-                            "COMM_y",
-                            "AMOUNT_y",
-                            "DATE_y",
-                            "REFID_y",
-                            "REFUND_TXNID_y",
-                        ]
-                    )
-                    .rename(
-                        columns={
-                            "TXNID_x": "TXNID",
-                            "TDS_x": "TDS",
-                            "COMM_x": "COMM",
-                            "AMOUNT_x": "AMOUNT",
-                            "DATE_x": "DATE",
-                            "TYPE_x": "TYPE",
-                            "REFID_x": "REFID",
-                            "REFUND_TXNID_x": "REFUND_TXNID",
-                        }
-                    )
-                )
-
-                # Mismatch ledger
-                mismatch_ledger_df = (
-                    merged_df.query('_merge == "right_only"')
-                    .drop(
-                        columns=[
-                            "_merge",
-                            "TXNID_x",
-                            "TDS_x",
-                            "COMM_x",
-                            "AMOUNT_x",
-                            "DATE_x",
-                            "REFID_x",
-                            "REFUND_TXNID_x",
-                        ]
-                    )
-                    .rename(
-                        columns={
-                            "TXNID_y": "TXNID",
-                            "TDS_y": "TDS",
-                            "COMM_y": "COMM",
-                            "AMOUNT_y": "AMOUNT",
-                            "DATE_y": "DATE",
-                            "TYPE_y": "TYPE",
-                            "REFID_y": "REFID",
-                            "REFUND_TXNID_y": "REFUND_TXNID",
-                        }
-                    )
-                )
-            else:
-                mismatch_statement_df = not_in_statement_df.copy()
-                mismatch_ledger_df = pd.DataFrame(columns=REQUIRED_COLUMNS)
-
-            # Final dataframe preparations
-            mismatch_ledger_df = safe_column_select(
-                mismatch_ledger_df, REQUIRED_COLUMNS
-            )
-            mismatch_statement_df = safe_column_select(
-                mismatch_statement_df, REQUIRED_COLUMNS
-            )
-
-            mismatch_statement_df = mismatch_statement_df.merge(
-                statement_df[["TXNID", "REFUNDED_DATE"]], on="TXNID", how="left"
-            )
-            mismatch_statement_df = safe_column_select(
-                mismatch_statement_df, REQUIRED_COLUMNS
-            )
+        # Read dataframes (once, typed per the service's ingest schema)
+        started = time.perf_counter()
+        ledger_df = read_vendor_workbook(vendor_ledger, service_name, "ledger")
+        statement_df = read_vendor_workbook(vendor_statement, service_name, "statement")
+        read_seconds = time.perf_counter() - started
+        counts = {
+            "ledger_count": ledger_df.shape[0],
+            "statement_count": statement_df.shape[0],
+        }
+
+        started = time.perf_counter()
+        result = strategy["rules"](ledger_df, statement_df, service_name)
+        logger.info(
+            f"{service_name} vendor reconciliation: read {read_seconds:.2f}s, "
+            f"rules {time.perf_counter() - started:.2f}s"
+        )
+        logger.info("Vendor ledger reconciliation completed successfully.")
+        money_columns = strategy.get("money_columns", ())
+        for key, value in result.items():
+            if isinstance(value, pd.DataFrame):
+                result[key] = frame_to_rupees(value, money_columns)
+        # Rules may report their own counts (e.g. after filtering)
+        return {**counts, **result}
 
-            # Filter failed transactions
-            matching_Trans_df = matching_Trans_df[
-                matching_Trans_df["STATUS"] != "failed"
-            ].copy()
-
-            logger.info("Vendor ledger reconciliation completed successfully.")
-
-            # Return results - simplified condition
-            if (
-                not_in_ledger_df.empty
-                and mismatch_statement_df.empty
-                and mismatch_ledger_df.empty
-            ):
-                return {
-                    "message": "No Mismatch...",
-                    "matching_trans": matching_Trans_df,
-                    "matching_refunds": matching_refunds_df,
-                    "ledger_count": ledger_count,
-                    "statement_count": statement_count,
-                    "matched_trans_count": matched_count,
-                    "failed_trans_count": failed_count,
-                    "ledger_credit_count": credit_count,
-                }
-            else:
-                return {
-                    "matching_trans": matching_Trans_df,
-                    "not_in_ledger": not_in_ledger_df,
-                    "not_in_statement": mismatch_ledger_df,
-                    "matching_refunds": matching_refunds_df,
-                    "failed_not_refunded": mismatch_statement_df,
-                    "ledger_count": ledger_count,
-                    "statement_count": statement_count,
-                    "matched_trans_count": matched_count,
-                    "failed_trans_count": failed_count,
-                    "ledger_credit_count": credit_count,
-                }
-        elif service_name in ["AEPS"]:
-            """
-            AEPS Service Block
-            - Compares settled IDs, handles commission matches, and amount mismatches.
-            """
-            ledger_df = ledger_df[
-                ~ledger_df["TXNTYPE"]
-                .str.strip()
-                .str.contains(
-                    "settlement|Merchant Two Factor Authentication Charges|Ministatement",
-                    case=False,
-                    na=False,
-                )
-            ].copy()
-            # Normalize column names
-            statement_df.columns = statement_df.columns.str.strip().str.upper()
-            ledger_df.columns = ledger_df.columns.str.strip().str.upper()
-
-            # Count credit entries
-            credit_count = ledger_df[
-                ledger_df["TYPE"].str.strip().str.lower() == "credit"
-            ].shape[0]
-
-            # Required columns
-            REQUIRED_COLUMNS = [
-                "SETTLED_ID",
-                "COMMISSION_SNO",
-                "SERIALNUMBER",
-                "ACKNO",
-                "UTR",
-                "AMOUNT_LEDGER",
-                "AMOUNT_STATEMENT",
-                "COMMISSION_STATEMENT",
-                "TYPE",
-                "STATUS",
-                "DATE",
-            ]
-
-            # Rename amount column
-            if "AMOUNT" in ledger_df.columns:
-                ledger_df = ledger_df.rename(columns={"AMOUNT": "AMOUNT_LEDGER"})
-
-            # Step 1: Compare Settled ID with SNO
-            withdrawal_grouped = (
-                statement_df.groupby("SETTLED_ID", as_index=False)["AMOUNT"]
-                .sum()
-                .rename(columns={"AMOUNT": "SUM_AMOUNT"})
-            )
-            print("Withdrawal Grouped Columns:", withdrawal_grouped.columns.tolist())
+    except Exception as e:
+        logger.error(
+            f"Vendor Ledger Reconciliation error: {str(e)}\n{traceback.format_exc()}"
+        )
+        return "Error processing vendor ledger reconciliation."
 
-            merged_step1 = withdrawal_grouped.merge(
-                ledger_df, left_on="SETTLED_ID", right_on="SNO", how="inner"
-            )
-            print("Merged Step 1 Columns:", merged_step1.columns.tolist())
-            # Amount mismatch handling
-            amount_mismatch_rows = merged_step1[
-                merged_step1["SUM_AMOUNT"] != merged_step1["AMOUNT_LEDGER"]
-            ]
-            amount_mismatch_rows = amount_mismatch_rows.rename(
-                columns={"COMMISSION": "COMMISSION_"}
-            )
-            amount_mismatch_rows = safe_column_select(
-                amount_mismatch_rows, REQUIRED_COLUMNS + ["SUM_AMOUNT"]
-            )
 
-            merged_step1 = merged_step1[
-                merged_step1["SUM_AMOUNT"] == merged_step1["AMOUNT_LEDGER"]
-            ]
-
-            merged_step1_full = merged_step1.merge(
-                statement_df.rename(columns={"AMOUNT": "AMOUNT_STATEMENT"}),
-                on="SETTLED_ID",
-                how="left",
-            ).drop(columns=["SUM_AMOUNT"], errors="ignore")
-
-            # Step 2: Identify unmatched ledger rows
-            matched_snos = withdrawal_grouped["SETTLED_ID"]
-            unmatched_ledger = ledger_df[~ledger_df["SNO"].isin(matched_snos)].copy()
-
-            # Commission matches
-            base_snos = (
-                merged_step1["SNO"]
-                if "SNO" in merged_step1.columns
-                else pd.Series([], dtype="int64")
-            )
-            commission_match_mask = unmatched_ledger["SNO"].isin(base_snos + 1)
-            commission_match = (
-                unmatched_ledger[commission_match_mask]
-                .copy()
-                .rename(columns={"SNO": "COMMISSION_SNO"})
-            )
+# ----------------------------------------------------------------------------------
+# RECHARGE & DMT
+def recharge_dmt_rules(ledger_df, statement_df, service_name):
+    """
+    Handles matching, mismatches, and refund logic for recharge and DMT services.
+    """
+    # DMT specific status normalization to 'failed' or 'success'
+    if service_name == "DMT":
+        statement_df["STATUS"] = (
+            statement_df["STATUS"]
+            .astype(str)
+            .str.lower()
+            .apply(lambda x: "failed" if "refunded" in x else "success")
+        )
 
-            unmatched_ledger_final = unmatched_ledger[~commission_match_mask].copy()
-            unmatched_ledger_final = unmatched_ledger_final.rename(
-                columns={"SNO": "SETTLED_ID"}
-            )
-            unmatched_ledger_final = safe_column_select(
-                unmatched_ledger_final, REQUIRED_COLUMNS
-            )
-            # Step 3: Unmatched withdrawals
-            unmatched_statement = (
-                statement_df[
-                    (~statement_df["SETTLED_ID"].isin(ledger_df["SNO"]))
-                    & (statement_df["STATUS"].str.lower() != "failed")
+    # Precompute frequently used values
+    failed_count = statement_df[
+        statement_df["STATUS"].str.strip().str.lower() == "failed"
+    ].shape[0]
+    credit_count = ledger_df[
+        ledger_df["TYPE"].str.strip().str.lower() == "credit"
+    ].shape[0]
+
+    # Standardize commission columns - simplified
+    if "COMM/SHARE" in ledger_df.columns:
+        ledger_df = ledger_df.rename(columns={"COMM/SHARE": "COMM"})
+    if "NET COMMISSION" in statement_df.columns:
+        statement_df = statement_df.rename(columns={"NET COMMISSION": "COMM"})
+
+    # Date formatting - optimized loop
+    date_dfs = [ledger_df, statement_df]
+    for df in date_dfs:
+        if "DATE" in df.columns:
+            df["DATE"] = pd.to_datetime(df["DATE"], errors="coerce").dt.strftime(
+                "%Y-%m-%d"
+            )
+
+    REQUIRED_COLUMNS = [
+        "TXNID",
+        "AMOUNT",
+        "COMM",
+        "TDS",
+        "TYPE",
+        "DATE",
+        "REFID",
+        "STATUS",
+        "REFUND_TXNID",
+        "REFUNDED_DATE",
+    ]
+
+    # Preprocess dataframes
+    statement_df["REFID"] = statement_df["REFID"].astype(str).str.strip()
+    statement_df["REFUNDED_DATE"] = statement_df["REFUND"].str.extract(
+        r"Date :\s*(\d{4}-\d{2}-\d{2})"
+    )
+
+    # Matched rows and both sides' mismatches in one pass on TXNID
+    not_in_statement_df, not_in_ledger_df, matching_Trans_df = match_vendor_rows(
+        ledger_df,
+        statement_df,
+        service_name,
+        ledger_columns=["TXNID", "TYPE"],
+        statement_first=True,
+    )
+    matching_Trans_df = safe_column_select(matching_Trans_df, REQUIRED_COLUMNS)
+    matched_count = matching_Trans_df.shape[0]
+
+    not_in_statement_df = not_in_statement_df.rename(
+        columns={"REFUNDTXNID": "REFUND_TXNID"}
+    )
+    not_in_statement_df = safe_column_select(not_in_statement_df, REQUIRED_COLUMNS)
+
+    not_in_ledger_df = not_in_ledger_df.rename(columns={"REFUNDTXNID": "REFUND_TXNID"})
+    not_in_ledger_df = safe_column_select(not_in_ledger_df, REQUIRED_COLUMNS)
+
+    # Extract REFUND_TXNID
+    if "REFUND" in statement_df.columns and service_name == "RECHARGE":
+        statement_df["REFUND_TXNID"] = statement_df["REFUND"].str.extract(
+            r"Txnid(\d+)", expand=False
+        )
+    elif "REFUNDTXNID" in statement_df.columns and service_name == "DMT":
+        statement_df["REFUND_TXNID"] = statement_df["REFUNDTXNID"].str.strip()
+
+    # Failed refunds
+    failed_refunds = (
+        statement_df.loc[
+            statement_df["STATUS"].str.lower().str.strip() == "failed"
+        ].copy()
+        if "STATUS" in statement_df.columns
+        else pd.DataFrame(columns=statement_df.columns)
+    )
+
+    # Prepare for merge
+    not_in_statement_df["TXNID"] = not_in_statement_df["TXNID"].astype(str).str.strip()
+    failed_refunds["REFUND_TXNID"] = (
+        failed_refunds["REFUND_TXNID"].astype(str).str.strip()
+    )
+
+    # Matching refunds
+    matching_refunds_df = (
+        failed_refunds.merge(
+            not_in_statement_df[["TXNID", "TYPE"]],
+            left_on="REFUND_TXNID",
+            right_on="TXNID",
+            how="inner",
+            indicator=True,
+        )
+        .query('_merge == "both"')
+        .drop(columns=["TXNID_y", "_merge"])
+        .rename(columns={"TXNID_x": "TXNID"})
+    )
+
+    matching_refunds_df = safe_column_select(matching_refunds_df, REQUIRED_COLUMNS)
+
+    # Mismatch handling
+    if "REFUND_TXNID" in failed_refunds.columns:
+        merged_df = failed_refunds.merge(
+            not_in_statement_df[
+                [
+                    "TXNID",
+                    "TYPE",
+                    "AMOUNT",
+                    "COMM",
+                    "TDS",
+                    "DATE",
+                    "REFID",
+                    "REFUND_TXNID",
                 ]
-                .rename(
-                    columns={
-                        "AMOUNT": "AMOUNT_STATEMENT",
-                        "COMMISSION": "COMMISSION_STATEMENT",
-                    }
-                )
-                .copy()
-            )
-            unmatched_statement = safe_column_select(
-                unmatched_statement, REQUIRED_COLUMNS
-            )
-            # Step 4: Merge commission matches
-            sno_col = next(
-                (
-                    col
-                    for col in ["SNO", "SNO_x", "SNO_y"]
-                    if col in merged_step1_full.columns
-                ),
-                None,
-            )
-
-            if sno_col:
-                merged_step1_full["SNO_PLUS1"] = (
-                    pd.to_numeric(merged_step1_full[sno_col], errors="coerce") + 1
-                )
-            else:
-                merged_step1_full["SNO_PLUS1"] = pd.NA
-
-            # Ensure numeric types
-            commission_match["COMMISSION_SNO"] = pd.to_numeric(
-                commission_match["COMMISSION_SNO"], errors="coerce"
-            )
-            merged_step1_full["SNO_PLUS1"] = pd.to_numeric(
-                merged_step1_full["SNO_PLUS1"], errors="coerce"
-            )
-
-            # Merge commission matches
-            commission_merged = (
-                commission_match.merge(
-                    merged_step1_full,
-                    left_on="COMMISSION_SNO",
-                    right_on="SNO_PLUS1",
-                    how="inner",
-                    suffixes=("", "_STATEMENT"),
-                )
-                .drop(columns=["SNO_PLUS1", "AMOUNT_LEDGER"], errors="ignore")
-                .rename(
-                    columns={
-                        "COMMISSION_y": "COMMISSION_STATEMENT",
-                        "AMOUNT_LEDGER_STATEMENT": "AMOUNT_LEDGER",
-                    }
-                )
-            )
-
-            # Final column selection
-            commission_merged = safe_column_select(commission_merged, REQUIRED_COLUMNS)
-            unmatched_ledger_final = safe_column_select(
-                unmatched_ledger_final, REQUIRED_COLUMNS
-            )
-            # Count results
-            matched_count = commission_merged.shape[0]
-            failed_count = (
-                unmatched_statement.shape[0] + unmatched_ledger_final.shape[0]
-            )
-
-            # Clean numeric columns
-            numeric_columns = [
-                "SETTLED_ID",
-                "SNO",
-                "COMMISSION_SNO",
-                "SNO_PLUS1",
-                "SERIALNUMBER",
-                "UTR",
-            ]
-            for col in numeric_columns:
-                if col in commission_merged.columns:
-                    commission_merged[col] = (
-                        commission_merged[col]
-                        .fillna("")
-                        .astype(str)
-                        .str.replace(r"\.0$", "", regex=True)
-                    )
-
-            logger.info("Vendor ledger reconciliation completed successfully.")
-
-            if (
-                unmatched_ledger_final.empty
-                and unmatched_statement.empty
-                and amount_mismatch_rows.empty
-            ):
-                return {
-                    "message": "No Mismatch..!",
-                    "matching_trans": commission_merged,
-                    "ledger_count": ledger_count,
-                    "statement_count": statement_count,
-                    "matched_trans_count": matched_count,
-                    "failed_trans_count": failed_count,
-                    "ledger_credit_count": credit_count,
-                }
-            else:
-                return {
-                    "matching_trans": commission_merged,
-                    "not_in_statement": unmatched_ledger_final,
-                    "not_in_ledger": unmatched_statement,
-                    "ledger_count": ledger_count,
-                    "amount_mismatch": amount_mismatch_rows,
-                    "statement_count": statement_count,
-                    "matched_trans_count": matched_count,
-                    "failed_trans_count": failed_count,
-                    "ledger_credit_count": credit_count,
-                }
-        elif service_name in ["MATM"]:
-            """
-            MATM Service Block
-            - Cleans RRN/amount columns, matches transactions, and finds mismatches.
-            """
-            statement_df.columns = statement_df.columns.str.strip().str.upper()
-            ledger_df.columns = ledger_df.columns.str.strip().str.upper()
-            ledger_df["AMOUNT"] = (
-                ledger_df["AMOUNT"]
-                .astype(str)  # Convert to string first
-                .str.replace("₹", "", regex=False)  # Remove ₹ symbol
-                .str.replace(" ", "", regex=False)  # Remove spaces
-                .str.strip()  # Remove any remaining whitespace
-            )
+            ],
+            left_on="REFUND_TXNID",
+            right_on="TXNID",
+            how="outer",
+            indicator=True,
+        )
 
-            # Handle RRN conversion properly
-            def clean_rrn_value(value):
-                try:
-                    # Convert to float first to handle numbers, then to int to remove decimal
-                    return (
-                        str(int(float(value)))
-                        if pd.notna(value) and str(value).strip() != "nan"
-                        else ""
-                    )
-                except (ValueError, TypeError):
-                    return str(value).strip()
-
-            # Clean RRN and UTR columns
-            statement_df["RRN"] = statement_df["RRN"].apply(clean_rrn_value)
-            statement_df["AMOUNT"] = statement_df["AMOUNT"].apply(clean_rrn_value)
-            ledger_df["UTR"] = ledger_df["UTR"].astype(str).str.strip()
-            ledger_df["AMOUNT"] = ledger_df["AMOUNT"].apply(clean_rrn_value)
-
-            # Remove rows with "NA" in RRN
-            statement_df = statement_df[statement_df["RRN"] != ""]
-
-            credit_count = ledger_df[
-                ledger_df["CR/DR"].str.strip().str.lower() == "cr"
-            ].shape[0]
-
-            REQUIRED_COLUMNS = [
-                "BCID",
-                "AMOUNT_STATEMENT",
-                "AMOUNT_LEDGER",
-                "RRN",
-                "TRANSACTIONSTATUS",
-                "DATE",
-            ]
-
-            # Rename amount columns
-            if "AMOUNT" in statement_df.columns:
-                statement_df = statement_df.rename(
-                    columns={"AMOUNT": "AMOUNT_STATEMENT"}
-                ).astype(str)
-            if "AMOUNT" in ledger_df.columns:
-                ledger_df = ledger_df.rename(
-                    columns={"AMOUNT": "AMOUNT_LEDGER"}
-                ).astype(str)
-
-            # FIXED: Amount comparison - this was comparing entire columns incorrectly
-            # amount_mismatch_rows = ledger_df[ledger_df["AMOUNT_LEDGER"] != statement_df["AMOUNT_STATEMENT"]]  # WRONG
-
-            # Instead, merge first and then compare amounts
-            merged_for_comparison = ledger_df.merge(
-                statement_df, left_on="UTR", right_on="RRN", how="inner"
-            )
-            if not merged_for_comparison.empty:
-                amount_mismatch_rows = merged_for_comparison[
-                    merged_for_comparison["AMOUNT_LEDGER"]
-                    != merged_for_comparison["AMOUNT_STATEMENT"]
+        # Mismatch statement
+        mismatch_statement_df = (
+            merged_df.query('_merge == "left_only"')
+            .drop(
+                columns=[
+                    "_merge",
+                    "TXNID_y",
+                    "TDS_x",
+                    "COMM_y",
+                    "AMOUNT_y",
+                    "DATE_y",
+                    "REFID_y",
+                    "REFUND_TXNID_y",
                 ]
-            else:
-                amount_mismatch_rows = pd.DataFrame()
-
-            amount_mismatch_rows = safe_column_select(
-                amount_mismatch_rows, REQUIRED_COLUMNS
             )
-
-            # Find unmatched records
-            not_in_statement_df = ledger_df[
-                ~ledger_df["UTR"].isin(statement_df["RRN"])
-            ].copy()
-            not_in_statement_df = safe_column_select(
-                not_in_statement_df, REQUIRED_COLUMNS
-            )
-
-            not_in_ledger_df = (
-                statement_df[~statement_df["RRN"].isin(ledger_df["UTR"])]
-                .copy()
-                .rename(columns={"UTR": "RRN"})
-            )
-            not_in_ledger_df = safe_column_select(not_in_ledger_df, REQUIRED_COLUMNS)
-
-            # Merge for matched records
-            merged_df = ledger_df.merge(
-                statement_df, left_on="UTR", right_on="RRN", how="inner"
-            )
-            merged_df = merged_df[
-                merged_df["AMOUNT_LEDGER"] == merged_df["AMOUNT_STATEMENT"]
-            ]
-
-            if not merged_df.empty:
-                matched_count = merged_df.shape[0]
-                merged_df = safe_column_select(merged_df, REQUIRED_COLUMNS)
-            else:
-                matched_count = 0
-                merged_df = pd.DataFrame(columns=REQUIRED_COLUMNS)
-
-            failed_count = not_in_statement_df.shape[0] + not_in_ledger_df.shape[0]
-            logger.info("Vendor ledger reconciliation completed successfully.")
-            if (
-                not_in_ledger_df.empty
-                and not_in_statement_df.empty
-                and amount_mismatch_rows.empty
-            ):
-                return {
-                    "message": "No Mismatch...",
-                    "matching_trans": merged_df,
-                    "ledger_count": ledger_count,
-                    "statement_count": statement_count,
-                    "matched_trans_count": matched_count,
-                    "failed_trans_count": failed_count,
-                    "ledger_credit_count": credit_count,
-                }
-            else:
-                return {
-                    "matching_trans": merged_df,
-                    "ledger_count": ledger_count,
-                    "statement_count": statement_count,
-                    "matched_trans_count": matched_count,
-                    "failed_trans_count": failed_count,
-                    "ledger_credit_count": credit_count,
-                    "not_in_statement": not_in_statement_df,
-                    "not_in_ledger": not_in_ledger_df,
-                    "ledger_count": ledger_count,
-                    "amount_mismatch": amount_mismatch_rows,
-                }
-        elif service_name in ["BBPS"]:
-            """
-            BBPS Service Block
-            - Standardizes columns, matches transactions, and finds mismatches.
-            """
-            # Rename columns for consistency
-            ledger_df = ledger_df.rename(
-                columns={"Chq / Ref No.": "TRANS_REF_ID_LGR", "Debit": "AMOUNT_LEDGER"}
-            )
-            statement_df = statement_df.rename(
-                columns={
-                    "Transaction Ref ID": "TRANS_REF_ID_STMT",
-                    "Transaction Amount(RS.)": "AMOUNT_STATEMENT",
-                    "NPCI Transaction Desc": "TRANSACTION_STATUS",
-                }
-            )
-
-            # Standardize column names
-            statement_df.columns = statement_df.columns.str.strip().str.upper()
-            ledger_df.columns = ledger_df.columns.str.strip().str.upper()
-
-            def clean_rrn_value(value):
-                """
-                Clean RRN/Amount values:
-                - Convert float-like strings to int (remove decimals)
-                - Return empty string for NaN/None
-                - Strip spaces from strings
-                """
-                try:
-                    if pd.notna(value) and str(value).strip().lower() != "nan":
-                        return str(int(float(value)))
-                    return ""
-                except (ValueError, TypeError):
-                    return str(value).strip() if pd.notna(value) else ""
-
-            # Clean amount columns and strip spaces in single loops
-            for df in [ledger_df, statement_df]:
-                for col in df.columns:
-                    if df[col].dtype == "object":
-                        df[col] = df[col].apply(
-                            lambda x: x.strip() if isinstance(x, str) else x
-                        )
-
-                # Clean specific amount columns
-                if "AMOUNT_LEDGER" in df.columns:
-                    df["AMOUNT_LEDGER"] = df["AMOUNT_LEDGER"].apply(clean_rrn_value)
-                if "AMOUNT_STATEMENT" in df.columns:
-                    df["AMOUNT_STATEMENT"] = df["AMOUNT_STATEMENT"].apply(
-                        clean_rrn_value
-                    )
-
-            # Convert to string after cleaning
-            ledger_df["AMOUNT_LEDGER"] = ledger_df["AMOUNT_LEDGER"].astype(str)
-            statement_df["AMOUNT_STATEMENT"] = statement_df["AMOUNT_STATEMENT"].astype(
-                str
-            )
-
-            REQUIRED_COLUMNS = [
-                "TRANS_REF_ID",
-                "AMOUNT_LEDGER",
-                "AMOUNT_STATEMENT",
-                "REFUNDED_AMOUNT",
-                "TRANSACTION_STATUS",
-                "ACTUAL_TRANS_DATE",
-                "DATE",
-            ]
-
-            # Count credit transactions
-            credit_trans = ledger_df[ledger_df["CREDIT"].notna()].copy()
-            credit_trans = credit_trans.drop(columns=["AMOUNT_LEDGER"]).rename(
+            .rename(
                 columns={
-                    "CREDIT": "AMOUNT_LEDGER",
-                    "TRANS_REF_ID_LGR": "TRANS_REF_ID",
-                    "TRANSACTION DATE": "DATE",
+                    "TXNID_x": "TXNID",
+                    "TDS_x": "TDS",
+                    "COMM_x": "COMM",
+                    "AMOUNT_x": "AMOUNT",
+                    "DATE_x": "DATE",
+                    "TYPE_x": "TYPE",
+                    "REFID_x": "REFID",
+                    "REFUND_TXNID_x": "REFUND_TXNID",
                 }
             )
-            credit_count = credit_trans.shape[0]
-            credit_trans = safe_column_select(credit_trans, REQUIRED_COLUMNS)
-
-            # Filter ledger and find mismatches
-            ledger_filtered_df = ledger_df[
-                ledger_df["TRANS_REF_ID_LGR"].str.startswith("KM", na=False)
-            ]
-
-            # Find transactions not in statement
-            not_in_statement_df = (
-                ledger_filtered_df[
-                    ~ledger_filtered_df["TRANS_REF_ID_LGR"].isin(
-                        statement_df["TRANS_REF_ID_STMT"]
-                    )
-                ]
-                .copy()
-                .rename(columns={"TRANS_REF_ID_LGR": "TRANS_REF_ID"})
-            )
-            not_in_statement_df["DATE"] = not_in_statement_df["TRANSACTION DATE"]
-            not_in_statement_df = safe_column_select(
-                not_in_statement_df, REQUIRED_COLUMNS
-            )
-
-            # Find transactions not in ledger
-            not_in_ledger_df = (
-                statement_df[
-                    ~statement_df["TRANS_REF_ID_STMT"].isin(
-                        ledger_df["TRANS_REF_ID_LGR"]
-                    )
-                ]
-                .copy()
-                .rename(columns={"TRANS_REF_ID_STMT": "TRANS_REF_ID"})
-            )
-            not_in_ledger_df["DATE"] = not_in_ledger_df["TRANSACTION DATE"]
-            not_in_ledger_df = safe_column_select(not_in_ledger_df, REQUIRED_COLUMNS)
-
-            # Merge dataframes and find matches
-            merged_df = ledger_df.merge(
-                statement_df,
-                left_on="TRANS_REF_ID_LGR",
-                right_on="TRANS_REF_ID_STMT",
-                how="inner",
-            ).rename(columns={"TRANS_REF_ID_LGR": "TRANS_REF_ID"})
-
-            # Find matching amounts and failed transactions
-            amount_match_df = merged_df[
-                merged_df["AMOUNT_LEDGER"] == merged_df["AMOUNT_STATEMENT"]
-            ].copy()
-
-            failed_trans = amount_match_df[
-                amount_match_df["TRANSACTION_STATUS"]
-                .str.lower()
-                .str.strip()
-                .str.contains("failure|transaction timed out|^na$", regex=True, na=True)
-                .fillna(False)
-            ]
-
-            # Process credit rows and refund checks
-            ledger_credit_rows = ledger_df[ledger_df["CREDIT"].notna()]
-            ledger_credit_rows = ledger_credit_rows[
-                ledger_credit_rows["DESCRIPTION"].str.contains(
-                    r"^(BBPS-)?[A-Z]{2,3}\d{1,2}-REF-", regex=True, na=False
-                )
-            ]
-            ledger_credit_rows["REF_NUMBER"] = ledger_credit_rows[
-                "DESCRIPTION"
-            ].str.extract(r"REF-([A-Z0-9]+)-")
-
-            credit_trans_not_in_statement = ledger_credit_rows[
-                ~ledger_credit_rows["REF_NUMBER"].isin(
-                    statement_df["TRANS_REF_ID_STMT"]
-                )
-            ].copy()
-            credit_trans_not_in_statement["TRANS_DATE"] = (
-                credit_trans_not_in_statement["DESCRIPTION"].str.split("-").str[-1]
-            )
-
-            def standardize_dates(df, date_column="TRANS_DATE"):
-                result_df = df.copy()
-                slash_dates = pd.to_datetime(
-                    result_df[date_column], format="%m/%d/%Y", errors="coerce"
-                )
-                noslash_dates = pd.to_datetime(
-                    result_df[date_column], format="%d%m%Y", errors="coerce"
-                )
-                standardized = slash_dates.fillna(noslash_dates)
-                result_df["TRANS_DATE_STANDARDIZED"] = standardized.dt.strftime(
-                    "%Y-%m-%d"
-                )
-                return result_df
-
-            credit_trans_not_in_statement = standardize_dates(
-                credit_trans_not_in_statement
-            )
-            credit_trans_not_in_statement = credit_trans_not_in_statement.drop(
-                columns=["TRANS_DATE"]
-            ).rename(
-                columns={
-                    "CREDIT": "REFUNDED_AMOUNT",
-                    "REF_NUMBER": "TRANS_REF_ID",
-                    "TRANSACTION DATE": "DATE",
-                    "TRANS_DATE_STANDARDIZED": "ACTUAL_TRANS_DATE",
-                }
-            )
-            credit_trans_not_in_statement = safe_column_select(
-                credit_trans_not_in_statement, REQUIRED_COLUMNS
-            )
-
-            # Refund checks
-            refund_check = failed_trans.merge(
-                ledger_credit_rows[["REF_NUMBER", "CREDIT"]],
-                left_on="TRANS_REF_ID",
-                right_on="REF_NUMBER",
-                how="inner",
-            ).rename(columns={"CREDIT_y": "REFUNDED_AMOUNT"})
-
-            refund_check["REFUNDED_AMOUNT"] = refund_check["REFUNDED_AMOUNT"].astype(
-                float
-            )
-            refund_check["AMOUNT_STATEMENT"] = refund_check["AMOUNT_STATEMENT"].astype(
-                float
-            )
-
-            refund_amount_match = refund_check[
-                refund_check["REFUNDED_AMOUNT"] == refund_check["AMOUNT_STATEMENT"]
-            ]
-            refund_amount_mismatch = refund_check[
-                refund_check["REFUNDED_AMOUNT"] != refund_check["AMOUNT_STATEMENT"]
-            ]
-            refund_amount_mismatch = refund_amount_mismatch.rename(
-                columns={"TRANSACTION DATE_x": "DATE"}
-            )
-
-            refund_amount_match = safe_column_select(
-                refund_amount_match, REQUIRED_COLUMNS
-            )
-            refund_amount_mismatch = safe_column_select(
-                refund_amount_mismatch, REQUIRED_COLUMNS
-            )
-
-            # Find amount mismatches
-            amount_mismatch_rows = merged_df[
-                merged_df["AMOUNT_LEDGER"] != merged_df["AMOUNT_STATEMENT"]
-            ].copy()
-            amount_mismatch_rows.loc[:, "DATE"] = amount_mismatch_rows[
-                "TRANSACTION DATE_x"
-            ]
-            amount_mismatch_rows = safe_column_select(
-                amount_mismatch_rows, REQUIRED_COLUMNS
-            )
+        )
 
-            # Process matched transactions
-            if not amount_match_df.empty:
-                matched_count = amount_match_df.shape[0]
-                amount_match_df = amount_match_df.merge(
-                    refund_amount_match,
-                    on="TRANS_REF_ID",
-                    how="left",
-                    suffixes=("", "_REFUND"),
-                )
-                amount_match_df.loc[:, "DATE"] = amount_match_df["TRANSACTION DATE_x"]
-                merged_df = safe_column_select(amount_match_df, REQUIRED_COLUMNS)
-
-                failed_not_refunded = merged_df[
-                    merged_df["TRANSACTION_STATUS"].str.contains(
-                        "failure|transaction timed out", case=False, na=False
-                    )
-                    & merged_df["REFUNDED_AMOUNT"].isna()
+        # Mismatch ledger
+        mismatch_ledger_df = (
+            merged_df.query('_merge == "right_only"')
+            .drop(
+                columns=[
+                    "_merge",
+                    "TXNID_x",
+                    "TDS_x",
+                    "COMM_x",
+                    "AMOUNT_x",
+                    "DATE_x",
+                    "REFID_x",
+                    "REFUND_TXNID_x",
                 ]
-                merged_df = merged_df[~merged_df.index.isin(failed_not_refunded.index)]
-            else:
-                matched_count = 0
-                merged_df = pd.DataFrame(columns=REQUIRED_COLUMNS)
-
-            # Calculate failed count
-            failed_count = (
-                not_in_statement_df.shape[0]
-                + not_in_ledger_df.shape[0]
-                + amount_mismatch_rows.shape[0]
-                + refund_amount_mismatch.shape[0]
-            )
-
-            logger.info("Vendor ledger reconciliation completed successfully.")
-
-            # Return results
-            if (
-                not_in_ledger_df.empty
-                and not_in_statement_df.empty
-                and amount_mismatch_rows.empty
-                and credit_trans.empty
-                and refund_amount_mismatch.empty
-                and failed_not_refunded.empty
-            ):
-                return {
-                    "message": "No Mismatch...",
-                    "matching_trans": merged_df,
-                    "ledger_count": ledger_count,
-                    "statement_count": statement_count,
-                    "failed_count": failed_count,
-                    "matched_count": matched_count,
-                    "ledger_credit_count": credit_count,
-                }
-            else:
-                return {
-                    "matching_trans": merged_df,
-                    "ledger_count": ledger_count,
-                    "statement_count": statement_count,
-                    "matched_trans_count": matched_count,
-                    "failed_trans_count": failed_count,
-                    "ledger_credit_count": credit_count,
-                    "not_in_statement": not_in_statement_df,
-                    "not_in_ledger": not_in_ledger_df,
-                    "amount_mismatch": amount_mismatch_rows,
-                    "Credit_Trans_in_Ledger_not_in_Stmnt": credit_trans_not_in_statement,
-                    "refund_amount_mismatch": refund_amount_mismatch,
-                    "failed_not_refunded": failed_not_refunded,
-                }
-        elif service_name in ["LIC"]:
-            """
-            LIC Service Block
-            - Standardizes columns, matches on TID and amount, and handles commission matching.
-            """
-            # === Standardize columns and read IDs as strings ===
-            statement_df = pd.read_excel(
-                vendor_statement, dtype={"IMWTID": str, "AMOUNT": str}
-            )
-            ledger_df = pd.read_excel(
-                vendor_ledger,
-                dtype={"TID": str, "REFERENCE TID": str, "DR": str, "CR": str},
-            )
-
-            # Standardize column names
-            statement_df.columns = statement_df.columns.str.strip().str.upper()
-            ledger_df.columns = ledger_df.columns.str.strip().str.upper()
-
-            # Filter valid IMWTID rows
-            statement_df = statement_df[
-                statement_df["IMWTID"].notna()
-                & (statement_df["IMWTID"].astype(str).str.strip() != "NA")
-            ].copy()
-            statement_count = statement_df.shape[0]
-
-            # Rename columns
-            statement_df = statement_df.rename(
-                columns={"AMOUNT": "STMT_AMOUNT", "IMWTID": "STMT_TID"}
-            )
-            ledger_df = ledger_df.rename(
-                columns={"DR": "LDG_AMOUNT", "TID": "LDG_TID", "CR": "COMM_AMT"}
-            )
-
-            # === Standardize TID columns as strings ===
-            for col in ["STMT_TID"]:
-                statement_df[col] = statement_df[col].astype(str).str.strip()
-
-            for col in ["LDG_TID", "REFERENCE TID"]:
-                ledger_df[col] = ledger_df[col].astype(str).str.strip()
-
-            # === Clean and convert numeric columns ===
-            for col in ["STMT_AMOUNT"]:
-                statement_df[col] = pd.to_numeric(
-                    statement_df[col].astype(str).str.strip(), errors="coerce"
-                )
-
-            for col in ["LDG_AMOUNT", "COMM_AMT"]:
-                ledger_df[col] = pd.to_numeric(
-                    ledger_df[col].astype(str).str.strip(), errors="coerce"
-                )
-
-            # === Reconciliation logic ===
-            REQUIRED_COLUMNS = [
-                "LDG_TID",
-                "COMMISSION_TID",
-                "COMM_AMT",
-                "LDG_AMOUNT",
-                "STMT_AMOUNT",
-                "DATE",
-            ]
-
-            # Find unmatched transactions
-            not_in_ledger_df = (
-                statement_df[~statement_df["STMT_TID"].isin(ledger_df["LDG_TID"])]
-                .copy()
-                .rename(columns={"STMT_TID": "LDG_TID"})
-            )
-
-            not_in_statement_df = ledger_df[
-                ~ledger_df["LDG_TID"].isin(statement_df["STMT_TID"])
-            ].copy()
-
-            # Match on TID and amount
-            matched_df = ledger_df.merge(
-                statement_df,
-                left_on="LDG_TID",
-                right_on="STMT_TID",
-                how="inner",
-            )
-
-            amount_matched_df = matched_df[
-                matched_df["LDG_AMOUNT"] == matched_df["STMT_AMOUNT"]
-            ]
-            amount_matched_df = safe_column_select(amount_matched_df, REQUIRED_COLUMNS)
-
-            # Amount mismatches
-            amount_mismatch_rows = matched_df[
-                matched_df["LDG_AMOUNT"] != matched_df["STMT_AMOUNT"]
-            ].copy()
-            amount_mismatch_rows = safe_column_select(
-                amount_mismatch_rows, REQUIRED_COLUMNS
-            )
-
-            # Commission matching
-            commission_match_df = not_in_statement_df[
-                not_in_statement_df["LDG_TID"].isin(ledger_df["LDG_TID"])
-            ].copy()
-
-            # Ensure consistent data types for merging
-            commission_match_df["REFERENCE TID"] = (
-                commission_match_df["REFERENCE TID"].astype(str).str.strip()
-            )
-            amount_matched_df["LDG_TID"] = (
-                amount_matched_df["LDG_TID"].astype(str).str.strip()
-            )
-
-            # Merge commission transactions
-            matched_trans_comm_df = amount_matched_df.merge(
-                commission_match_df,
-                left_on="LDG_TID",
-                right_on="REFERENCE TID",
-                how="inner",
-            ).rename(
-                columns={
-                    "COMM_AMT_y": "COMM_AMT",
-                    "LDG_AMOUNT_x": "LDG_AMOUNT",
-                    "LDG_TID_x": "LDG_TID",
-                    "LDG_TID_y": "COMMISSION_TID",
-                }
-            )
-
-            amount_mismatch_comm_df = amount_mismatch_rows.merge(
-                not_in_statement_df,
-                left_on="LDG_TID",
-                right_on="REFERENCE TID",
-                how="inner",
-            ).rename(
-                columns={
-                    "COMM_AMT_y": "COMM_AMT",
-                    "LDG_AMOUNT_x": "LDG_AMOUNT",
-                    "LDG_TID_x": "LDG_TID",
-                    "LDG_TID_y": "COMMISSION_TID",
-                }
-            )
-
-            amount_mismatch_comm_df = safe_column_select(
-                amount_mismatch_comm_df, REQUIRED_COLUMNS
-            )
-            matched_trans_comm_df = safe_column_select(
-                matched_trans_comm_df, REQUIRED_COLUMNS
-            )
-            not_in_ledger_df = safe_column_select(not_in_ledger_df, REQUIRED_COLUMNS)
-
-            # Final unmatched statements
-            not_in_statement_final_df = not_in_statement_df[
-                ~not_in_statement_df["LDG_TID"].isin(
-                    matched_trans_comm_df["COMMISSION_TID"]
-                )
-            ].copy()
-            not_in_statement_final_df = not_in_statement_final_df[
-                ~not_in_statement_final_df["LDG_TID"].isin(
-                    amount_mismatch_comm_df["COMMISSION_TID"]
-                )
-            ].copy()
-            not_in_statement_final_df = safe_column_select(
-                not_in_statement_final_df, REQUIRED_COLUMNS
             )
-
-            # Count calculations
-            matched_count = matched_trans_comm_df.shape[0]
-            failed_count = (
-                not_in_ledger_df.shape[0]
-                + not_in_statement_final_df.shape[0]
-                + amount_mismatch_rows.shape[0]
-            )
-            credit_count = ledger_df[
-                ledger_df["COMM_AMT"].notna() & (ledger_df["COMM_AMT"] != 0)
-            ].shape[0]
-            ledger_count = ledger_df.shape[0]
-
-            logger.info("Vendor ledger reconciliation completed successfully.")
-
-            # Prepare response
-            result_data = {
-                "matching_trans": matched_trans_comm_df,
-                "ledger_count": ledger_count,
-                "statement_count": statement_count,
-                "matched_trans_count": matched_count,
-                "failed_trans_count": failed_count,
-                "ledger_credit_count": credit_count,
-            }
-
-            # Add mismatch data only if present
-            if not (
-                amount_mismatch_rows.empty
-                and not_in_ledger_df.empty
-                and not_in_statement_final_df.empty
-            ):
-                result_data.update(
-                    {
-                        "not_in_statement": not_in_statement_final_df,
-                        "not_in_ledger": not_in_ledger_df,
-                        "amount_mismatch": amount_mismatch_comm_df,
-                    }
-                )
-            else:
-                result_data["message"] = "No Mismatch..."
-
-            return result_data
-        elif service_name in ["PANUTI"]:
-            """
-            PANUTI Service Block
-            - Cleans and matches reference numbers, handles failed rows, and finds unmatched records.
-            """
-            statement_df.columns = statement_df.columns.str.strip().str.upper()
-            ledger_df.columns = ledger_df.columns.str.strip().str.upper()
-
-            statement_df = statement_df.rename(
-                columns={
-                    "REFERENCE NO": "STMT_REFERENCE_NO",
-                    "RES AMOUNT": "AMOUNT_STATEMENT",
-                    "TRANS DATE": "STATEMENT_DATE",
-                }
-            )
-            ledger_df = ledger_df.rename(
+            .rename(
                 columns={
-                    "REFERENCE NO": "LDG_REFERENCE_NO",
-                    "UTIITSL AMOUNT": "AMOUNT_LEDGER",
-                    "LOT DATE": "LEDGER_DATE",
+                    "TXNID_y": "TXNID",
+                    "TDS_y": "TDS",
+                    "COMM_y": "COMM",
+                    "AMOUNT_y": "AMOUNT",
+                    "DATE_y": "DATE",
+                    "TYPE_y": "TYPE",
+                    "REFID_y": "REFID",
+                    "REFUND_TXNID_y": "REFUND_TXNID",
                 }
             )
-
-            failed_rows = (
-                statement_df["PAYMENT STATUS"]
-                == "Payment Refunded due to Incomplete Application"
-            )
-            failed_df = statement_df[failed_rows].copy()
-            cleaned_statement_df = statement_df[~failed_rows].copy()
-
-            REQUIRED_COLUMNS = [
-                "LDG_REFERENCE_NO",
-                "STMT_REFERENCE_NO",
-                "AMOUNT_LEDGER",
-                "AMOUNT_STATEMENT",
-                "LEDGER_DATE",
-                "STATEMENT_DATE",
-            ]
-
-            cleaned_statement_df["STMT_REFERENCE_NO"] = (
-                cleaned_statement_df["STMT_REFERENCE_NO"].astype(str).str.strip()
-            )
-            ledger_df["LDG_REFERENCE_NO"] = (
-                ledger_df["LDG_REFERENCE_NO"].astype(str).str.strip()
-            )
-
-            not_in_ledger_df = cleaned_statement_df[
-                ~cleaned_statement_df["STMT_REFERENCE_NO"].isin(
-                    ledger_df["LDG_REFERENCE_NO"]
-                )
-            ].copy()
-            not_in_ledger_df = safe_column_select(not_in_ledger_df, REQUIRED_COLUMNS)
-
-            not_in_statement_df = ledger_df[
-                ~ledger_df["LDG_REFERENCE_NO"].isin(
-                    cleaned_statement_df["STMT_REFERENCE_NO"]
-                )
-            ].copy()
-            not_in_statement_df = safe_column_select(
-                not_in_statement_df, REQUIRED_COLUMNS
-            )
-
-            merged_df = ledger_df.merge(
-                cleaned_statement_df,
-                left_on="LDG_REFERENCE_NO",
-                right_on="STMT_REFERENCE_NO",
-                how="inner",
-            )
-            matched_df = safe_column_select(merged_df, REQUIRED_COLUMNS)
-
-            matched_count = matched_df.shape[0]
-            failed_count = (
-                not_in_ledger_df.shape[0]
-                + not_in_statement_df.shape[0]
-                + failed_df.shape[0]
-            )
-
-            logger.info("Vendor ledger reconciliation completed successfully.")
-
-            # Prepare response
-            result_data = {
-                "matching_trans": matched_df,
-                "ledger_count": ledger_count,
-                "statement_count": statement_count,
-                "matched_trans_count": matched_count,
-                "failed_trans_count": failed_count,
+        )
+    else:
+        mismatch_statement_df = not_in_statement_df.copy()
+        mismatch_ledger_df = pd.DataFrame(columns=REQUIRED_COLUMNS)
+
+    # Final dataframe preparations
+    mismatch_ledger_df = safe_column_select(mismatch_ledger_df, REQUIRED_COLUMNS)
+    mismatch_statement_df = safe_column_select(mismatch_statement_df, REQUIRED_COLUMNS)
+
+    mismatch_statement_df = mismatch_statement_df.merge(
+        statement_df[["TXNID", "REFUNDED_DATE"]], on="TXNID", how="left"
+    )
+    mismatch_statement_df = safe_column_select(mismatch_statement_df, REQUIRED_COLUMNS)
+
+    # Filter failed transactions
+    matching_Trans_df = matching_Trans_df[
+        matching_Trans_df["STATUS"] != "failed"
+    ].copy()
+
+    return vendor_result(
+        {"matching_trans": matching_Trans_df, "matching_refunds": matching_refunds_df},
+        {
+            "matched_trans_count": matched_count,
+            "failed_trans_count": failed_count,
+            "ledger_credit_count": credit_count,
+        },
+        {
+            "not_in_ledger": not_in_ledger_df,
+            "not_in_statement": mismatch_ledger_df,
+            "failed_not_refunded": mismatch_statement_df,
+        },
+    )
+
+
+# ----------------------------------------------------------------------------------
+# AEPS
+def aeps_rules(ledger_df, statement_df, service_name):
+    """
+    Compares settled IDs, handles commission matches, and amount mismatches.
+    """
+    ledger_df = ledger_df[
+        ~ledger_df["TXNTYPE"]
+        .str.strip()
+        .str.contains(
+            "settlement|Merchant Two Factor Authentication Charges|Ministatement",
+            case=False,
+            na=False,
+        )
+    ].copy()
+
+    # Count credit entries
+    credit_count = ledger_df[
+        ledger_df["TYPE"].str.strip().str.lower() == "credit"
+    ].shape[0]
+
+    # Required columns
+    REQUIRED_COLUMNS = [
+        "SETTLED_ID",
+        "COMMISSION_SNO",
+        "SERIALNUMBER",
+        "ACKNO",
+        "UTR",
+        "AMOUNT_LEDGER",
+        "AMOUNT_STATEMENT",
+        "COMMISSION_STATEMENT",
+        "TYPE",
+        "STATUS",
+        "DATE",
+    ]
+
+    # Amounts as paise, so the settled sums compare exactly
+    statement_df["AMOUNT"] = to_paise(statement_df["AMOUNT"])
+    ledger_df["AMOUNT"] = to_paise(ledger_df["AMOUNT"])
+
+    # Rename amount column
+    if "AMOUNT" in ledger_df.columns:
+        ledger_df = ledger_df.rename(columns={"AMOUNT": "AMOUNT_LEDGER"})
+
+    # Step 1: Compare Settled ID with SNO
+    withdrawal_grouped = (
+        statement_df.groupby("SETTLED_ID", as_index=False)["AMOUNT"]
+        .sum()
+        .rename(columns={"AMOUNT": "SUM_AMOUNT"})
+    )
+
+    merged_step1 = withdrawal_grouped.merge(
+        ledger_df, left_on="SETTLED_ID", right_on="SNO", how="inner"
+    )
+    # Amount mismatch handling
+    amount_equal = money_equal(merged_step1["SUM_AMOUNT"], merged_step1["AMOUNT_LEDGER"])
+    amount_mismatch_rows = merged_step1[~amount_equal]
+    amount_mismatch_rows = amount_mismatch_rows.rename(
+        columns={"COMMISSION": "COMMISSION_"}
+    )
+    amount_mismatch_rows = safe_column_select(
+        amount_mismatch_rows, REQUIRED_COLUMNS + ["SUM_AMOUNT"]
+    )
+
+    merged_step1 = merged_step1[amount_equal]
+
+    merged_step1_full = merged_step1.merge(
+        statement_df.rename(columns={"AMOUNT": "AMOUNT_STATEMENT"}),
+        on="SETTLED_ID",
+        how="left",
+    ).drop(columns=["SUM_AMOUNT"], errors="ignore")
+
+    # Step 2: Identify unmatched ledger rows
+    matched_snos = withdrawal_grouped["SETTLED_ID"]
+    unmatched_ledger = ledger_df[~ledger_df["SNO"].isin(matched_snos)].copy()
+
+    # Commission matches
+    base_snos = (
+        merged_step1["SNO"]
+        if "SNO" in merged_step1.columns
+        else pd.Series([], dtype="int64")
+    )
+    commission_match_mask = unmatched_ledger["SNO"].isin(base_snos + 1)
+    commission_match = (
+        unmatched_ledger[commission_match_mask]
+        .copy()
+        .rename(columns={"SNO": "COMMISSION_SNO"})
+    )
+
+    unmatched_ledger_final = unmatched_ledger[~commission_match_mask].copy()
+    unmatched_ledger_final = unmatched_ledger_final.rename(
+        columns={"SNO": "SETTLED_ID"}
+    )
+    unmatched_ledger_final = safe_column_select(
+        unmatched_ledger_final, REQUIRED_COLUMNS
+    )
+    # Step 3: Unmatched withdrawals
+    unmatched_statement = (
+        statement_df[
+            (~statement_df["SETTLED_ID"].isin(ledger_df["SNO"]))
+            & (statement_df["STATUS"].str.lower() != "failed")
+        ]
+        .rename(
+            columns={
+                "AMOUNT": "AMOUNT_STATEMENT",
+                "COMMISSION": "COMMISSION_STATEMENT",
             }
-
-            if not (not_in_ledger_df.empty and not_in_statement_df.empty):
-                result_data.update(
-                    {
-                        "not_in_statement": not_in_statement_df,
-                        "not_in_ledger": not_in_ledger_df,
-                    }
-                )
-            else:
-                result_data["message"] = "No Mismatch..."
-
-            return result_data
-        elif service_name in ["ABHIBUS"]:
-            """
-            ABHIBUS Service Block
-            - Calculates final amounts, groups by date, and flags matches/mismatches.
-            """
-            statement_df.columns = statement_df.columns.str.strip().str.upper()
-            ledger_df.columns = ledger_df.columns.str.strip().str.upper()
-            statement_df["STATUS"] = statement_df["STATUS"].str.strip().str.lower()
-
-            # Convert date columns to datetime
-            statement_df["BOOKED DATE"] = pd.to_datetime(
-                statement_df["BOOKED DATE"], format="%d-%m-%Y %H:%M"
-            )
-            ledger_df["BALANCE DATE"] = pd.to_datetime(
-                ledger_df["BALANCE DATE"], format="%d-%m-%Y"
-            )
-
-            # Calculate FINAL_AMOUNT in statement_df
-            statement_df["FINAL_AMOUNT"] = (
-                statement_df["TICKET AMOUNT"] + statement_df["SERVICE TAX"]
-            ) - (statement_df["COMM."] - statement_df["COMM TDS"])
-
-            # Extract only date (ignore time)
-            statement_df["BOOKED_DATE_ONLY"] = statement_df["BOOKED DATE"].dt.date
-            ledger_df["BALANCE_DATE_ONLY"] = ledger_df["BALANCE DATE"].dt.date
-
-            # Group and pivot statement data
-            grouped = statement_df.groupby(
-                ["BOOKED_DATE_ONLY", "STATUS"], as_index=False
-            )["FINAL_AMOUNT"].sum()
-
-            pivoted = grouped.pivot_table(
-                index="BOOKED_DATE_ONLY",
-                columns="STATUS",
-                values="FINAL_AMOUNT",
-                fill_value=0,
-            ).reset_index()
-
-            # Calculate net amount (Success - Failed)
-            pivoted["AMOUNT_STATEMENT"] = pivoted.get("success", 0) - pivoted.get(
-                "failed", 0
-            )
-            group_by_date = pivoted[["BOOKED_DATE_ONLY", "AMOUNT_STATEMENT"]]
-            group_by_date.columns = ["DATE", "AMOUNT_STATEMENT"]
-
-            # Group ledger data
-            ledger_group = (
-                ledger_df.assign(USED_AMOUNT_ABS=ledger_df["USED AMOUNT"])
-                .groupby("BALANCE_DATE_ONLY", as_index=False)["USED_AMOUNT_ABS"]
-                .sum()
-            )
-            ledger_group.columns = ["DATE", "AMOUNT_LEDGER"]
-
-            # Merge grouped totals for comparison
-            comparison_df = pd.merge(
-                group_by_date, ledger_group, on="DATE", how="outer"
-            ).fillna(0)
-
-            # Flag match/mismatch with tolerance
-            comparison_df["MAPPING_STATUS"] = np.where(
-                np.isclose(
-                    comparison_df["AMOUNT_STATEMENT"],
-                    comparison_df["AMOUNT_LEDGER"],
-                    rtol=1e-5,
-                    atol=1e-5,
-                ),
-                "MATCHED",
-                "MISMATCHED",
-            )
-
-            # Attach STATUS back to original statement_df
-            statement_with_status = statement_df.merge(
-                comparison_df[
-                    ["DATE", "MAPPING_STATUS", "AMOUNT_STATEMENT", "AMOUNT_LEDGER"]
-                ],
-                left_on="BOOKED_DATE_ONLY",
-                right_on="DATE",
-                how="left",
-            )
-
-            REQUIRED_COLUMNS = [
-                "TKT. NUMBER",
-                "AMOUNT_LEDGER",
-                "AMOUNT_STATEMENT",
-                "BOOKED DATE",
-                "TICKET AMOUNT",
-                "SERVICE TAX",
-                "COMM.",
-                "COMM TDS",
-                "FINAL_AMOUNT",
-                "MAPPING_STATUS",
-            ]
-
-            # Split into matched/mismatched dataframes
-            matched_df = statement_with_status[
-                statement_with_status["MAPPING_STATUS"] == "MATCHED"
-            ]
-            mismatched_df = statement_with_status[
-                statement_with_status["MAPPING_STATUS"] == "MISMATCHED"
-            ]
-
-            matched_df = safe_column_select(matched_df, REQUIRED_COLUMNS)
-            mismatched_df = safe_column_select(mismatched_df, REQUIRED_COLUMNS)
-
-            credit_count = ledger_df[ledger_df["USED AMOUNT"] < 0].shape[0]
-
-            print(matched_df)
-            print(mismatched_df)
-
-            result_data = {
-                "ledger_count": ledger_count,
-                "statement_count": statement_count,
-                "credit_count": credit_count,
-                "matched_trans_count": matched_df.shape[0],
-                "failed_trans_count": mismatched_df.shape[0],
-                "matching_trans": matched_df,
+        )
+        .copy()
+    )
+    unmatched_statement = safe_column_select(unmatched_statement, REQUIRED_COLUMNS)
+    # Step 4: Merge commission matches
+    sno_col = next(
+        (col for col in ["SNO", "SNO_x", "SNO_y"] if col in merged_step1_full.columns),
+        None,
+    )
+
+    if sno_col:
+        merged_step1_full["SNO_PLUS1"] = (
+            pd.to_numeric(merged_step1_full[sno_col], errors="coerce") + 1
+        )
+    else:
+        merged_step1_full["SNO_PLUS1"] = pd.NA
+
+    # Ensure numeric types
+    commission_match["COMMISSION_SNO"] = pd.to_numeric(
+        commission_match["COMMISSION_SNO"], errors="coerce"
+    )
+    merged_step1_full["SNO_PLUS1"] = pd.to_numeric(
+        merged_step1_full["SNO_PLUS1"], errors="coerce"
+    )
+
+    # Merge commission matches
+    commission_merged = (
+        commission_match.merge(
+            merged_step1_full,
+            left_on="COMMISSION_SNO",
+            right_on="SNO_PLUS1",
+            how="inner",
+            suffixes=("", "_STATEMENT"),
+        )
+        .drop(columns=["SNO_PLUS1", "AMOUNT_LEDGER"], errors="ignore")
+        .rename(
+            columns={
+                "COMMISSION_y": "COMMISSION_STATEMENT",
+                "AMOUNT_LEDGER_STATEMENT": "AMOUNT_LEDGER",
             }
-
-            if not mismatched_df.empty:
-                result_data.update({"amount_mismatch": mismatched_df})
-            else:
-                result_data["message"] = "No Mismatch..."
-
-            return result_data
-        else:
-            logger.warning(
-                f"Service {service_name} not supported for vendor ledger reconciliation."
-            )
-            return f"Service {service_name} not supported."
-
-    except Exception as e:
-        logger.error(
-            f"Vendor Ledger Reconciliation error: {str(e)}\n{traceback.format_exc()}"
         )
-        return "Error processing vendor ledger reconciliation."
+    )
+
+    # Final column selection
+    commission_merged = safe_column_select(commission_merged, REQUIRED_COLUMNS)
+    unmatched_ledger_final = safe_column_select(
+        unmatched_ledger_final, REQUIRED_COLUMNS
+    )
+    # Count results
+    matched_count = commission_merged.shape[0]
+    failed_count = unmatched_statement.shape[0] + unmatched_ledger_final.shape[0]
+
+    # Clean numeric columns
+    numeric_columns = [
+        "SETTLED_ID",
+        "SNO",
+        "COMMISSION_SNO",
+        "SNO_PLUS1",
+        "SERIALNUMBER",
+        "UTR",
+    ]
+    for col in numeric_columns:
+        if col in commission_merged.columns:
+            commission_merged[col] = (
+                commission_merged[col]
+                .fillna("")
+                .astype(str)
+                .str.replace(r"\.0$", "", regex=True)
+            )
+
+    return vendor_result(
+        {"matching_trans": commission_merged},
+        {
+            "matched_trans_count": matched_count,
+            "failed_trans_count": failed_count,
+            "ledger_credit_count": credit_count,
+        },
+        {
+            "not_in_statement": unmatched_ledger_final,
+            "not_in_ledger": unmatched_statement,
+            "amount_mismatch": amount_mismatch_rows,
+        },
+        message="No Mismatch..!",
+    )
+
+
+# ----------------------------------------------------------------------------------
+# MATM
+def matm_rules(ledger_df, statement_df, service_name):
+    """
+    Cleans RRN/amount columns, matches transactions, and finds mismatches.
+    """
+    # Clean RRN and UTR columns
+    statement_df["RRN"] = normalize_key(statement_df["RRN"])
+    ledger_df["UTR"] = ledger_df["UTR"].astype(str).str.strip()
+
+    # Remove rows with "NA" in RRN
+    statement_df = statement_df[statement_df["RRN"] != ""]
+
+    # Amounts as paise (rupee sign and separators dropped), compared exactly
+    statement_amounts = to_paise(statement_df["AMOUNT"])
+    ledger_amounts = to_paise(ledger_df["AMOUNT"])
+
+    credit_count = ledger_df[ledger_df["CR/DR"].str.strip().str.lower() == "cr"].shape[
+        0
+    ]
+
+    REQUIRED_COLUMNS = [
+        "BCID",
+        "AMOUNT_STATEMENT",
+        "AMOUNT_LEDGER",
+        "RRN",
+        "TRANSACTIONSTATUS",
+        "DATE",
+    ]
+
+    # Rename amount columns
+    if "AMOUNT" in statement_df.columns:
+        statement_df = statement_df.rename(columns={"AMOUNT": "AMOUNT_STATEMENT"}).astype(
+            str
+        )
+    if "AMOUNT" in ledger_df.columns:
+        ledger_df = ledger_df.rename(columns={"AMOUNT": "AMOUNT_LEDGER"}).astype(str)
+
+    statement_df["AMOUNT_STATEMENT"] = statement_amounts
+    ledger_df["AMOUNT_LEDGER"] = ledger_amounts
+
+    # Matched rows and both sides' mismatches in one pass on UTR/RRN
+    not_in_statement_df, not_in_ledger_df, merged_df = match_vendor_rows(
+        ledger_df, statement_df, service_name
+    )
+
+    # Compare amounts of the matched rows
+    amount_equal = money_equal(merged_df["AMOUNT_LEDGER"], merged_df["AMOUNT_STATEMENT"])
+    amount_mismatch_rows = safe_column_select(
+        merged_df[~amount_equal], REQUIRED_COLUMNS
+    )
+
+    not_in_statement_df = safe_column_select(not_in_statement_df, REQUIRED_COLUMNS)
+    not_in_ledger_df = safe_column_select(
+        not_in_ledger_df.rename(columns={"UTR": "RRN"}), REQUIRED_COLUMNS
+    )
+
+    merged_df = merged_df[amount_equal]
+    if not merged_df.empty:
+        matched_count = merged_df.shape[0]
+        merged_df = safe_column_select(merged_df, REQUIRED_COLUMNS)
+    else:
+        matched_count = 0
+        merged_df = pd.DataFrame(columns=REQUIRED_COLUMNS)
+
+    failed_count = not_in_statement_df.shape[0] + not_in_ledger_df.shape[0]
+
+    return vendor_result(
+        {"matching_trans": merged_df},
+        {
+            "matched_trans_count": matched_count,
+            "failed_trans_count": failed_count,
+            "ledger_credit_count": credit_count,
+        },
+        {
+            "not_in_statement": not_in_statement_df,
+            "not_in_ledger": not_in_ledger_df,
+            "amount_mismatch": amount_mismatch_rows,
+        },
+    )
+
+
+# ----------------------------------------------------------------------------------
+# BBPS
+def _standardize_trans_dates(df, date_column="TRANS_DATE"):
+    result_df = df.copy()
+    slash_dates = pd.to_datetime(
+        result_df[date_column], format="%m/%d/%Y", errors="coerce"
+    )
+    noslash_dates = pd.to_datetime(result_df[date_column], format="%d%m%Y", errors="coerce")
+    standardized = slash_dates.fillna(noslash_dates)
+    result_df["TRANS_DATE_STANDARDIZED"] = standardized.dt.strftime("%Y-%m-%d")
+    return result_df
+
+
+def bbps_rules(ledger_df, statement_df, service_name):
+    """
+    Standardizes columns, matches transactions, and finds mismatches.
+    """
+    # Rename columns for consistency (headers are normalized on load)
+    ledger_df = ledger_df.rename(
+        columns={"CHQ / REF NO.": "TRANS_REF_ID_LGR", "DEBIT": "AMOUNT_LEDGER"}
+    )
+    statement_df = statement_df.rename(
+        columns={
+            "TRANSACTION REF ID": "TRANS_REF_ID_STMT",
+            "TRANSACTION AMOUNT(RS.)": "AMOUNT_STATEMENT",
+            "NPCI TRANSACTION DESC": "TRANSACTION_STATUS",
+        }
+    )
+
+    # Strip spaces in the text columns
+    for df in [ledger_df, statement_df]:
+        for col in df.columns:
+            if df[col].dtype == "object":
+                df[col] = strip_text(df[col])
+
+    # Amounts (debits, refund credits, statement amounts) as paise
+    ledger_df["AMOUNT_LEDGER"] = to_paise(ledger_df["AMOUNT_LEDGER"])
+    ledger_df["CREDIT"] = to_paise(ledger_df["CREDIT"])
+    statement_df["AMOUNT_STATEMENT"] = to_paise(statement_df["AMOUNT_STATEMENT"])
+
+    REQUIRED_COLUMNS = [
+        "TRANS_REF_ID",
+        "AMOUNT_LEDGER",
+        "AMOUNT_STATEMENT",
+        "REFUNDED_AMOUNT",
+        "TRANSACTION_STATUS",
+        "ACTUAL_TRANS_DATE",
+        "DATE",
+    ]
+
+    # Count credit transactions
+    credit_trans = ledger_df[ledger_df["CREDIT"].notna()].copy()
+    credit_trans = credit_trans.drop(columns=["AMOUNT_LEDGER"]).rename(
+        columns={
+            "CREDIT": "AMOUNT_LEDGER",
+            "TRANS_REF_ID_LGR": "TRANS_REF_ID",
+            "TRANSACTION DATE": "DATE",
+        }
+    )
+    credit_count = credit_trans.shape[0]
+    credit_trans = safe_column_select(credit_trans, REQUIRED_COLUMNS)
+
+    # Matched rows and both sides' mismatches in one pass on the reference id
+    not_in_statement_df, not_in_ledger_df, merged_df = match_vendor_rows(
+        ledger_df, statement_df, service_name
+    )
+
+    # Only KM references are expected in the statement
+    not_in_statement_df = not_in_statement_df[
+        not_in_statement_df["TRANS_REF_ID_LGR"].str.startswith("KM", na=False)
+    ].rename(columns={"TRANS_REF_ID_LGR": "TRANS_REF_ID"})
+    not_in_statement_df["DATE"] = not_in_statement_df["TRANSACTION DATE"]
+    not_in_statement_df = safe_column_select(not_in_statement_df, REQUIRED_COLUMNS)
+
+    not_in_ledger_df = not_in_ledger_df.rename(
+        columns={"TRANS_REF_ID_STMT": "TRANS_REF_ID"}
+    )
+    not_in_ledger_df["DATE"] = not_in_ledger_df["TRANSACTION DATE"]
+    not_in_ledger_df = safe_column_select(not_in_ledger_df, REQUIRED_COLUMNS)
+
+    merged_df = merged_df.rename(columns={"TRANS_REF_ID_LGR": "TRANS_REF_ID"})
+
+    # Find matching amounts and failed transactions
+    amount_equal = money_equal(merged_df["AMOUNT_LEDGER"], merged_df["AMOUNT_STATEMENT"])
+    amount_match_df = merged_df[amount_equal].copy()
+
+    failed_trans = amount_match_df[
+        amount_match_df["TRANSACTION_STATUS"]
+        .str.lower()
+        .str.strip()
+        .str.contains("failure|transaction timed out|^na$", regex=True, na=True)
+        .fillna(False)
+    ]
+
+    # Process credit rows and refund checks
+    ledger_credit_rows = ledger_df[ledger_df["CREDIT"].notna()]
+    ledger_credit_rows = ledger_credit_rows[
+        ledger_credit_rows["DESCRIPTION"].str.contains(
+            r"^(BBPS-)?[A-Z]{2,3}\d{1,2}-REF-", regex=True, na=False
+        )
+    ]
+    ledger_credit_rows["REF_NUMBER"] = ledger_credit_rows["DESCRIPTION"].str.extract(
+        r"REF-([A-Z0-9]+)-"
+    )
+
+    credit_trans_not_in_statement = ledger_credit_rows[
+        ~ledger_credit_rows["REF_NUMBER"].isin(statement_df["TRANS_REF_ID_STMT"])
+    ].copy()
+    credit_trans_not_in_statement["TRANS_DATE"] = (
+        credit_trans_not_in_statement["DESCRIPTION"].str.split("-").str[-1]
+    )
+
+    credit_trans_not_in_statement = _standardize_trans_dates(
+        credit_trans_not_in_statement
+    )
+    credit_trans_not_in_statement = credit_trans_not_in_statement.drop(
+        columns=["TRANS_DATE"]
+    ).rename(
+        columns={
+            "CREDIT": "REFUNDED_AMOUNT",
+            "REF_NUMBER": "TRANS_REF_ID",
+            "TRANSACTION DATE": "DATE",
+            "TRANS_DATE_STANDARDIZED": "ACTUAL_TRANS_DATE",
+        }
+    )
+    credit_trans_not_in_statement = safe_column_select(
+        credit_trans_not_in_statement, REQUIRED_COLUMNS
+    )
+
+    # Refund checks
+    refund_check = failed_trans.merge(
+        ledger_credit_rows[["REF_NUMBER", "CREDIT"]],
+        left_on="TRANS_REF_ID",
+        right_on="REF_NUMBER",
+        how="inner",
+    ).rename(columns={"CREDIT_y": "REFUNDED_AMOUNT"})
+
+    refund_equal = money_equal(
+        refund_check["REFUNDED_AMOUNT"], refund_check["AMOUNT_STATEMENT"]
+    )
+    refund_amount_match = refund_check[refund_equal]
+    refund_amount_mismatch = refund_check[~refund_equal]
+    refund_amount_mismatch = refund_amount_mismatch.rename(
+        columns={"TRANSACTION DATE_x": "DATE"}
+    )
+
+    refund_amount_match = safe_column_select(refund_amount_match, REQUIRED_COLUMNS)
+    refund_amount_mismatch = safe_column_select(
+        refund_amount_mismatch, REQUIRED_COLUMNS
+    )
+
+    # Find amount mismatches
+    amount_mismatch_rows = merged_df[~amount_equal].copy()
+    amount_mismatch_rows.loc[:, "DATE"] = amount_mismatch_rows["TRANSACTION DATE_x"]
+    amount_mismatch_rows = safe_column_select(amount_mismatch_rows, REQUIRED_COLUMNS)
+
+    # Process matched transactions
+    if not amount_match_df.empty:
+        matched_count = amount_match_df.shape[0]
+        amount_match_df = amount_match_df.merge(
+            refund_amount_match,
+            on="TRANS_REF_ID",
+            how="left",
+            suffixes=("", "_REFUND"),
+        )
+        amount_match_df.loc[:, "DATE"] = amount_match_df["TRANSACTION DATE_x"]
+        merged_df = safe_column_select(amount_match_df, REQUIRED_COLUMNS)
+
+        failed_not_refunded = merged_df[
+            merged_df["TRANSACTION_STATUS"].str.contains(
+                "failure|transaction timed out", case=False, na=False
+            )
+            & merged_df["REFUNDED_AMOUNT"].isna()
+        ]
+        merged_df = merged_df[~merged_df.index.isin(failed_not_refunded.index)]
+    else:
+        matched_count = 0
+        merged_df = pd.DataFrame(columns=REQUIRED_COLUMNS)
+        failed_not_refunded = pd.DataFrame(columns=REQUIRED_COLUMNS)
+
+    # Calculate failed count
+    failed_count = (
+        not_in_statement_df.shape[0]
+        + not_in_ledger_df.shape[0]
+        + amount_mismatch_rows.shape[0]
+        + refund_amount_mismatch.shape[0]
+    )
+
+    return vendor_result(
+        {"matching_trans": merged_df},
+        {
+            "matched_trans_count": matched_count,
+            "failed_trans_count": failed_count,
+            "ledger_credit_count": credit_count,
+        },
+        {
+            "not_in_statement": not_in_statement_df,
+            "not_in_ledger": not_in_ledger_df,
+            "amount_mismatch": amount_mismatch_rows,
+            "Credit_Trans_in_Ledger_not_in_Stmnt": credit_trans_not_in_statement,
+            "refund_amount_mismatch": refund_amount_mismatch,
+            "failed_not_refunded": failed_not_refunded,
+        },
+        clean=(
+            not_in_ledger_df.empty
+            and not_in_statement_df.empty
+            and amount_mismatch_rows.empty
+            and credit_trans.empty
+            and refund_amount_mismatch.empty
+            and failed_not_refunded.empty
+        ),
+    )
+
+
+# ----------------------------------------------------------------------------------
+# LIC
+def lic_rules(ledger_df, statement_df, service_name):
+    """
+    Standardizes columns, matches on TID and amount, and handles commission matching.
+    """
+    # Filter valid IMWTID rows
+    statement_df = statement_df[
+        statement_df["IMWTID"].notna()
+        & (statement_df["IMWTID"].astype(str).str.strip() != "NA")
+    ].copy()
+    statement_count = statement_df.shape[0]
+
+    # Rename columns
+    statement_df = statement_df.rename(
+        columns={"AMOUNT": "STMT_AMOUNT", "IMWTID": "STMT_TID"}
+    )
+    ledger_df = ledger_df.rename(
+        columns={"DR": "LDG_AMOUNT", "TID": "LDG_TID", "CR": "COMM_AMT"}
+    )
+
+    # === Standardize TID columns as strings ===
+    for col in ["STMT_TID"]:
+        statement_df[col] = statement_df[col].astype(str).str.strip()
+
+    for col in ["LDG_TID", "REFERENCE TID"]:
+        ledger_df[col] = ledger_df[col].astype(str).str.strip()
+
+    # === Amount columns as paise ===
+    statement_df["STMT_AMOUNT"] = to_paise(statement_df["STMT_AMOUNT"])
+    for col in ["LDG_AMOUNT", "COMM_AMT"]:
+        ledger_df[col] = to_paise(ledger_df[col])
+
+    # === Reconciliation logic ===
+    REQUIRED_COLUMNS = [
+        "LDG_TID",
+        "COMMISSION_TID",
+        "COMM_AMT",
+        "LDG_AMOUNT",
+        "STMT_AMOUNT",
+        "DATE",
+    ]
+
+    # Matched rows and both sides' mismatches in one pass on TID
+    not_in_statement_df, not_in_ledger_df, matched_df = match_vendor_rows(
+        ledger_df, statement_df, service_name
+    )
+    not_in_ledger_df = not_in_ledger_df.rename(columns={"STMT_TID": "LDG_TID"})
+
+    amount_equal = money_equal(matched_df["LDG_AMOUNT"], matched_df["STMT_AMOUNT"])
+    amount_matched_df = matched_df[amount_equal]
+    amount_matched_df = safe_column_select(amount_matched_df, REQUIRED_COLUMNS)
+
+    # Amount mismatches
+    amount_mismatch_rows = matched_df[~amount_equal].copy()
+    amount_mismatch_rows = safe_column_select(amount_mismatch_rows, REQUIRED_COLUMNS)
+
+    # Commission matching
+    commission_match_df = not_in_statement_df[
+        not_in_statement_df["LDG_TID"].isin(ledger_df["LDG_TID"])
+    ].copy()
+
+    # Ensure consistent data types for merging
+    commission_match_df["REFERENCE TID"] = (
+        commission_match_df["REFERENCE TID"].astype(str).str.strip()
+    )
+    amount_matched_df["LDG_TID"] = amount_matched_df["LDG_TID"].astype(str).str.strip()
+
+    # Merge commission transactions
+    matched_trans_comm_df = amount_matched_df.merge(
+        commission_match_df,
+        left_on="LDG_TID",
+        right_on="REFERENCE TID",
+        how="inner",
+    ).rename(
+        columns={
+            "COMM_AMT_y": "COMM_AMT",
+            "LDG_AMOUNT_x": "LDG_AMOUNT",
+            "LDG_TID_x": "LDG_TID",
+            "LDG_TID_y": "COMMISSION_TID",
+        }
+    )
+
+    amount_mismatch_comm_df = amount_mismatch_rows.merge(
+        not_in_statement_df,
+        left_on="LDG_TID",
+        right_on="REFERENCE TID",
+        how="inner",
+    ).rename(
+        columns={
+            "COMM_AMT_y": "COMM_AMT",
+            "LDG_AMOUNT_x": "LDG_AMOUNT",
+            "LDG_TID_x": "LDG_TID",
+            "LDG_TID_y": "COMMISSION_TID",
+        }
+    )
+
+    amount_mismatch_comm_df = safe_column_select(
+        amount_mismatch_comm_df, REQUIRED_COLUMNS
+    )
+    matched_trans_comm_df = safe_column_select(matched_trans_comm_df, REQUIRED_COLUMNS)
+    not_in_ledger_df = safe_column_select(not_in_ledger_df, REQUIRED_COLUMNS)
+
+    # Final unmatched statements
+    not_in_statement_final_df = not_in_statement_df[
+        ~not_in_statement_df["LDG_TID"].isin(matched_trans_comm_df["COMMISSION_TID"])
+    ].copy()
+    not_in_statement_final_df = not_in_statement_final_df[
+        ~not_in_statement_final_df["LDG_TID"].isin(
+            amount_mismatch_comm_df["COMMISSION_TID"]
+        )
+    ].copy()
+    not_in_statement_final_df = safe_column_select(
+        not_in_statement_final_df, REQUIRED_COLUMNS
+    )
+
+    # Count calculations
+    matched_count = matched_trans_comm_df.shape[0]
+    failed_count = (
+        not_in_ledger_df.shape[0]
+        + not_in_statement_final_df.shape[0]
+        + amount_mismatch_rows.shape[0]
+    )
+    credit_count = int((ledger_df["COMM_AMT"].fillna(0) != 0).sum())
+
+    return vendor_result(
+        {"matching_trans": matched_trans_comm_df},
+        {
+            "statement_count": statement_count,
+            "matched_trans_count": matched_count,
+            "failed_trans_count": failed_count,
+            "ledger_credit_count": credit_count,
+        },
+        {
+            "not_in_statement": not_in_statement_final_df,
+            "not_in_ledger": not_in_ledger_df,
+            "amount_mismatch": amount_mismatch_comm_df,
+        },
+        clean=(
+            amount_mismatch_rows.empty
+            and not_in_ledger_df.empty
+            and not_in_statement_final_df.empty
+        ),
+    )
+
+
+# ----------------------------------------------------------------------------------
+# PANUTI
+def panuti_rules(ledger_df, statement_df, service_name):
+    """
+    Cleans and matches reference numbers, handles failed rows, and finds unmatched records.
+    """
+    statement_df = statement_df.rename(
+        columns={
+            "REFERENCE NO": "STMT_REFERENCE_NO",
+            "RES AMOUNT": "AMOUNT_STATEMENT",
+            "TRANS DATE": "STATEMENT_DATE",
+        }
+    )
+    ledger_df = ledger_df.rename(
+        columns={
+            "REFERENCE NO": "LDG_REFERENCE_NO",
+            "UTIITSL AMOUNT": "AMOUNT_LEDGER",
+            "LOT DATE": "LEDGER_DATE",
+        }
+    )
+
+    failed_rows = (
+        statement_df["PAYMENT STATUS"]
+        == "Payment Refunded due to Incomplete Application"
+    )
+    failed_df = statement_df[failed_rows].copy()
+    cleaned_statement_df = statement_df[~failed_rows].copy()
+
+    REQUIRED_COLUMNS = [
+        "LDG_REFERENCE_NO",
+        "STMT_REFERENCE_NO",
+        "AMOUNT_LEDGER",
+        "AMOUNT_STATEMENT",
+        "LEDGER_DATE",
+        "STATEMENT_DATE",
+    ]
+
+    cleaned_statement_df["STMT_REFERENCE_NO"] = (
+        cleaned_statement_df["STMT_REFERENCE_NO"].astype(str).str.strip()
+    )
+    ledger_df["LDG_REFERENCE_NO"] = ledger_df["LDG_REFERENCE_NO"].astype(str).str.strip()
+
+    # Matched rows and both sides' mismatches in one pass on the reference no
+    not_in_statement_df, not_in_ledger_df, merged_df = match_vendor_rows(
+        ledger_df, cleaned_statement_df, service_name
+    )
+    not_in_ledger_df = safe_column_select(not_in_ledger_df, REQUIRED_COLUMNS)
+    not_in_statement_df = safe_column_select(not_in_statement_df, REQUIRED_COLUMNS)
+    matched_df = safe_column_select(merged_df, REQUIRED_COLUMNS)
+
+    matched_count = matched_df.shape[0]
+    failed_count = (
+        not_in_ledger_df.shape[0] + not_in_statement_df.shape[0] + failed_df.shape[0]
+    )
+
+    return vendor_result(
+        {"matching_trans": matched_df},
+        {"matched_trans_count": matched_count, "failed_trans_count": failed_count},
+        {"not_in_statement": not_in_statement_df, "not_in_ledger": not_in_ledger_df},
+    )
+
+
+# ----------------------------------------------------------------------------------
+# ABHIBUS
+def abhibus_rules(ledger_df, statement_df, service_name):
+    """
+    Calculates final amounts, groups by date, and flags matches/mismatches.
+    """
+    # BOOKED DATE / BALANCE DATE are parsed on load
+    statement_df["STATUS"] = statement_df["STATUS"].str.strip().str.lower()
+
+    # Amounts as paise, so the daily totals compare exactly
+    for col in ["TICKET AMOUNT", "SERVICE TAX", "COMM.", "COMM TDS"]:
+        statement_df[col] = to_paise(statement_df[col])
+    ledger_df["USED AMOUNT"] = to_paise(ledger_df["USED AMOUNT"])
+
+    # Calculate FINAL_AMOUNT in statement_df
+    statement_df["FINAL_AMOUNT"] = (
+        statement_df["TICKET AMOUNT"] + statement_df["SERVICE TAX"]
+    ) - (statement_df["COMM."] - statement_df["COMM TDS"])
+
+    # Extract only date (ignore time)
+    statement_df["BOOKED_DATE_ONLY"] = statement_df["BOOKED DATE"].dt.date
+    ledger_df["BALANCE_DATE_ONLY"] = ledger_df["BALANCE DATE"].dt.date
+
+    # Group and pivot statement data
+    grouped = statement_df.groupby(["BOOKED_DATE_ONLY", "STATUS"], as_index=False)[
+        "FINAL_AMOUNT"
+    ].sum()
+
+    pivoted = grouped.pivot_table(
+        index="BOOKED_DATE_ONLY",
+        columns="STATUS",
+        values="FINAL_AMOUNT",
+        aggfunc="sum",
+        fill_value=0,
+    ).reset_index()
+
+    # Calculate net amount (Success - Failed)
+    pivoted["AMOUNT_STATEMENT"] = pivoted.get("success", 0) - pivoted.get("failed", 0)
+    group_by_date = pivoted[["BOOKED_DATE_ONLY", "AMOUNT_STATEMENT"]]
+    group_by_date.columns = ["DATE", "AMOUNT_STATEMENT"]
+
+    # Group ledger data
+    ledger_group = (
+        ledger_df.assign(USED_AMOUNT_ABS=ledger_df["USED AMOUNT"])
+        .groupby("BALANCE_DATE_ONLY", as_index=False)["USED_AMOUNT_ABS"]
+        .sum()
+    )
+    ledger_group.columns = ["DATE", "AMOUNT_LEDGER"]
+
+    # Merge grouped totals for comparison
+    comparison_df = pd.merge(
+        group_by_date, ledger_group, on="DATE", how="outer"
+    ).fillna(0)
+
+    # Flag match/mismatch (exact, in paise)
+    comparison_df["MAPPING_STATUS"] = np.where(
+        money_equal(comparison_df["AMOUNT_STATEMENT"], comparison_df["AMOUNT_LEDGER"]),
+        "MATCHED",
+        "MISMATCHED",
+    )
+
+    # Attach STATUS back to original statement_df
+    statement_with_status = statement_df.merge(
+        comparison_df[["DATE", "MAPPING_STATUS", "AMOUNT_STATEMENT", "AMOUNT_LEDGER"]],
+        left_on="BOOKED_DATE_ONLY",
+        right_on="DATE",
+        how="left",
+    )
+
+    REQUIRED_COLUMNS = [
+        "TKT. NUMBER",
+        "AMOUNT_LEDGER",
+        "AMOUNT_STATEMENT",
+        "BOOKED DATE",
+        "TICKET AMOUNT",
+        "SERVICE TAX",
+        "COMM.",
+        "COMM TDS",
+        "FINAL_AMOUNT",
+        "MAPPING_STATUS",
+    ]
+
+    # Split into matched/mismatched dataframes
+    matched_df = statement_with_status[
+        statement_with_status["MAPPING_STATUS"] == "MATCHED"
+    ]
+    mismatched_df = statement_with_status[
+        statement_with_status["MAPPING_STATUS"] == "MISMATCHED"
+    ]
+
+    matched_df = safe_column_select(matched_df, REQUIRED_COLUMNS)
+    mismatched_df = safe_column_select(mismatched_df, REQUIRED_COLUMNS)
+
+    credit_count = int((ledger_df["USED AMOUNT"].fillna(0) < 0).sum())
+
+    return vendor_result(
+        {"matching_trans": matched_df},
+        {
+            "credit_count": credit_count,
+            "matched_trans_count": matched_df.shape[0],
+            "failed_trans_count": mismatched_df.shape[0],
+        },
+        {"amount_mismatch": mismatched_df},
+    )
+
+
+# ----------------------------------------------------------------------------------
+# Strategy registry (see "Shared core" above). Services without an "ingest"
+# entry are read with inferred types and raw headers.
+VENDOR_STRATEGIES = {
+    "RECHARGE": {"match_keys": ("TXNID", "TXNID"), "rules": recharge_dmt_rules},
+    "DMT": {"match_keys": ("TXNID", "TXNID"), "rules": recharge_dmt_rules},
+    "AEPS": {
+        "ingest": {"normalize_headers": True},
+        # statement rows are summed per SETTLED_ID and matched to ledger SNO
+        "match_keys": None,
+        "rules": aeps_rules,
+        "money_columns": ["SUM_AMOUNT", "AMOUNT_LEDGER", "AMOUNT_STATEMENT"],
+    },
+    "MATM": {
+        "ingest": {"normalize_headers": True},
+        "match_keys": ("UTR", "RRN"),
+        "rules": matm_rules,
+        "money_columns": ["AMOUNT_LEDGER", "AMOUNT_STATEMENT"],
+    },
+    "BBPS": {
+        "ingest": {"normalize_headers": True},
+        "match_keys": ("TRANS_REF_ID_LGR", "TRANS_REF_ID_STMT"),
+        "rules": bbps_rules,
+        "money_columns": ["AMOUNT_LEDGER", "AMOUNT_STATEMENT", "REFUNDED_AMOUNT"],
+    },
+    "LIC": {
+        "ingest": {
+            "normalize_headers": True,
+            "statement": {"dtypes": {"IMWTID": str, "AMOUNT": str}},
+            "ledger": {
+                "dtypes": {"TID": str, "REFERENCE TID": str, "DR": str, "CR": str}
+            },
+        },
+        "match_keys": ("LDG_TID", "STMT_TID"),
+        "rules": lic_rules,
+        "money_columns": ["LDG_AMOUNT", "STMT_AMOUNT", "COMM_AMT"],
+    },
+    "PANUTI": {
+        "ingest": {"normalize_headers": True},
+        "match_keys": ("LDG_REFERENCE_NO", "STMT_REFERENCE_NO"),
+        "rules": panuti_rules,
+    },
+    "ABHIBUS": {
+        "ingest": {
+            "normalize_headers": True,
+            "statement": {"dates": {"BOOKED DATE": "%d-%m-%Y %H:%M"}},
+            "ledger": {"dates": {"BALANCE DATE": "%d-%m-%Y"}},
+        },
+        # daily statement totals are compared with daily ledger totals
+        "match_keys": None,
+        "rules": abhibus_rules,
+        "money_columns": [
+            "AMOUNT_LEDGER",
+            "AMOUNT_STATEMENT",
+            "TICKET AMOUNT",
+            "SERVICE TAX",
+            "COMM.",
+            "COMM TDS",
+            "FINAL_AMOUNT",
+        ],
+    },
+}
@@ -15,5 +15,51 @@ CONFIG = {
         "host": "192.168.1.13",
         "database": "ihubcore",
         "port": "3306",
-    }
+    },
+    # Shared SQLAlchemy pool used by every service module (see db_connector.py)
+    "pool": {
+        "pool_size": 10,
+        "max_overflow": 10,
+        "pool_timeout": 30,
+        "pool_recycle": 1800,
+        "pool_pre_ping": True,
+    },
+    # Threads that run the independent queries of one service fetch side by
+    # side (see query_executor.run_concurrently); shared by all requests and
+    # kept below pool_size so fan-out cannot drain the connection pool.
+    "query_fanout": {"workers": 6},
+    # Background reconciliation jobs (see job_queue.py). service_limits caps
+    # how many jobs of one service run at once; others use the default.
+    "jobs": {
+        "max_workers": 4,
+        "default_service_limit": 2,
+        "service_limits": {"AEPS": 1, "RECHARGE": 1},
+        "result_ttl": 1800,
+    },
+    # Worker processes for large uploads (see process_runner.py); smaller
+    # files are reconciled in the request/job thread.
+    "process_pool": {
+        "enabled": True,
+        "workers": 2,
+        "min_upload_bytes": 2 * 1024 * 1024,
+    },
+    # Parsed vendor uploads keyed by content hash (see upload_cache.py)
+    "upload_cache": {
+        "enabled": True,
+        "directory": "D:/INET_RR_FLASK/upload_cache",
+        "max_bytes": 2 * 1024**3,
+    },
+    # Per-day snapshots of the hub service queries (see snapshot_store.py).
+    # Days older than settle_days are treated as closed and stored once, so
+    # last month's reconciliation is served almost entirely from snapshots;
+    # settle_days_by_query overrides it per query name (e.g.
+    # "passport_service"). Refunds and manual status fixes that land later
+    # are picked up after POST /api/clearHubSnapshots drops the stored days.
+    "snapshot_store": {
+        "enabled": True,
+        "directory": "D:/INET_RR_FLASK/snapshots",
+        "settle_days": 3,
+        "settle_days_by_query": {},
+        "retention_days": 400,
+    },
 }
@@ -1,7 +1,95 @@
+"""
+db_connector.py - Process-wide SQLAlchemy engine registry.
+
+Every service module shares one pooled engine per database instead of
+creating its own, so concurrent reconciliations under waitress reuse the
+same MariaDB connections.
+"""
+
+import threading
+import time
+
 from sqlalchemy import create_engine
+from sqlalchemy.pool import QueuePool
 from config import CONFIG
 
-def get_db_connection():
-    db = CONFIG["db"]
-    return create_engine(f"mariadb+pymysql://{db['user']}:{db['password']}@{db['host']}:{db['port']}/{db['database']}")
-get_db_connection()
\ No newline at end of file
+_engines = {}
+_engines_lock = threading.Lock()
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long callers wait for a connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.checkout_count = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def connect(self):
+        started = time.perf_counter()
+        connection = super().connect()
+        waited = time.perf_counter() - started
+        with self._stats_lock:
+            self.checkout_count += 1
+            self.total_wait_seconds += waited
+            self.max_wait_seconds = max(self.max_wait_seconds, waited)
+        return connection
+
+
+def build_db_url(db=None):
+    db = db or CONFIG["db"]
+    return f"mariadb+pymysql://{db['user']}:{db['password']}@{db['host']}:{db['port']}/{db['database']}"
+
+
+def create_db_engine(url, pool=None):
+    """Create a pooled engine using the shared pool settings from CONFIG."""
+    pool_settings = dict(CONFIG.get("pool", {}))
+    pool_settings.update(pool or {})
+    return create_engine(url, poolclass=TimedQueuePool, **pool_settings)
+
+
+def register_engine(name, url, pool=None):
+    """Register (or replace) a named engine, e.g. to point at a local stand-in DB."""
+    engine = create_db_engine(url, pool)
+    with _engines_lock:
+        previous = _engines.get(name)
+        _engines[name] = engine
+    if previous is not None:
+        previous.dispose()
+    return engine
+
+
+def get_db_connection(name="default"):
+    """Return the shared engine for `name`, creating it on first use."""
+    engine = _engines.get(name)
+    if engine is not None:
+        return engine
+    with _engines_lock:
+        engine = _engines.get(name)
+        if engine is None:
+            engine = create_db_engine(build_db_url())
+            _engines[name] = engine
+    return engine
+
+
+def get_pool_metrics():
+    """Snapshot of pool usage for every registered engine."""
+    metrics = {}
+    with _engines_lock:
+        engines = dict(_engines)
+    for name, engine in engines.items():
+        pool = engine.pool
+        checkouts = getattr(pool, "checkout_count", 0)
+        total_wait = getattr(pool, "total_wait_seconds", 0.0)
+        metrics[name] = {
+            "pool_size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": pool.overflow(),
+            "checkouts": checkouts,
+            "avg_wait_ms": round(total_wait / checkouts * 1000, 3) if checkouts else 0.0,
+            "max_wait_ms": round(getattr(pool, "max_wait_seconds", 0.0) * 1000, 3),
+        }
+    return metrics
@@ -0,0 +1,192 @@
+"""
+excel_ingest.py - Reading uploaded vendor files into DataFrames.
+
+The format is detected from the file's leading bytes rather than trusted
+from its name: xlsx (zip), legacy xls (OLE2), anything else is read as CSV. Excel files
+are parsed with the calamine engine when python-calamine is installed,
+which is several times faster than openpyxl on large statements, and with
+pandas' default engine otherwise. read_header() returns just the first
+row so a file can be validated before it is parsed, and `usecols` is passed
+through so callers load only the columns they need.
+"""
+
+import zipfile
+import xml.etree.ElementTree as ET
+
+import pandas as pd
+from logger_config import logger
+
+try:
+    import python_calamine  # noqa: F401  (only needed as a pandas engine)
+
+    CALAMINE_AVAILABLE = True
+except ImportError:  # pragma: no cover - optional speedup
+    CALAMINE_AVAILABLE = False
+
+FORMAT_XLSX = "xlsx"
+FORMAT_XLS = "xls"
+FORMAT_CSV = "csv"
+
+_MAGIC = [
+    (b"PK\x03\x04", FORMAT_XLSX),
+    (b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1", FORMAT_XLS),
+]
+
+
+def _filename(file):
+    return getattr(file, "filename", None) or getattr(file, "name", None) or ""
+
+
+def detect_format(file) -> str:
+    """Format of an uploaded file from its magic bytes (file position is kept)."""
+    position = file.tell()
+    head = file.read(8)
+    file.seek(position)
+    for magic, file_format in _MAGIC:
+        if head.startswith(magic):
+            return file_format
+    # Neither container format; vendors sometimes send CSV named .xlsx
+    return FORMAT_CSV
+
+
+def excel_engine():
+    """Preferred pandas Excel engine; None lets pandas pick its default."""
+    return "calamine" if CALAMINE_AVAILABLE else None
+
+
+def _read_excel(file, **kwargs) -> pd.DataFrame:
+    engine = excel_engine()
+    if engine is not None:
+        try:
+            return pd.read_excel(file, engine=engine, **kwargs)
+        except (ValueError, TypeError):
+            raise  # bad arguments / missing columns: same error either engine
+        except Exception as e:
+            logger.warning(
+                f"{engine} could not read {_filename(file) or 'upload'} "
+                f"({str(e)}), falling back to the default engine"
+            )
+            file.seek(0)
+    return pd.read_excel(file, **kwargs)
+
+
+def read_upload(file, dtype=None, usecols=None, **kwargs) -> pd.DataFrame:
+    """
+    Read an uploaded xlsx/xls/csv file, same semantics as pd.read_excel.
+
+    `file` is any binary file object (werkzeug FileStorage, BytesIO, open
+    file). kwargs are passed to pd.read_excel / pd.read_csv.
+    """
+    file.seek(0)
+    if detect_format(file) == FORMAT_CSV:
+        return pd.read_csv(file, dtype=dtype, usecols=usecols, **kwargs)
+    return _read_excel(file, dtype=dtype, usecols=usecols, **kwargs)
+
+
+# ---------------------------------------------------------------------------
+# Header-only reads
+# ---------------------------------------------------------------------------
+# Both Excel engines parse the whole sheet even for nrows=0, so for xlsx the
+# first row is streamed straight out of the sheet XML instead.
+
+
+def _local(tag):
+    return tag.rsplit("}", 1)[-1]
+
+
+def _first_sheet_path(archive):
+    workbook = ET.fromstring(archive.read("xl/workbook.xml"))
+    sheet = next(el for el in workbook.iter() if _local(el.tag) == "sheet")
+    rel_id = next(v for k, v in sheet.attrib.items() if _local(k) == "id")
+    rels = ET.fromstring(archive.read("xl/_rels/workbook.xml.rels"))
+    for rel in rels:
+        if rel.get("Id") == rel_id:
+            target = rel.get("Target")
+            return target[1:] if target.startswith("/") else "xl/" + target
+    raise KeyError(f"sheet relationship {rel_id} not found")
+
+
+def _first_row(archive, sheet_path):
+    """(type, raw value) of each cell in row 1 (pandas' header row)."""
+    with archive.open(sheet_path) as sheet:
+        for _, elem in ET.iterparse(sheet):
+            if _local(elem.tag) != "row":
+                continue
+            if elem.get("r", "1") != "1":
+                return []  # row 1 is blank
+            cells = []
+            for cell in elem:
+                if _local(cell.tag) != "c":
+                    continue
+                cell_type = cell.get("t", "n")
+                if cell_type == "inlineStr":
+                    value = "".join(
+                        t.text or "" for t in cell.iter() if _local(t.tag) == "t"
+                    )
+                else:
+                    value = next(
+                        (v.text for v in cell if _local(v.tag) == "v"), None
+                    )
+                cells.append((cell_type, value))
+            return cells
+    return []
+
+
+def _shared_strings(archive, count):
+    """The first `count` entries of the shared string table."""
+    strings = []
+    if count == 0 or "xl/sharedStrings.xml" not in archive.namelist():
+        return strings
+    with archive.open("xl/sharedStrings.xml") as table:
+        for _, elem in ET.iterparse(table):
+            if _local(elem.tag) != "si":
+                continue
+            parts = []
+            for child in elem:  # <t> or rich-text runs <r><t>; skips phonetic <rPh>
+                if _local(child.tag) == "t":
+                    parts.append(child.text or "")
+                elif _local(child.tag) == "r":
+                    parts.extend(
+                        t.text or "" for t in child if _local(t.tag) == "t"
+                    )
+            strings.append("".join(parts))
+            elem.clear()
+            if len(strings) >= count:
+                break
+    return strings
+
+
+def _xlsx_header(file):
+    with zipfile.ZipFile(file) as archive:
+        cells = _first_row(archive, _first_sheet_path(archive))
+        needed = [int(value) for cell_type, value in cells if cell_type == "s"]
+        strings = _shared_strings(archive, max(needed) + 1 if needed else 0)
+    header = []
+    for cell_type, value in cells:
+        if cell_type == "s":
+            value = strings[int(value)]
+        elif cell_type == "b":
+            value = value == "1"
+        elif cell_type == "n" and value is not None:
+            number = float(value)
+            value = int(number) if number.is_integer() else number
+        header.append(value)
+    return header
+
+
+def read_header(file) -> list:
+    """Column names from the first row, without loading the rest of the file."""
+    file.seek(0)
+    file_format = detect_format(file)
+    try:
+        if file_format == FORMAT_CSV:
+            return pd.read_csv(file, nrows=0).columns.tolist()
+        if file_format == FORMAT_XLSX:
+            try:
+                return _xlsx_header(file)
+            except Exception as e:
+                logger.warning(f"Could not stream xlsx header ({str(e)}), using pandas")
+                file.seek(0)
+        return _read_excel(file, nrows=0).columns.tolist()
+    finally:
+        file.seek(0)
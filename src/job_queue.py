@@ -0,0 +1,203 @@
+"""
+job_queue.py - Background reconciliation jobs.
+
+Long reconciliations (a month of AEPS or RECHARGE) are submitted as jobs
+instead of running inside a waitress request thread. A bounded worker pool
+executes them and each service has its own concurrency limit, so a burst of
+heavy jobs queues up here rather than tying up every worker. Finished jobs
+keep their raw result until it expires.
+"""
+
+import io
+import threading
+import time
+import traceback
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from config import CONFIG
+from logger_config import logger
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+FINISHED_STATES = (JOB_DONE, JOB_FAILED)
+
+
+def snapshot_upload(file):
+    """
+    Copy an uploaded file into memory.
+
+    Werkzeug closes request.files once the request ends, so a job has to hold
+    its own copy of the upload.
+    """
+    if file is None:
+        return None
+    file.stream.seek(0)
+    buffer = io.BytesIO(file.read())
+    buffer.name = file.filename
+    return buffer
+
+
+class Job:
+    def __init__(self, kind, service_name, func, kwargs):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.service_name = service_name
+        self.func = func
+        self.kwargs = kwargs
+        self.status = JOB_QUEUED
+        self.result = None
+        self.error = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+    def to_dict(self, position=None):
+        now = time.time()
+        info = {
+            "job_id": self.id,
+            "kind": self.kind,
+            "service_name": self.service_name,
+            "status": self.status,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "queued_seconds": round((self.started_at or now) - self.submitted_at, 3),
+            "running_seconds": (
+                round((self.finished_at or now) - self.started_at, 3)
+                if self.started_at
+                else None
+            ),
+            "error": self.error,
+        }
+        if position is not None:
+            info["queue_position"] = position
+        return info
+
+
+class JobQueue:
+    """Worker pool with a per-service limit on concurrently running jobs."""
+
+    def __init__(
+        self,
+        max_workers=4,
+        service_limits=None,
+        default_service_limit=2,
+        result_ttl=1800,
+    ):
+        self.max_workers = max_workers
+        self.service_limits = dict(service_limits or {})
+        self.default_service_limit = default_service_limit
+        self.result_ttl = result_ttl
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="recon-job"
+        )
+        self._lock = threading.Lock()
+        self._jobs = {}
+        self._pending = {}  # service_name -> deque of queued jobs
+        self._running = {}  # service_name -> number of running jobs
+
+    def _limit(self, service_name):
+        return self.service_limits.get(service_name, self.default_service_limit)
+
+    def submit(self, kind, service_name, func, kwargs):
+        """Queue func(**kwargs) and return the new job id."""
+        job = Job(kind, service_name, func, kwargs)
+        with self._lock:
+            self._prune()
+            self._jobs[job.id] = job
+            self._pending.setdefault(service_name, deque()).append(job)
+            self._dispatch(service_name)
+        logger.info(f"Queued {kind} job {job.id} for {service_name}")
+        return job.id
+
+    def _dispatch(self, service_name):
+        # Caller holds self._lock
+        pending = self._pending.get(service_name)
+        while pending and self._running.get(service_name, 0) < self._limit(
+            service_name
+        ):
+            job = pending.popleft()
+            self._running[service_name] = self._running.get(service_name, 0) + 1
+            self._executor.submit(self._run, job)
+
+    def _run(self, job):
+        job.status = JOB_RUNNING
+        job.started_at = time.time()
+        logger.info(f"Started job {job.id} ({job.service_name})")
+        try:
+            job.result = job.func(**job.kwargs)
+            job.status = JOB_DONE
+        except Exception as e:
+            logger.error(f"Job {job.id} failed: {str(e)}\n{traceback.format_exc()}")
+            job.error = str(e)
+            job.status = JOB_FAILED
+        finally:
+            job.finished_at = time.time()
+            job.kwargs = None  # drop the uploaded file copy
+            logger.info(
+                f"Finished job {job.id} ({job.service_name}) with status "
+                f"{job.status} in {job.finished_at - job.started_at:.1f}s"
+            )
+            with self._lock:
+                self._running[job.service_name] -= 1
+                self._dispatch(job.service_name)
+
+    def _prune(self):
+        # Caller holds self._lock
+        cutoff = time.time() - self.result_ttl
+        expired = [
+            job_id
+            for job_id, job in self._jobs.items()
+            if job.status in FINISHED_STATES and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def get(self, job_id):
+        with self._lock:
+            self._prune()
+            return self._jobs.get(job_id)
+
+    def status(self, job_id):
+        """Job status dict (with queue position while queued), or None."""
+        with self._lock:
+            self._prune()
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            position = None
+            if job.status == JOB_QUEUED:
+                pending = list(self._pending.get(job.service_name, ()))
+                if job in pending:
+                    position = pending.index(job) + 1
+            return job.to_dict(position)
+
+    def stats(self):
+        with self._lock:
+            counts = {}
+            for job in self._jobs.values():
+                counts[job.status] = counts.get(job.status, 0) + 1
+            return {
+                "max_workers": self.max_workers,
+                "jobs": counts,
+                "running": {k: v for k, v in self._running.items() if v},
+                "queued": {k: len(v) for k, v in self._pending.items() if v},
+            }
+
+
+_job_queue = None
+_job_queue_lock = threading.Lock()
+
+
+def get_job_queue():
+    """Process-wide JobQueue built from CONFIG["jobs"] on first use."""
+    global _job_queue
+    with _job_queue_lock:
+        if _job_queue is None:
+            _job_queue = JobQueue(**CONFIG.get("jobs", {}))
+        return _job_queue
@@ -0,0 +1,63 @@
+"""
+label_columns.py - Categorical status, tenant and flag columns.
+
+Hub statuses, tenant names, ledger presence and the EBO wallet flags take a
+handful of distinct values but were held as one Python string per row.
+They are built here as pandas categoricals over a fixed vocabulary: each
+row is a small integer code into the category list, and comparing such a
+column with a label compares codes.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Ledger presence / EBO wallet flags ("Yes" / "No")
+FLAG_DTYPE = pd.CategoricalDtype(["Yes", "No"])
+
+# TenantDetailId -> tenant name
+TENANT_NAMES = {
+    1: "INET-CSC",
+    2: "ITI-ESEVA",
+    3: "UPCB",
+}
+
+
+def _categorical(codes, categories, series: pd.Series) -> pd.Series:
+    values = pd.Categorical.from_codes(codes, categories=pd.Index(categories, dtype=object))
+    return pd.Series(values, index=series.index, name=series.name)
+
+
+def as_category(series: pd.Series, vocabulary) -> pd.Series:
+    """
+    Series as a categorical over `vocabulary`. Values outside the vocabulary
+    are kept as extra categories (after it), nulls stay null.
+    """
+    codes, uniques = pd.factorize(series)
+    categories = list(dict.fromkeys([*vocabulary, *uniques]))
+    position = {value: i for i, value in enumerate(categories)}
+    lookup = np.array([position[value] for value in uniques] + [-1], dtype=np.int64)
+    # code -1 (null) picks the trailing -1 of the lookup
+    return _categorical(lookup[codes], categories, series)
+
+
+def map_to_category(series: pd.Series, mapping: dict) -> pd.Series:
+    """
+    Categorical version of series.map(mapping).fillna(series): mapped values
+    form the vocabulary, values without a mapping are kept as they are.
+    Works per distinct value.
+    """
+    codes, uniques = pd.factorize(series)
+    labels = [mapping.get(value, value) for value in uniques]
+    categories = list(dict.fromkeys([*mapping.values(), *labels]))
+    position = {value: i for i, value in enumerate(categories)}
+    lookup = np.array([position[label] for label in labels] + [-1], dtype=np.int64)
+    return _categorical(lookup[codes], categories, series)
+
+
+def flag_column(present, index=None, name=None) -> pd.Series:
+    """Boolean array/Series as a "Yes"/"No" FLAG_DTYPE column."""
+    if isinstance(present, pd.Series):
+        index = present.index if index is None else index
+    codes = np.where(np.asarray(present, dtype=bool), 0, 1)
+    values = pd.Categorical.from_codes(codes, dtype=FLAG_DTYPE)
+    return pd.Series(values, index=index, name=name)
@@ -1,5 +1,8 @@
 import os
 import logging
+import logging.handlers
+import multiprocessing
+import threading
 from datetime import datetime, timedelta
 
 
@@ -118,10 +121,52 @@ logger.setLevel(logging.INFO)
 for handler in logger.handlers[:]:
     logger.removeHandler(handler)
 
-# Add custom file handler
-file_handler = DailyRenameFileHandler(base_dir=base_log_dir, retention_days=90)
 formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
-file_handler.setFormatter(formatter)
-logger.addHandler(file_handler)
 
-logger.info("Logger initialized Successfully.")
+
+def _in_worker_process():
+    # Spawned workers (process_runner.py) carry their own process name from
+    # the moment they start importing modules
+    return multiprocessing.current_process().name != "MainProcess"
+
+
+# Only the main process owns the rolling file: several processes each
+# renaming Reconciliation.log at midnight would fail (Windows) or keep
+# writing into the renamed file. Workers log through a queue instead.
+file_handler = None
+if not _in_worker_process():
+    file_handler = DailyRenameFileHandler(base_dir=base_log_dir, retention_days=90)
+    file_handler.setFormatter(formatter)
+    logger.addHandler(file_handler)
+
+_log_queue = None
+_log_listener = None
+_log_queue_lock = threading.Lock()
+
+
+def get_log_queue(context):
+    """
+    Queue for worker processes' log records (see attach_log_queue), drained
+    by a listener thread into this process's file handler. Created once.
+    """
+    global _log_queue, _log_listener
+    with _log_queue_lock:
+        if _log_queue is None:
+            _log_queue = context.Queue()
+            _log_listener = logging.handlers.QueueListener(
+                _log_queue, file_handler, respect_handler_level=True
+            )
+            _log_listener.start()
+        return _log_queue
+
+
+def attach_log_queue(log_queue):
+    """In a worker process: send every log record to the parent's queue."""
+    for handler in logger.handlers[:]:
+        logger.removeHandler(handler)
+        handler.close()
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+
+
+if file_handler is not None:
+    logger.info("Logger initialized Successfully.")
@@ -6,6 +6,8 @@ from components.upservices import up_service_selection
 from components.iti_imps import imps_service_function
 from components.bbps_data_entry import bbps_data_entry
 from components.IRCTC import irctc
+from excel_ingest import read_upload, read_header
+from upload_cache import get_upload_cache, upload_key
 
 # Define service configurations as constants
 SERVICE_CONFIGS = {
@@ -78,6 +80,8 @@ SERVICE_CONFIGS = {
             "AMOUNT": "VENDOR_AMOUNT",
         },
         "required_columns": ["RRN"],
+        # Used by the MATM row filter in filteration_process
+        "extra_columns": ["TID", "DEVICE"],
     },
     "LIC": {
         "columns": {
@@ -87,6 +91,8 @@ SERVICE_CONFIGS = {
             "AMOUNT": "VENDOR_AMOUNT",
         },
         "required_columns": ["ORDERID"],
+        # Used by the LIC row filter in filteration_process
+        "extra_columns": ["IMWTID", "OPERATORID"],
     },
     "ASTRO": {
         "columns": {
@@ -132,6 +138,8 @@ SERVICE_CONFIGS = {
             "Ticket Amount": "VENDOR_AMOUNT",
         },
         "required_columns": ["Tkt. Number"],
+        # Added to the ticket amount in filtering_Data
+        "extra_columns": ["Service Tax"],
     },
     "SULTANPURSCA": {
         "columns": {
@@ -215,6 +223,16 @@ UPPS_SERVICES = {
 }
 
 
+def vendor_columns(service_config):
+    """Vendor file columns a service uses: mapped, required and extra columns."""
+    return (
+        set(service_config["columns"])
+        | set(service_config.get("columnsmini", {}))
+        | set(service_config["required_columns"])
+        | set(service_config.get("extra_columns", []))
+    )
+
+
 def process_date_columns(df, service_config):
     try:
         if "VENDOR_DATE" in df:
@@ -234,6 +252,47 @@ def process_date_columns(df, service_config):
     return df
 
 
+def read_vendor_frame(file, service_name, service_config, transaction_type=None):
+    """Parse, rename and date-normalize a vendor upload (or return an error message)."""
+    # Validate the header row before parsing the whole file
+    header = read_header(file)
+    if not all(col in header for col in service_config["required_columns"]):
+        logger.warning(f"Wrong File Uploaded in {service_name} Service")
+        return "Wrong File Uploaded...!"
+
+    # Read and process only the columns the service uses
+    wanted = vendor_columns(service_config)
+    df_excel = read_upload(file, dtype=str, usecols=lambda col: col in wanted)
+
+    if transaction_type == "3":
+        df_excel = df_excel.rename(columns=service_config["columnsmini"])
+    else:
+        # Rename columns based on service configuration
+        df_excel = df_excel.rename(columns=service_config["columns"])
+
+    if service_name in ["INSURANCE_OFFLINE", "SULTANPUR_IS", "CHITRAKOOT_IS"]:
+        if service_name == "INSURANCE_OFFLINE":
+            df_excel["REFID"] = df_excel["REFID"].astype(str).str.slice(0, 20)
+        else:
+            df_excel["REFID"] = df_excel["REFID"].astype(str).str.slice(1, 11)
+    # print(df_excel["REFID"].head(5))
+    # Process date columns
+    return process_date_columns(df_excel, service_config)
+
+
+def load_vendor_frame(file, service_name, service_config, transaction_type=None):
+    """read_vendor_frame() through the upload cache; repeat uploads skip parsing."""
+    upload_cache = get_upload_cache()
+    key = upload_key(file, service_name, service_config, transaction_type)
+    df_excel = upload_cache.get(key)
+    if df_excel is not None:
+        return df_excel
+    df_excel = read_vendor_frame(file, service_name, service_config, transaction_type)
+    if isinstance(df_excel, pd.DataFrame):
+        upload_cache.set(key, df_excel)
+    return df_excel
+
+
 def select_service_handler(
     service_name, from_date, to_date, df_excel, transaction_type=None
 ):
@@ -266,34 +325,16 @@ def main(from_date, to_date, service_name, file, transaction_type=None):
             logger.warning("Error in Service name..!")
             return "Error in Service name..!"
 
-        # Read and process the Excel file
-        df_excel = pd.read_excel(file, dtype=str)
         service_config = SERVICE_CONFIGS[service_name]
-        if not all(
-            col in df_excel.columns for col in service_config["required_columns"]
-        ):
-            logger.warning(f"Wrong File Uploaded in {service_name} Service")
-            return "Wrong File Uploaded...!"
+        df_excel = load_vendor_frame(file, service_name, service_config, transaction_type)
+        if isinstance(df_excel, str):
+            return df_excel
 
-        if transaction_type == "3":
-            df_excel = df_excel.rename(columns=service_config["columnsmini"])
-        else:
-            # Rename columns based on service configuration
-            df_excel = df_excel.rename(columns=service_config["columns"])
         # calling bbps data entry fun
         if service_name == "BBPS_DATA_ENTRY":
             logger.info(f"Ihub service: {service_name}")
             return bbps_data_entry(from_date, to_date, service_name, df_excel)
 
-        if service_name in ["INSURANCE_OFFLINE", "SULTANPUR_IS", "CHITRAKOOT_IS"]:
-            if service_name == "INSURANCE_OFFLINE":
-                df_excel["REFID"] = df_excel["REFID"].astype(str).str.slice(0, 20)
-            else:
-                df_excel["REFID"] = df_excel["REFID"].astype(str).str.slice(1, 11)
-        # print(df_excel["REFID"].head(5))
-        # Process date columns
-        df_excel = process_date_columns(df_excel, service_config)
-
         # Convert input dates
         from_date = pd.to_datetime(from_date).date()
         to_date = pd.to_datetime(to_date).date()
@@ -0,0 +1,69 @@
+"""
+money.py - Fixed-point (paise) money columns.
+
+Amounts reach the reconciliation as Excel floats, numeric text ("1,250.50",
+"₹ 99"), Decimals from MariaDB and float sums, and comparing those as they
+come gives false mismatches ("500.0" != "500", 0.1 + 0.2 != 0.3).
+to_paise() turns any of them into an Int64 column of paise, so amount checks
+are exact integer comparisons; to_rupees() converts back when the result is
+serialized.
+"""
+
+import numpy as np
+import pandas as pd
+from value_normalizer import parse_floats
+
+PAISE_PER_RUPEE = 100
+MONEY_DTYPE = "Int64"
+
+# Paise at or beyond this do not fit in int64
+_PAISE_LIMIT = 2.0**63
+
+
+def _rupees_as_float(series: pd.Series) -> np.ndarray:
+    try:
+        # Numeric columns, Decimals, None and plain numeric text
+        return series.to_numpy(dtype="float64", na_value=np.nan)
+    except (ValueError, TypeError):
+        texts = [
+            str(value).replace("₹", "").replace(",", "").replace(" ", "")
+            for value in series.tolist()
+        ]
+        return parse_floats(texts)
+
+
+def to_paise(series: pd.Series) -> pd.Series:
+    """
+    Amounts in rupees as Int64 paise, rounded to the nearest paisa. Blanks,
+    nulls and text that is not a number become <NA>.
+    """
+    paise = np.round(_rupees_as_float(series) * PAISE_PER_RUPEE)
+    valid = np.isfinite(paise) & (np.abs(paise) < _PAISE_LIMIT)
+    values = pd.arrays.IntegerArray(
+        np.where(valid, paise, 0).astype("int64"), ~valid
+    )
+    return pd.Series(values, index=series.index, name=series.name)
+
+
+def to_rupees(series: pd.Series) -> pd.Series:
+    """Paise column back to float rupees (NaN for <NA>), for the response."""
+    rupees = series.to_numpy(dtype="float64", na_value=np.nan) / PAISE_PER_RUPEE
+    return pd.Series(rupees, index=series.index, name=series.name)
+
+
+def money_equal(left: pd.Series, right: pd.Series) -> np.ndarray:
+    """Row-wise left == right on paise columns; <NA> never equals anything."""
+    return (left == right).fillna(False).to_numpy(dtype=bool)
+
+
+def frame_to_rupees(df: pd.DataFrame, columns) -> pd.DataFrame:
+    """Copy of df with those of `columns` that hold paise converted to rupees."""
+    paise_columns = [
+        col for col in columns if col in df.columns and df[col].dtype == MONEY_DTYPE
+    ]
+    if not paise_columns:
+        return df
+    df = df.copy()
+    for col in paise_columns:
+        df[col] = to_rupees(df[col])
+    return df
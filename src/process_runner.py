@@ -0,0 +1,176 @@
+"""
+process_runner.py - Run reconciliations in worker processes.
+
+The pandas work of a reconciliation holds the GIL, so two large uploads
+processed by waitress threads effectively run one after the other. Uploads
+above CONFIG["process_pool"]["min_upload_bytes"] are shipped (file bytes and
+form parameters) to a spawned worker process that has pandas, the service
+modules and its own DB engine loaded already; the result frames come back
+pickled. Small uploads, and IRCTC which has no upload, stay in the calling
+thread where the round trip would cost more than it saves.
+"""
+
+import io
+import threading
+import time
+import traceback
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from config import CONFIG
+from logger_config import logger, get_log_queue, attach_log_queue
+
+# name -> (module, function); resolved lazily so app.py can import this
+# module without a circular import through main.py
+TARGETS = {
+    "reconciliation": ("main", "main"),
+    "vendorledger": ("components.vendorexcel", "vendorexcel_reconciliation"),
+}
+UPLOAD_FIELDS = ("file", "vendor_ledger", "vendor_statement")
+
+_pool = None
+_pool_lock = threading.Lock()
+_stats_lock = threading.Lock()
+_stats = {"process_runs": 0, "thread_runs": 0, "fallbacks": 0}
+
+
+def _resolve(target):
+    module_name, func_name = TARGETS[target]
+    module = __import__(module_name, fromlist=[func_name])
+    return getattr(module, func_name)
+
+
+def _init_worker(log_queue):
+    """
+    Route logging to the parent, pre-import the service code and warm the
+    DB pool in a new worker.
+    """
+    attach_log_queue(log_queue)
+    for target in TARGETS:
+        _resolve(target)
+    try:
+        from db_connector import get_db_connection
+
+        with get_db_connection().connect():
+            pass
+    except Exception as e:
+        # The job itself will retry/report; a cold engine is not fatal here
+        logger.warning(f"Worker could not warm DB connection: {str(e)}")
+
+
+def _run_in_worker(target, kwargs):
+    for field in UPLOAD_FIELDS:
+        upload = kwargs.get(field)
+        if isinstance(upload, tuple):
+            data, filename = upload
+            buffer = io.BytesIO(data)
+            buffer.name = filename
+            kwargs[field] = buffer
+    return _resolve(target)(**kwargs)
+
+
+def _upload_bytes(kwargs):
+    return sum(
+        len(kwargs[field].getbuffer())
+        for field in UPLOAD_FIELDS
+        if isinstance(kwargs.get(field), io.BytesIO)
+    )
+
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            settings = CONFIG.get("process_pool", {})
+            # spawn, not fork: the parent has waitress and pool threads running
+            context = multiprocessing.get_context("spawn")
+            _pool = ProcessPoolExecutor(
+                max_workers=settings.get("workers", 2),
+                mp_context=context,
+                initializer=_init_worker,
+                initargs=(get_log_queue(context),),
+            )
+        return _pool
+
+
+def _reset_pool(pool):
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _count(key):
+    with _stats_lock:
+        _stats[key] += 1
+
+
+def execute(target, kwargs):
+    """
+    Run a reconciliation target with kwargs, in a worker process when the
+    uploads are large enough. Uploads must be in-memory copies
+    (job_queue.snapshot_upload), not request.files objects.
+    """
+    settings = CONFIG.get("process_pool", {})
+    size = _upload_bytes(kwargs)
+    if not settings.get("enabled", False) or size < settings.get(
+        "min_upload_bytes", 0
+    ):
+        _count("thread_runs")
+        return _resolve(target)(**kwargs)
+
+    payload = dict(kwargs)
+    for field in UPLOAD_FIELDS:
+        upload = payload.get(field)
+        if isinstance(upload, io.BytesIO):
+            payload[field] = (upload.getvalue(), getattr(upload, "name", None))
+
+    pool = _get_pool()
+    started = time.perf_counter()
+    try:
+        result = pool.submit(_run_in_worker, target, payload).result()
+    except BrokenProcessPool:
+        logger.error(
+            f"Process pool broke while running {target}, running in thread\n"
+            f"{traceback.format_exc()}"
+        )
+        _reset_pool(pool)
+        _count("fallbacks")
+        for field in UPLOAD_FIELDS:
+            upload = kwargs.get(field)
+            if isinstance(upload, io.BytesIO):
+                upload.seek(0)
+        return _resolve(target)(**kwargs)
+    _count("process_runs")
+    logger.info(
+        f"Ran {target} ({size} upload bytes) in worker process "
+        f"in {time.perf_counter() - started:.1f}s"
+    )
+    return result
+
+
+def run_reconciliation(**kwargs):
+    """main(**kwargs), possibly in a worker process."""
+    return execute("reconciliation", kwargs)
+
+
+def run_vendorledger(**kwargs):
+    """vendorexcel_reconciliation(**kwargs), possibly in a worker process."""
+    return execute("vendorledger", kwargs)
+
+
+def get_process_pool_metrics():
+    settings = CONFIG.get("process_pool", {})
+    with _stats_lock:
+        stats = dict(_stats)
+    stats.update(
+        {
+            "enabled": settings.get("enabled", False),
+            "workers": settings.get("workers", 2),
+            "min_upload_bytes": settings.get("min_upload_bytes", 0),
+            "started": _pool is not None,
+        }
+    )
+    return stats
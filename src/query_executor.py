@@ -0,0 +1,416 @@
+"""
+query_executor.py - Shared SQL executor for every service module.
+
+One retry policy, one fetch path and one place to measure query timings and
+row counts, instead of a copy of execute_sql_with_retry per component.
+"""
+
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import pandas as pd
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError, DatabaseError
+from tenacity import (
+    retry,
+    stop_after_attempt,
+    wait_exponential,
+    retry_if_exception_type,
+)
+from config import CONFIG
+from db_connector import get_db_connection
+from logger_config import logger
+
+# Configure retry logic for database operations
+DB_RETRY_CONFIG = {
+    "stop": stop_after_attempt(3),
+    "wait": wait_exponential(multiplier=1, min=1, max=10),
+    "retry": retry_if_exception_type((OperationalError, DatabaseError)),
+    "reraise": True,
+}
+
+# Rows pulled per round trip when a query is fetched in streaming mode
+STREAM_CHUNK_SIZE = 50000
+
+# Key lists at least this long are loaded into a temporary table and joined
+# instead of being expanded into an IN (...) literal; keys are inserted in
+# batches of KEY_TABLE_INSERT_BATCH rows (see execute_with_keys)
+KEY_TABLE_MIN_KEYS = 1000
+KEY_TABLE_INSERT_BATCH = 5000
+KEY_TABLE_PREFIX = "tmp_lookup_keys"
+
+_query_stats = {}
+_stats_lock = threading.Lock()
+_query_listeners = []
+
+
+def execute_sql_with_retry(
+    query,
+    params=None,
+    name=None,
+    stream=False,
+    coerce_float=False,
+    dtypes=None,
+    chunksize=None,
+):
+    """
+    Execute a query on the shared engine and return the rows as a DataFrame.
+
+    Args:
+        query: SQLAlchemy text() query.
+        params (dict): Bind parameters.
+        name (str): Label used in logs and metrics (defaults to the caller's name).
+        stream (bool): Use a server-side cursor (stream_results) for the fetch.
+        coerce_float (bool): Convert Decimal values to float, as pd.read_sql does.
+        dtypes (dict): Column -> dtype coercions applied to the result.
+        chunksize (int): Stream the result through a server-side cursor and
+            build the DataFrame chunk by chunk, applying dtypes per chunk.
+    """
+    name = name or sys._getframe(1).f_code.co_name
+    for listener in list(_query_listeners):
+        listener(name, query, params or {})
+    return _execute(query, params, name, stream, coerce_float, dtypes, chunksize)
+
+
+@retry(**DB_RETRY_CONFIG)
+def _execute(query, params, name, stream, coerce_float, dtypes, chunksize):
+    logger.info(f"Executing SQL with retry for {name}")
+    started = time.perf_counter()
+    try:
+        connection = get_db_connection().connect()
+        if chunksize:
+            connection = connection.execution_options(
+                stream_results=True, max_row_buffer=chunksize
+            )
+        elif stream:
+            connection = connection.execution_options(stream_results=True)
+        with connection:
+            result = connection.execute(query, params or {})
+            if chunksize:
+                df = _fetch_chunked(result, chunksize, coerce_float, dtypes)
+            else:
+                df = pd.DataFrame.from_records(
+                    result.fetchall(),
+                    columns=list(result.keys()),
+                    coerce_float=coerce_float,
+                )
+    except Exception as e:
+        _record_query(name, time.perf_counter() - started, 0, failed=True)
+        logger.error(f"Error during SQL execution in {name}: {e}")
+        raise
+
+    if dtypes and not chunksize:
+        df = coerce_column_types(df, dtypes)
+    elapsed = time.perf_counter() - started
+    _record_query(name, elapsed, len(df))
+    logger.info(f"{name}: fetched {len(df)} rows in {elapsed:.2f}s")
+    return df
+
+
+# ---------------------------------------------------------------------------
+# Key-driven lookups
+# ---------------------------------------------------------------------------
+# Lookups like "these 40k application ids that were not in the portal" used
+# to render every id into the SQL text. Long key lists are instead bulk
+# inserted into a session temporary table, and each `IN :param` becomes a
+# subquery on it, which MariaDB runs as a semi-join.
+
+
+def _unique_keys(keys):
+    # numpy scalars -> Python values, which the DB driver can bind
+    keys = (key.item() if hasattr(key, "item") else key for key in keys)
+    return list(dict.fromkeys(key for key in keys if not pd.isna(key)))
+
+
+def _key_column_type(keys):
+    if all(isinstance(key, int) and not isinstance(key, bool) for key in keys):
+        return "BIGINT"
+    return "VARCHAR(255)"
+
+
+_collations = {}
+_collations_lock = threading.Lock()
+
+
+def _key_column_collation(connection, key_column):
+    """
+    (charset, collation) of the "schema.table.column" the keys are compared
+    with, or None when unknown. Cached per column.
+    """
+    with _collations_lock:
+        if key_column in _collations:
+            return _collations[key_column]
+    schema, table, column = key_column.split(".")
+    row = connection.execute(
+        text(
+            "SELECT CHARACTER_SET_NAME, COLLATION_NAME "
+            "FROM information_schema.COLUMNS "
+            "WHERE TABLE_SCHEMA = :schema AND TABLE_NAME = :table "
+            "AND COLUMN_NAME = :column"
+        ),
+        {"schema": schema, "table": table, "column": column},
+    ).first()
+    collation = None
+    if row is not None and all(re.fullmatch(r"\w+", value or "") for value in row):
+        collation = tuple(row)
+    if collation is None:
+        logger.warning(f"No collation found for lookup key column {key_column}")
+    with _collations_lock:
+        _collations[key_column] = collation
+    return collation
+
+
+def _key_column_ddl(connection, keys, key_column):
+    column_type = _key_column_type(keys)
+    if column_type == "BIGINT" or not key_column:
+        return column_type
+    collation = _key_column_collation(connection, key_column)
+    if collation is None:
+        return column_type
+    return f"{column_type} CHARACTER SET {collation[0]} COLLATE {collation[1]}"
+
+
+def execute_with_keys(
+    query,
+    keys,
+    key_param,
+    params=None,
+    name=None,
+    stream=False,
+    coerce_float=False,
+    dtypes=None,
+    key_column=None,
+):
+    """
+    Execute a query filtered by `... IN :key_param` for a possibly long list
+    of keys and return the rows as a DataFrame.
+
+    Short lists are bound as a tuple, as before. From KEY_TABLE_MIN_KEYS keys
+    on, the keys go into a temporary table on the query's own connection and
+    every `IN :key_param` is rewritten to select from it. NaN/None keys and
+    duplicates are dropped; with no keys left an empty DataFrame is returned.
+    key_column ("schema.table.column", the column the keys are compared
+    with) gives the key table that column's charset and collation, so the
+    comparison matches the IN list's and can use the column's index.
+    Other arguments as execute_sql_with_retry().
+    """
+    name = name or sys._getframe(1).f_code.co_name
+    keys = _unique_keys(keys)
+    if not keys:
+        return pd.DataFrame()  # `IN ()` is a syntax error and matches nothing
+    if len(keys) < KEY_TABLE_MIN_KEYS:
+        return execute_sql_with_retry(
+            query,
+            params={**(params or {}), key_param: tuple(keys)},
+            name=name,
+            stream=stream,
+            coerce_float=coerce_float,
+            dtypes=dtypes,
+        )
+    # Listeners get the query as written with the keys bound as a tuple, so
+    # EXPLAIN can run it on its own connection (the temporary tables exist
+    # only on the executing one). MariaDB turns an IN list this long into
+    # a derived-table semi-join, the same shape as the key-table join.
+    listener_params = {**(params or {}), key_param: tuple(keys)}
+    for listener in list(_query_listeners):
+        listener(name, query, listener_params)
+    return _execute_with_key_table(
+        query, keys, key_param, params, name, stream, coerce_float, dtypes, key_column
+    )
+
+
+def _load_key_tables(connection, tables, keys, key_column=None):
+    first = tables[0]
+    for table in tables:
+        connection.execute(text(f"DROP TEMPORARY TABLE IF EXISTS {table}"))
+    # A plain (non-unique) index: keys that are distinct in Python can still
+    # be equal under the column's collation ("AB12" / "ab12", "123" /
+    # "123 " with a case-insensitive PAD SPACE collation), and the IN list
+    # this replaces accepts them.
+    connection.execute(
+        text(
+            f"CREATE TEMPORARY TABLE {first} "
+            f"(lookup_key {_key_column_ddl(connection, keys, key_column)}, "
+            f"INDEX (lookup_key))"
+        )
+    )
+    insert = text(f"INSERT INTO {first} (lookup_key) VALUES (:lookup_key)")
+    for start in range(0, len(keys), KEY_TABLE_INSERT_BATCH):
+        batch = keys[start : start + KEY_TABLE_INSERT_BATCH]
+        connection.execute(insert, [{"lookup_key": key} for key in batch])
+    for table in tables[1:]:
+        connection.execute(text(f"CREATE TEMPORARY TABLE {table} LIKE {first}"))
+        connection.execute(text(f"INSERT INTO {table} SELECT * FROM {first}"))
+
+
+@retry(**DB_RETRY_CONFIG)
+def _execute_with_key_table(
+    query, keys, key_param, params, name, stream, coerce_float, dtypes, key_column
+):
+    logger.info(f"Executing SQL with retry for {name} ({len(keys)} lookup keys)")
+    started = time.perf_counter()
+    pattern = re.compile(rf"\bIN\s*:{re.escape(key_param)}\b", re.IGNORECASE)
+    # A temporary table can be opened only once per statement, so every
+    # occurrence of the IN clause gets its own copy of the keys
+    tables = [
+        f"{KEY_TABLE_PREFIX}_{i}" for i in range(len(pattern.findall(query.text)))
+    ]
+    if not tables:
+        raise ValueError(f"{name}: query has no 'IN :{key_param}' clause")
+    occurrence = iter(tables)
+    sql = pattern.sub(
+        lambda _: f"IN (SELECT lookup_key FROM {next(occurrence)})", query.text
+    )
+    statement = text(sql)
+    if stream:
+        statement = statement.execution_options(stream_results=True)
+    try:
+        with get_db_connection().connect() as connection:
+            try:
+                _load_key_tables(connection, tables, keys, key_column)
+                result = connection.execute(statement, params or {})
+                df = pd.DataFrame.from_records(
+                    result.fetchall(),
+                    columns=list(result.keys()),
+                    coerce_float=coerce_float,
+                )
+            finally:
+                # Pooled connections outlive this call (and the next lookup
+                # on this connection drops leftovers before creating its own)
+                try:
+                    for table in tables:
+                        connection.execute(
+                            text(f"DROP TEMPORARY TABLE IF EXISTS {table}")
+                        )
+                except Exception as e:
+                    logger.warning(f"Could not drop lookup key tables: {e}")
+    except Exception as e:
+        _record_query(name, time.perf_counter() - started, 0, failed=True)
+        logger.error(f"Error during SQL execution in {name}: {e}")
+        raise
+
+    if dtypes:
+        df = coerce_column_types(df, dtypes)
+    elapsed = time.perf_counter() - started
+    _record_query(name, elapsed, len(df))
+    logger.info(f"{name}: fetched {len(df)} rows in {elapsed:.2f}s")
+    return df
+
+
+# ---------------------------------------------------------------------------
+# Concurrent fetches
+# ---------------------------------------------------------------------------
+# A service fetch is several independent queries (hub rows, EBO wallet
+# flags, ledger reference sets, ...). Run side by side, each on its own
+# pooled connection, the fetch takes about as long as its slowest query.
+
+_fanout_executor = ThreadPoolExecutor(
+    max_workers=CONFIG.get("query_fanout", {}).get("workers", 6),
+    thread_name_prefix="query-fanout",
+)
+_fanout_local = threading.local()
+
+
+def _run_fanout_task(func):
+    _fanout_local.active = True
+    try:
+        return func()
+    finally:
+        _fanout_local.active = False
+
+
+def run_concurrently(tasks):
+    """
+    Run independent zero-argument callables in parallel and return
+    {key: result} once all of them have finished.
+
+    If a task raises, the exception of the first failed task (in dict order)
+    is re-raised after the others complete. Nested calls from inside a task
+    run sequentially, so a fan-out worker never waits on work queued behind
+    it in the same pool.
+    """
+    if len(tasks) < 2 or getattr(_fanout_local, "active", False):
+        return {key: func() for key, func in tasks.items()}
+    futures = {
+        key: _fanout_executor.submit(_run_fanout_task, func)
+        for key, func in tasks.items()
+    }
+    wait(futures.values())
+    return {key: future.result() for key, future in futures.items()}
+
+
+def add_query_listener(listener):
+    """Call listener(name, query, params) before every query (see explain_check.py)."""
+    _query_listeners.append(listener)
+
+
+def remove_query_listener(listener):
+    if listener in _query_listeners:
+        _query_listeners.remove(listener)
+
+
+def _fetch_chunked(result, chunksize, coerce_float, dtypes):
+    """
+    Build the DataFrame from fixed-size partitions of a streamed result, so
+    only one chunk of raw row tuples is held in memory at a time.
+    """
+    columns = list(result.keys())
+    frames = []
+    for rows in result.partitions(chunksize):
+        chunk = pd.DataFrame.from_records(
+            rows, columns=columns, coerce_float=coerce_float
+        )
+        del rows
+        if dtypes:
+            chunk = coerce_column_types(chunk, dtypes)
+        frames.append(chunk)
+    if not frames:
+        return coerce_column_types(pd.DataFrame(columns=columns), dtypes or {})
+    if len(frames) == 1:
+        return frames[0]
+    # Chunk dtypes are inferred per chunk (an int column that is all NULL in
+    # one chunk comes out object); infer_objects gives the dtypes a single
+    # fetch of the whole result would have.
+    return pd.concat(frames, ignore_index=True, copy=False).infer_objects()
+
+
+def coerce_column_types(df, dtypes):
+    """Apply dtype coercions to the columns present in df; log and skip failures."""
+    for col, dtype in dtypes.items():
+        if col not in df.columns:
+            continue
+        try:
+            df[col] = df[col].astype(dtype)
+        except (ValueError, TypeError) as e:
+            logger.warning(f"Could not convert column {col} to {dtype}: {e}")
+    return df
+
+
+def _record_query(name, elapsed, rows, failed=False):
+    with _stats_lock:
+        stats = _query_stats.setdefault(
+            name,
+            {"calls": 0, "failures": 0, "rows": 0, "total_seconds": 0.0, "max_seconds": 0.0},
+        )
+        stats["calls"] += 1
+        stats["failures"] += int(failed)
+        stats["rows"] += rows
+        stats["total_seconds"] += elapsed
+        stats["max_seconds"] = max(stats["max_seconds"], elapsed)
+
+
+def get_query_metrics():
+    """Per-query call counts, row counts and timings since process start."""
+    with _stats_lock:
+        return {
+            name: {
+                **stats,
+                "total_seconds": round(stats["total_seconds"], 3),
+                "max_seconds": round(stats["max_seconds"], 3),
+                "avg_seconds": round(stats["total_seconds"] / stats["calls"], 3),
+            }
+            for name, stats in _query_stats.items()
+        }
@@ -0,0 +1,168 @@
+"""
+response_encoder.py - Serialization prep for reconciliation results.
+
+frame_to_records() turns a DataFrame into the record list the API has always
+returned, cleaning NaN / "nan" / "none" and rounding amounts per column
+instead of per cell.
+
+The columnar format is selected with `?format=columnar` or
+`Accept: application/vnd.inet.columnar+json`. Each DataFrame is then sent as
+{"columns": [...], "length": n, "data": {col: [...]}} instead of a list of
+records, so key names are not repeated per row, and serialized with orjson
+when it is installed.
+"""
+
+import json
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+from flask import Response
+from logger_config import logger
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+COLUMNAR_MIMETYPE = "application/vnd.inet.columnar+json"
+
+# Same columns process_result rounds to 3 decimals
+ROUNDED_COLUMNS = ["AMOUNT", "COMMISSION_AMOUNT", "HUB_AMOUNT"]
+NULL_STRINGS = ["nan", "none", ""]
+
+
+def wants_columnar(request) -> bool:
+    """True when the client asked for the columnar response format."""
+    if request.args.get("format", "").lower() == "columnar":
+        return True
+    return COLUMNAR_MIMETYPE in request.headers.get("Accept", "")
+
+
+def round_amounts(series: pd.Series) -> pd.Series:
+    """Round to 3 decimals as float; non-numeric values become 0.0, nulls stay null."""
+    numeric = pd.to_numeric(series, errors="coerce").astype("float64")
+    invalid = (numeric.isna() & series.notna()).to_numpy()
+    if invalid.any():
+        # "nan" strings parse to NaN (float("nan")), so they stay null
+        text = series[invalid].astype(str).str.strip().str.lower().str.lstrip("+-")
+        invalid[invalid] = (text != "nan").to_numpy()
+    return numeric.round(3).mask(invalid, 0.0)
+
+
+def _object_values(series: pd.Series) -> list:
+    """Object column as a list; nulls and "nan"/"none"/"" strings become None."""
+    values = series.astype(object)
+    null_mask = values.isna()
+    try:
+        # .str yields NaN (not a match) for non-string cells
+        null_mask |= values.str.strip().str.lower().isin(NULL_STRINGS)
+    except AttributeError:
+        pass  # no string values in this column
+    return values.where(~null_mask, None).tolist()
+
+
+def _column_values(series: pd.Series):
+    if pd.api.types.is_datetime64_any_dtype(series):
+        values = series.dt.strftime("%Y-%m-%dT%H:%M:%S")
+        return values.astype(object).where(series.notna(), None).tolist()
+    if pd.api.types.is_bool_dtype(series) or pd.api.types.is_integer_dtype(series):
+        if series.isna().any():
+            return series.astype(object).where(series.notna(), None).tolist()
+        return series.to_numpy()
+    if pd.api.types.is_float_dtype(series):
+        # orjson writes NaN inside float arrays as null
+        return series.to_numpy(dtype=np.float64, na_value=np.nan)
+    return _object_values(series)
+
+
+def _record_values(series: pd.Series, date_format=None) -> list:
+    """Column as a list of plain Python values with None for missing."""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        if date_format:
+            values = series.dt.strftime(date_format)
+        else:
+            values = series.astype(object)
+        return values.where(series.notna(), None).tolist()
+    if (
+        pd.api.types.is_object_dtype(series)
+        or pd.api.types.is_string_dtype(series)
+        or isinstance(series.dtype, pd.CategoricalDtype)
+    ):
+        return _object_values(series)
+    # numeric/bool: astype(object) yields Python int/float/bool
+    return series.astype(object).where(series.notna(), None).tolist()
+
+
+def frame_to_records(
+    df: pd.DataFrame, rounded=ROUNDED_COLUMNS, date_format=None
+) -> List[Dict[str, Any]]:
+    """
+    DataFrame as a list of record dicts, ready for jsonify.
+
+    Columns in `rounded` are rounded to 3 decimals (non-numeric -> 0.0); NaN,
+    pd.NA, NaT and "nan"/"none"/"" strings become None; datetimes stay
+    datetime objects unless a `date_format` is given.
+    """
+    columns = list(df.columns)
+    values = []
+    for col in columns:
+        series = df[col]
+        if col in rounded:
+            series = round_amounts(series)
+        values.append(_record_values(series, date_format))
+    return [dict(zip(columns, row)) for row in zip(*values)]
+
+
+def encode_frame_columnar(df: pd.DataFrame) -> Dict[str, Any]:
+    """Column-oriented representation of a DataFrame."""
+    data = {}
+    for col in df.columns:
+        series = df[col]
+        if col in ROUNDED_COLUMNS:
+            series = round_amounts(series)
+        data[str(col)] = _column_values(series)
+    return {"columns": [str(col) for col in df.columns], "length": len(df), "data": data}
+
+
+def _default(obj):
+    if isinstance(obj, np.ndarray):
+        return [None if isinstance(v, float) and v != v else v for v in obj.tolist()]
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, pd.Timestamp):
+        return obj.isoformat()
+    if hasattr(obj, "isoformat"):
+        return obj.isoformat()
+    # Decimal and anything else: same as Flask's JSON provider
+    return str(obj)
+
+
+def dumps(payload) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(
+            payload,
+            default=_default,
+            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS,
+        )
+    return json.dumps(payload, default=_default, allow_nan=False).encode("utf-8")
+
+
+def _has_data(value) -> bool:
+    if isinstance(value, dict) and "length" in value and "columns" in value:
+        return value["length"] > 0
+    return bool(value)
+
+
+def columnar_handler(result: Dict[str, Any], message: str, service_name: str):
+    """handler() counterpart that writes the response with the fast encoder."""
+    logger.info("Result sent as API (columnar)")
+    logger.info("----------------------------------")
+    response = {
+        "isSuccess": any(_has_data(v) for v in result.values()),
+        "format": "columnar",
+        "data": result,
+        "message": message,
+        "service_name": service_name,
+    }
+    return Response(dumps(response), mimetype=COLUMNAR_MIMETYPE)
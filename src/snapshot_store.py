@@ -0,0 +1,299 @@
+"""
+snapshot_store.py - Day-partitioned snapshots of hub range queries.
+
+A monthly reconciliation used to pull 30 days of MasterTransaction joins on
+every run. execute_by_day() serves a :start_date/:end_date query from one
+pickle per day for days that are closed (older than settle_days), fetches
+the missing closed days once (one query per run of consecutive days, split
+by the day_column timestamp) and stores them, and only queries the
+still-open trailing days live.
+
+Snapshots are stored under the caller's name and a digest of the database
+URL, the query text, the other bind parameters and the fetch options, so an
+edited query (or another database) never reads old snapshots. Hub rows can
+still change after a day is closed (refunds, manual status fixes);
+clear_snapshots() drops the stored days so they are fetched again.
+"""
+
+import hashlib
+import os
+import shutil
+import sys
+import threading
+from datetime import date, timedelta
+
+import pandas as pd
+from config import CONFIG
+from db_connector import get_db_connection
+from logger_config import logger
+from query_executor import execute_sql_with_retry
+
+SNAPSHOT_SUFFIX = ".pkl"
+RANGE_PARAMS = ("start_date", "end_date")
+
+_stats_lock = threading.Lock()
+_stats = {"snapshot_days": 0, "fetched_days": 0, "live_queries": 0}
+
+
+def _as_date(value):
+    return pd.to_datetime(value).date()
+
+
+def _days(start, end):
+    return [start + timedelta(days=i) for i in range((end - start).days + 1)]
+
+
+def _digest(query, params, options):
+    fixed = {k: v for k, v in params.items() if k not in RANGE_PARAMS}
+    url = get_db_connection().url.render_as_string(hide_password=True)
+    text = f"{url}|{query}|{sorted(fixed.items())!r}|{sorted(options.items())!r}"
+    return hashlib.sha256(text.encode()).hexdigest()[:16]
+
+
+def _count(key, amount=1):
+    with _stats_lock:
+        _stats[key] += amount
+
+
+def _path(store_dir, day):
+    return os.path.join(store_dir, day.isoformat() + SNAPSHOT_SUFFIX)
+
+
+def _load(store_dir, day):
+    path = _path(store_dir, day)
+    if not os.path.exists(path):
+        return None
+    try:
+        return pd.read_pickle(path)
+    except Exception as e:
+        logger.warning(f"Discarding unreadable snapshot {path}: {str(e)}")
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        return None
+
+
+def _save(store_dir, day, df):
+    os.makedirs(store_dir, exist_ok=True)
+    path = _path(store_dir, day)
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        df.to_pickle(temp_path)
+        os.replace(temp_path, path)
+    except Exception as e:
+        logger.warning(f"Could not write snapshot {path}: {str(e)}")
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def _prune(store_dir, retention_days):
+    """Delete snapshots of days older than retention_days."""
+    oldest = (date.today() - timedelta(days=retention_days)).isoformat()
+    with os.scandir(store_dir) as it:
+        for entry in it:
+            if entry.name.endswith(SNAPSHOT_SUFFIX) and entry.name < oldest:
+                try:
+                    os.remove(entry.path)
+                except FileNotFoundError:
+                    pass
+
+
+def _settle_days(settings, name):
+    return settings.get("settle_days_by_query", {}).get(
+        name, settings.get("settle_days", 3)
+    )
+
+
+def _runs(days):
+    """Sorted days as lists of consecutive days."""
+    runs = []
+    for day in days:
+        if runs and day - runs[-1][-1] == timedelta(days=1):
+            runs[-1].append(day)
+        else:
+            runs.append([day])
+    return runs
+
+
+def _widened_int_columns(df, dtypes):
+    # Float columns whose non-null values are all whole numbers and that
+    # have NULLs: int columns a span fetch widened because some day had
+    # NULLs. Declared dtypes are left alone.
+    columns = []
+    for col in df.columns:
+        values = df[col]
+        if col in dtypes or values.dtype.kind != "f" or not values.isna().any():
+            continue
+        present = values.dropna()
+        if not present.empty and (present == present.round()).all():
+            columns.append(col)
+    return columns
+
+
+def _split_by_day(df, day_column, days, dtypes):
+    """
+    A span result as {day: frame}, each with the dtypes a fetch of just that
+    day would give (int columns without NULLs on that day are int again).
+    """
+    row_days = pd.to_datetime(df[day_column], errors="coerce").dt.date
+    widened = _widened_int_columns(df, dtypes)
+    frames = {}
+    for day in days:
+        part = df[(row_days == day).to_numpy()].reset_index(drop=True).infer_objects()
+        if not part.empty:
+            whole = [col for col in widened if part[col].notna().all()]
+            if whole:
+                part = part.astype({col: "int64" for col in whole})
+            # A column that is NULL on every row of the day is all None
+            # (object) in a fetch of that day
+            for col in part.columns[part.isna().all().to_numpy()]:
+                if col not in dtypes:
+                    part[col] = pd.Series([None] * len(part), dtype=object)
+        frames[day] = part
+    return frames
+
+
+def _concat(frames):
+    non_empty = [df for df in frames if not df.empty]
+    if not non_empty:
+        return frames[0] if frames else pd.DataFrame()
+    if len(non_empty) == 1:
+        return non_empty[0]
+    # Per-day frames can disagree on dtypes (an int column with NULLs on one
+    # day only); infer_objects restores what a single range fetch would give.
+    return pd.concat(non_empty, ignore_index=True).infer_objects()
+
+
+def _fetch_days(query, params, name, store_dir, days, day_column, options):
+    """Fetch and store consecutive closed days; returns {day: frame}."""
+    df = execute_sql_with_retry(
+        query,
+        params={**params, "start_date": str(days[0]), "end_date": str(days[-1])},
+        name=name,
+        **options,
+    )
+    if len(days) == 1:
+        frames = {days[0]: df}
+    elif df.empty:
+        frames = {day: df.copy() for day in days}
+    elif day_column in df.columns:
+        frames = _split_by_day(df, day_column, days, options.get("dtypes") or {})
+    else:
+        logger.warning(
+            f"{name}: no {day_column} column to split by, fetching day by day"
+        )
+        frames = {
+            day: execute_sql_with_retry(
+                query,
+                params={**params, "start_date": str(day), "end_date": str(day)},
+                name=name,
+                **options,
+            )
+            for day in days
+        }
+    for day, frame in frames.items():
+        _save(store_dir, day, frame)
+    return frames
+
+
+def execute_by_day(query, params, name=None, day_column="SERVICE_DATE", **options):
+    """
+    execute_sql_with_retry() for a :start_date/:end_date range query, with
+    closed days served from snapshots. day_column is the result column
+    holding the timestamp the range filters on; missing closed days are
+    fetched as one span query and split on it. options are passed through
+    (chunksize, dtypes, ...).
+    """
+    name = name or sys._getframe(1).f_code.co_name
+    settings = CONFIG.get("snapshot_store", {})
+    if not settings.get("enabled", False):
+        return execute_sql_with_retry(query, params=params, name=name, **options)
+
+    start = _as_date(params["start_date"])
+    end = _as_date(params["end_date"])
+    open_from = date.today() - timedelta(days=_settle_days(settings, name))
+    store_dir = os.path.join(
+        settings["directory"], name, _digest(query, params, options)
+    )
+
+    frames = {}
+    missing = []
+    for day in _days(start, min(end, open_from - timedelta(days=1))):
+        df = _load(store_dir, day)
+        if df is None:
+            missing.append(day)
+        else:
+            frames[day] = df
+    _count("snapshot_days", len(frames))
+
+    for run in _runs(missing):
+        frames.update(
+            _fetch_days(query, params, name, store_dir, run, day_column, options)
+        )
+    if missing:
+        _count("fetched_days", len(missing))
+        logger.info(f"{name}: stored {len(missing)} day snapshot(s)")
+        _prune(store_dir, settings.get("retention_days", 400))
+
+    ordered = [frames[day] for day in sorted(frames)]
+    if end >= open_from:
+        ordered.append(
+            execute_sql_with_retry(
+                query,
+                params={
+                    **params,
+                    "start_date": str(max(start, open_from)),
+                    "end_date": str(end),
+                },
+                name=name,
+                **options,
+            )
+        )
+        _count("live_queries")
+    return _concat(ordered)
+
+
+def clear_snapshots(name=None, start_date=None, end_date=None):
+    """
+    Delete stored day snapshots so the days are fetched again: those of the
+    query `name` (all queries if None), limited to start_date..end_date when
+    given. Returns the number of snapshot files removed.
+    """
+    if name is not None and (os.path.basename(name) != name or name in ("", ".", "..")):
+        raise ValueError(f"Invalid snapshot query name: {name!r}")
+    root = CONFIG.get("snapshot_store", {}).get("directory")
+    if not root or not os.path.isdir(root):
+        return 0
+    if name is None:
+        store_roots = [entry.path for entry in os.scandir(root) if entry.is_dir()]
+    else:
+        store_roots = [os.path.join(root, name)]
+    first = _as_date(start_date).isoformat() if start_date else None
+    last = _as_date(end_date).isoformat() if end_date else None
+
+    removed = 0
+    for store_root in store_roots:
+        if not os.path.isdir(store_root):
+            continue
+        for dirpath, _, filenames in os.walk(store_root):
+            for filename in filenames:
+                if not filename.endswith(SNAPSHOT_SUFFIX):
+                    continue
+                day = filename[: -len(SNAPSHOT_SUFFIX)]
+                if (first and day < first) or (last and day > last):
+                    continue
+                try:
+                    os.remove(os.path.join(dirpath, filename))
+                    removed += 1
+                except FileNotFoundError:
+                    pass
+        if first is None and last is None:
+            shutil.rmtree(store_root, ignore_errors=True)
+    logger.info(f"Cleared {removed} hub snapshot(s) for {name or 'all queries'}")
+    return removed
+
+
+def get_snapshot_metrics():
+    with _stats_lock:
+        return dict(_stats)
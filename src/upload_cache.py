@@ -0,0 +1,166 @@
+"""
+upload_cache.py - Disk cache of parsed vendor uploads.
+
+Ops re-upload the same statement many times while trying different date
+ranges. The parsed, renamed and date-normalized vendor DataFrame is stored
+under the SHA-256 of the file contents (plus the service and its column
+mapping), so a repeat upload skips Excel parsing entirely. Entries are
+pickle files in CONFIG["upload_cache"]["directory"]; the least recently used
+ones are deleted once the directory grows past max_bytes. The directory is
+shared by the web process and the reconciliation worker processes.
+"""
+
+import hashlib
+import os
+import threading
+
+import pandas as pd
+from config import CONFIG
+from logger_config import logger
+
+CACHE_SUFFIX = ".pkl"
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def file_digest(file) -> str:
+    """SHA-256 of an uploaded file's contents (file is rewound afterwards)."""
+    digest = hashlib.sha256()
+    file.seek(0)
+    for chunk in iter(lambda: file.read(HASH_CHUNK_SIZE), b""):
+        digest.update(chunk)
+    file.seek(0)
+    return digest.hexdigest()
+
+
+def _config_digest(service_config) -> str:
+    # Callables (processing lambdas) have no stable repr; only data settings
+    # affect how the upload is parsed.
+    settings = {
+        key: value for key, value in service_config.items() if not callable(value)
+    }
+    return hashlib.sha256(repr(sorted(settings.items())).encode()).hexdigest()[:16]
+
+
+def upload_key(file, service_name, service_config, transaction_type=None) -> str:
+    """Cache key for an upload as parsed for a given service."""
+    variant = "mini" if transaction_type == "3" else "std"
+    return "-".join(
+        [
+            service_name,
+            variant,
+            _config_digest(service_config),
+            file_digest(file),
+        ]
+    )
+
+
+class UploadCache:
+    """Size-bounded LRU directory of pickled DataFrames."""
+
+    def __init__(self, directory, max_bytes=2 * 1024**3, enabled=True):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if enabled:
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + CACHE_SUFFIX)
+
+    def get(self, key):
+        """Cached DataFrame for key, or None."""
+        if not self.enabled:
+            return None
+        path = self._path(key)
+        try:
+            df = pd.read_pickle(path)
+            os.utime(path)  # mark as recently used
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        except Exception as e:
+            logger.warning(f"Discarding unreadable upload cache entry {key}: {str(e)}")
+            self._remove(path)
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        logger.info(f"Upload cache hit for {key}")
+        return df
+
+    def set(self, key, df):
+        if not self.enabled:
+            return
+        path = self._path(key)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            df.to_pickle(temp_path)
+            os.replace(temp_path, path)  # atomic, so readers never see half a file
+        except Exception as e:
+            logger.warning(f"Could not cache upload {key}: {str(e)}")
+            self._remove(temp_path)
+            return
+        self._evict()
+
+    def _entries(self):
+        entries = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name.endswith(CACHE_SUFFIX):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def _evict(self):
+        with self._lock:
+            entries = sorted(self._entries())
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                self._remove(path)
+                total -= size
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def clear(self):
+        for _, _, path in self._entries():
+            self._remove(path)
+
+    def stats(self):
+        entries = self._entries() if self.enabled else []
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "entries": len(entries),
+                "bytes": sum(size for _, size, _ in entries),
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+_upload_cache = None
+_upload_cache_lock = threading.Lock()
+
+
+def get_upload_cache():
+    """Process-wide UploadCache built from CONFIG["upload_cache"] on first use."""
+    global _upload_cache
+    with _upload_cache_lock:
+        if _upload_cache is None:
+            _upload_cache = UploadCache(**CONFIG["upload_cache"])
+        return _upload_cache
@@ -0,0 +1,91 @@
+"""
+value_normalizer.py - Vectorized cleanup of vendor keys and amounts.
+
+Vendor statements carry RRNs, transaction ids and amounts as a mix of
+floats (Excel numbers), numeric text, blanks and the odd free-text value.
+The vendor-ledger branches used to normalize them cell by cell with
+Series.apply; normalize_key() gives the same result for a whole column at
+once and only falls back to Python for the few cells that are neither
+blank nor plain numbers.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Whole numbers at or beyond this cannot go through int64
+_INT64_LIMIT = 2.0**63
+
+
+def normalize_key_value(value) -> str:
+    """
+    Single-value normalize_key(): numbers (or numeric text) as an integer
+    string with the decimals dropped, "" for blanks/NaN/"nan", anything
+    else stripped.
+    """
+    try:
+        if pd.notna(value) and str(value).strip().lower() != "nan":
+            return str(int(float(value)))
+        return ""
+    except (ValueError, TypeError, OverflowError):
+        return str(value).strip() if pd.notna(value) else ""
+
+
+def _parse_float(text):
+    try:
+        return float(text)
+    except ValueError:
+        return np.nan
+
+
+def parse_floats(texts):
+    """float() of every string, NaN where it fails (same parser as float())."""
+    try:
+        return np.array(texts, dtype="float64")
+    except ValueError:  # some non-numeric text; parse one by one
+        return np.array([_parse_float(text) for text in texts], dtype="float64")
+
+
+def normalize_key(series: pd.Series) -> pd.Series:
+    """
+    Vectorized normalize_key_value() for a column of RRNs, ids or amounts.
+
+    Returns an object column of strings: "12345" for 12345.0, "12345.0" and
+    " 12345 ", "" for NaN/None/"nan", and other text stripped.
+    """
+    result = np.full(len(series), "", dtype=object)
+    positions = np.flatnonzero(series.notna().to_numpy())
+    values = series.iloc[positions]
+
+    if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(
+        values
+    ):
+        numbers = values.to_numpy(dtype="float64")
+        convertible = np.isfinite(numbers) & (np.abs(numbers) < _INT64_LIMIT)
+    else:
+        numbers = parse_floats(values.astype(str).tolist())
+        convertible = np.isfinite(numbers) & (np.abs(numbers) < _INT64_LIMIT)
+
+    # Plain numbers are done in one go; the rest ("nan" text, free text,
+    # inf, values past int64, bools) take the per-value path.
+    whole = np.trunc(numbers[convertible]).astype("int64")
+    result[positions[convertible]] = list(map(str, whole.tolist()))
+    rest = ~convertible
+    if rest.any():
+        result[positions[rest]] = [
+            normalize_key_value(value) for value in values[rest]
+        ]
+    return pd.Series(result, index=series.index, dtype=object, name=series.name)
+
+
+def strip_text(series: pd.Series) -> pd.Series:
+    """Strip surrounding whitespace from the string cells; other cells are kept."""
+    # One pass over the values; cheaper than .str.strip() plus re-merging
+    # the non-string cells
+    values = series.tolist()
+    return pd.Series(
+        [value.strip() if isinstance(value, str) else value for value in values],
+        index=series.index,
+        dtype=object,
+        name=series.name,
+    )
+
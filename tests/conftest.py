@@ -0,0 +1,10 @@
+import os
+import sys
+import tempfile
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+sys.path.insert(0, SRC)
+
+# The modules write logs, snapshots and caches under "D:/INET_RR_FLASK",
+# which is a relative path off Windows; keep those out of the checkout.
+os.chdir(tempfile.mkdtemp(prefix="rr_flask_tests_"))
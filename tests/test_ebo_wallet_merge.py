@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from components.outwardservices import EBO_FLAG_COLUMNS, _merge_null_id_rows
+
+
+def merge_null_id_rows_loop(ebo_df):
+    """The per-id loop _merge_null_id_rows replaced (reference behaviour)."""
+    null_rows = ebo_df[ebo_df["MasterTransactionsId"].isna()]
+    non_null_rows = ebo_df[ebo_df["MasterTransactionsId"].notna()]
+    if null_rows.empty or non_null_rows.empty:
+        return ebo_df.reset_index(drop=True)
+    non_null_rows = non_null_rows.copy()
+    for hub_id in null_rows["IHubReferenceId"].unique():
+        null_subset = null_rows[null_rows["IHubReferenceId"] == hub_id]
+        target_index = non_null_rows[non_null_rows["IHubReferenceId"] == hub_id].index
+        if not target_index.empty:
+            for col in EBO_FLAG_COLUMNS:
+                merged_flag = "Yes" if (null_subset[col] == "Yes").any() else "No"
+                non_null_rows.loc[target_index, col] = non_null_rows.loc[
+                    target_index, col
+                ].combine(
+                    pd.Series([merged_flag] * len(target_index), index=target_index),
+                    lambda x, y: "Yes" if y == "Yes" else x,
+                )
+    return non_null_rows.reset_index(drop=True)
+
+
+def wallet_frame(rows, seed, ids=None, null_id_share=0.3):
+    """Wallet rows with NULL MasterTransactionsIds, repeated ids and NULL flags."""
+    rng = np.random.default_rng(seed)
+    ids = ids or max(rows // 3, 1)
+    master_ids = rng.integers(1, 10**6, rows).astype(float)
+    master_ids[rng.random(rows) < null_id_share] = np.nan
+    frame = pd.DataFrame(
+        {
+            "IHubReferenceId": rng.choice(
+                [f"IH{i}" for i in range(ids)] + [None], rows
+            ),
+            "MasterTransactionsId": master_ids,
+        }
+    )
+    for col in EBO_FLAG_COLUMNS:
+        frame[col] = rng.choice(np.array(["Yes", "No", None], dtype=object), rows)
+    return frame
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_matches_loop_on_random_frames(seed):
+    frame = wallet_frame(rows=60, seed=seed, ids=15)
+    pd.testing.assert_frame_equal(
+        _merge_null_id_rows(frame.copy()), merge_null_id_rows_loop(frame.copy())
+    )
+
+
+def test_flags_are_only_upgraded():
+    frame = pd.DataFrame(
+        {
+            "IHubReferenceId": ["A", "A", "A", "B", "B", "C"],
+            "MasterTransactionsId": [1.0, np.nan, np.nan, 2.0, np.nan, np.nan],
+            "TRANSACTION_CREDIT": ["No", "Yes", "No", "Yes", "No", "Yes"],
+            "TRANSACTION_DEBIT": ["Yes", "No", "No", None, "No", "No"],
+            "COMMISSION_CREDIT": [None, None, "Yes", "No", None, "No"],
+            "COMMISSION_REVERSAL": ["No", "No", "No", "No", "No", "Yes"],
+        }
+    )
+    merged = _merge_null_id_rows(frame)
+    # NULL-id rows are dropped; C has no proper row to fold into
+    assert merged["IHubReferenceId"].tolist() == ["A", "B"]
+    assert merged["TRANSACTION_CREDIT"].tolist() == ["Yes", "Yes"]
+    assert merged["TRANSACTION_DEBIT"].tolist() == ["Yes", None]
+    assert merged["COMMISSION_CREDIT"].tolist() == ["Yes", "No"]
+    assert merged["COMMISSION_REVERSAL"].tolist() == ["No", "No"]
+    pd.testing.assert_frame_equal(merged, merge_null_id_rows_loop(frame))
+
+
+def test_duplicate_proper_rows_are_all_upgraded():
+    frame = pd.DataFrame(
+        {
+            "IHubReferenceId": ["A", "A", "A"],
+            "MasterTransactionsId": [1.0, 2.0, np.nan],
+            **{col: ["No", None, "Yes"] for col in EBO_FLAG_COLUMNS},
+        }
+    )
+    merged = _merge_null_id_rows(frame)
+    assert merged["TRANSACTION_CREDIT"].tolist() == ["Yes", "Yes"]
+    pd.testing.assert_frame_equal(merged, merge_null_id_rows_loop(frame))
+
+
+@pytest.mark.parametrize("null_id_share", [0.0, 1.0])
+def test_all_null_or_no_null_ids_keep_the_rows(null_id_share):
+    frame = wallet_frame(rows=20, seed=1, null_id_share=null_id_share)
+    merged = _merge_null_id_rows(frame.copy())
+    assert len(merged) == len(frame)
+    pd.testing.assert_frame_equal(merged, merge_null_id_rows_loop(frame))
@@ -0,0 +1,105 @@
+import pandas as pd
+from sqlalchemy import text
+
+import query_executor
+
+
+class _Result:
+    def __init__(self, rows=(), columns=()):
+        self._rows = list(rows)
+        self._columns = list(columns)
+
+    def first(self):
+        return self._rows[0] if self._rows else None
+
+    def fetchall(self):
+        return self._rows
+
+    def keys(self):
+        return self._columns
+
+
+class _Connection:
+    """Records statements; answers the collation lookup and the final query."""
+
+    def __init__(self, collation=("utf8mb4", "utf8mb4_general_ci")):
+        self.collation = collation
+        self.statements = []
+        self.inserted = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, statement, params=None):
+        sql = statement.text
+        self.statements.append(sql)
+        if "information_schema.COLUMNS" in sql:
+            return _Result([self.collation] if self.collation else [])
+        if sql.startswith("INSERT INTO") and isinstance(params, list):
+            self.inserted.extend(row["lookup_key"] for row in params)
+        return _Result([("x",)], ["VENDOR_REFERENCE"])
+
+
+class _Engine:
+    def __init__(self, connection):
+        self.connection = connection
+
+    def connect(self):
+        return self.connection
+
+
+def _run(monkeypatch, keys, key_column="tenantinetcsc.UpeDistrictTransaction.ApplicationId"):
+    connection = _Connection()
+    monkeypatch.setattr(query_executor, "get_db_connection", lambda: _Engine(connection))
+    monkeypatch.setattr(query_executor, "_collations", {})
+    query = text("SELECT ApplicationId AS VENDOR_REFERENCE FROM t WHERE ApplicationId IN :app_ids")
+    df = query_executor.execute_with_keys(
+        query, keys, key_param="app_ids", key_column=key_column
+    )
+    return connection, df
+
+
+def _filler(count):
+    return [f"APP{i:06d}" for i in range(count)]
+
+
+def test_keys_equal_under_collation_are_all_loaded(monkeypatch):
+    # Distinct in Python, equal under a case-insensitive PAD SPACE collation
+    clashing = ["AB12", "ab12", "123", "123 "]
+    keys = clashing + _filler(query_executor.KEY_TABLE_MIN_KEYS)
+    connection, df = _run(monkeypatch, keys)
+
+    create = next(sql for sql in connection.statements if sql.startswith("CREATE TEMPORARY TABLE"))
+    assert "PRIMARY KEY" not in create and "UNIQUE" not in create
+    assert "INDEX (lookup_key)" in create
+    assert "CHARACTER SET utf8mb4 COLLATE utf8mb4_general_ci" in create
+    assert connection.inserted == keys
+    assert list(df["VENDOR_REFERENCE"]) == ["x"]
+
+
+def test_exact_duplicates_and_nulls_are_dropped(monkeypatch):
+    keys = _filler(query_executor.KEY_TABLE_MIN_KEYS) + ["APP000001", None, float("nan")]
+    connection, _ = _run(monkeypatch, keys)
+    assert connection.inserted == _filler(query_executor.KEY_TABLE_MIN_KEYS)
+
+
+def test_integer_keys_skip_the_collation_lookup(monkeypatch):
+    keys = list(range(query_executor.KEY_TABLE_MIN_KEYS))
+    connection, _ = _run(monkeypatch, keys)
+    create = next(sql for sql in connection.statements if sql.startswith("CREATE TEMPORARY TABLE"))
+    assert "BIGINT" in create and "COLLATE" not in create
+    assert not any("information_schema" in sql for sql in connection.statements)
+
+
+def test_listeners_get_the_keys_bound(monkeypatch):
+    seen = []
+    listener = lambda name, query, params: seen.append(params)
+    query_executor.add_query_listener(listener)
+    try:
+        _run(monkeypatch, _filler(query_executor.KEY_TABLE_MIN_KEYS))
+    finally:
+        query_executor.remove_query_listener(listener)
+    assert seen[0]["app_ids"] == tuple(_filler(query_executor.KEY_TABLE_MIN_KEYS))
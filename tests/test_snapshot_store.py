@@ -0,0 +1,111 @@
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy import text
+
+import snapshot_store
+from config import CONFIG
+
+QUERY = text("SELECT * FROM t WHERE ts BETWEEN :start_date AND :end_date")
+
+
+@pytest.fixture
+def hub_rows():
+    """Four rows a day over 20 closed days; STATUS is NULL on one day only."""
+    first = date.today() - timedelta(days=40)
+    rows = []
+    for offset in range(20):
+        day = first + timedelta(days=offset)
+        for i in range(4):
+            rows.append(
+                {
+                    "ID": offset * 10 + i,
+                    "STATUS": None if offset == 7 else i % 3,
+                    "REF": f"R{offset}-{i}",
+                    "SERVICE_DATE": pd.Timestamp(day) + pd.Timedelta(hours=i * 5),
+                }
+            )
+    return first, rows
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch, hub_rows):
+    monkeypatch.setitem(
+        CONFIG,
+        "snapshot_store",
+        {"enabled": True, "directory": str(tmp_path), "settle_days": 3},
+    )
+    rows = hub_rows[1]
+    calls = []
+
+    def fetch(query, params=None, name=None, **options):
+        calls.append((params["start_date"], params["end_date"]))
+        start, end = pd.Timestamp(params["start_date"]), pd.Timestamp(params["end_date"])
+        selected = [
+            row
+            for row in rows
+            if start <= row["SERVICE_DATE"] < end + pd.Timedelta(days=1)
+        ]
+        return pd.DataFrame.from_records(
+            [tuple(row.values()) for row in selected],
+            columns=["ID", "STATUS", "REF", "SERVICE_DATE"],
+        )
+
+    monkeypatch.setattr(snapshot_store, "execute_sql_with_retry", fetch)
+    return fetch, calls
+
+
+def _params(start, end):
+    return {"start_date": str(start), "end_date": str(end)}
+
+
+def test_cold_range_is_one_span_query(store, hub_rows):
+    fetch, calls = store
+    first, _ = hub_rows
+    params = _params(first, first + timedelta(days=19))
+
+    result = snapshot_store.execute_by_day(QUERY, params, name="hub")
+    assert calls == [(params["start_date"], params["end_date"])]
+    pd.testing.assert_frame_equal(result, fetch(QUERY, params))
+
+    calls.clear()
+    again = snapshot_store.execute_by_day(QUERY, params, name="hub")
+    assert calls == []
+    pd.testing.assert_frame_equal(again, result)
+
+
+def test_day_snapshots_have_single_day_dtypes(store, hub_rows):
+    fetch, calls = store
+    first, _ = hub_rows
+    snapshot_store.execute_by_day(
+        QUERY, _params(first, first + timedelta(days=19)), name="hub"
+    )
+    calls.clear()
+    # Days without NULLs keep STATUS as int, the NULL day as float
+    for offset in (3, 7):
+        day = first + timedelta(days=offset)
+        from_snapshot = snapshot_store.execute_by_day(QUERY, _params(day, day), name="hub")
+        assert calls == []
+        pd.testing.assert_frame_equal(from_snapshot, fetch(QUERY, _params(day, day)))
+        calls.clear()
+    assert snapshot_store.execute_by_day(
+        QUERY, _params(first, first), name="hub"
+    )["STATUS"].dtype == np.int64
+
+
+def test_only_missing_runs_are_fetched(store, hub_rows):
+    _, calls = store
+    first, _ = hub_rows
+    snapshot_store.execute_by_day(
+        QUERY, _params(first + timedelta(days=5), first + timedelta(days=9)), name="hub"
+    )
+    calls.clear()
+    snapshot_store.execute_by_day(
+        QUERY, _params(first, first + timedelta(days=14)), name="hub"
+    )
+    assert calls == [
+        (str(first), str(first + timedelta(days=4))),
+        (str(first + timedelta(days=10)), str(first + timedelta(days=14))),
+    ]